@@ -0,0 +1,15 @@
+"""View so'rovlari benchmark holatlari (academy tests va benchmark_views buyrug'i uchun umumiy)"""
+from django.urls import reverse
+
+
+def cases(data):
+    """core.benchmark.generate_data natijasidan [(nom, foydalanuvchi, url), ...]"""
+    admin, teacher = data['admin'], data['teachers'][0]
+    group, course = data['groups'][0], data['courses'][0]
+    return [
+        ('course_list', admin, reverse('course_list')),
+        ('course_detail', admin, reverse('course_detail', args=[course.pk])),
+        ('group_list', admin, reverse('group_list')),
+        ('group_list_teacher', teacher, reverse('group_list')),
+        ('group_detail', teacher, reverse('group_detail', args=[group.pk])),
+    ]
@@ -0,0 +1,169 @@
+"""
+O'quvchilarni guruhlarga ommaviy biriktirish va ro'yxat (roster) importi.
+
+enroll() a'zolik qatorlarini bitta bulk_create bilan yozadi. read_roster() CSV yoki
+XLSX faylini (openpyxl read-only rejimida) qatorlarga aylantiradi, import_roster()
+esa bitta tranzaksiyada yetishmayotgan o'quvchilarni yaratib, ularni guruhlarga
+biriktiradi. bulk_create m2m_changed signalini yubormagani uchun statistika,
+reyting va dashboard keshlari shu yerda yangilanadi.
+"""
+import csv
+import io
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from openpyxl import load_workbook
+from core import cache as payload_cache
+from homeworks import leaderboard
+from homeworks.stats import refresh_stats
+from users.models import User
+from .models import Group
+
+ROSTER_COLUMNS = ['username', 'first_name', 'last_name', 'phone', 'password', 'group']
+REQUIRED_COLUMNS = {'username', 'group'}
+BATCH_SIZE = 500
+
+
+class RosterError(ValueError):
+    """Faylni umuman o'qib bo'lmadi (format yoki sarlavha xato)"""
+
+
+def enroll(pairs):
+    """
+    (student_id, group_id) juftliklarini guruhlarga biriktirish.
+    Qaytaradi: (yangi a'zoliklar soni, allaqachon mavjudlari soni)
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return 0, 0
+    Membership = Group.students.through
+    existing = set(
+        Membership.objects.filter(
+            user_id__in={student_id for student_id, _ in pairs},
+            group_id__in={group_id for _, group_id in pairs}
+        ).values_list('user_id', 'group_id')
+    )
+    new_pairs = pairs - existing
+    Membership.objects.bulk_create(
+        [Membership(user_id=student_id, group_id=group_id) for student_id, group_id in new_pairs],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    if new_pairs:
+        refresh_stats(new_pairs)
+        leaderboard.invalidate()
+        payload_cache.invalidate(
+            users={student_id for student_id, _ in new_pairs},
+            groups={group_id for _, group_id in new_pairs}
+        )
+    return len(new_pairs), len(pairs & existing)
+
+
+def _normalize_header(row):
+    return [str(cell or '').strip().lower() for cell in row]
+
+
+def _rows_from_table(rows):
+    """Birinchi qator - sarlavha. (qator raqami, {ustun: qiymat}) lar generatori"""
+    rows = iter(rows)
+    header = _normalize_header(next(rows, []))
+    missing = REQUIRED_COLUMNS - set(header)
+    if missing:
+        raise RosterError(f"Faylda ustunlar yo'q: {', '.join(sorted(missing))}")
+    for line, row in enumerate(rows, start=2):
+        values = {
+            column: str(value).strip() if value is not None else ''
+            for column, value in zip(header, row)
+            if column in ROSTER_COLUMNS
+        }
+        if any(values.values()):
+            yield line, values
+
+
+def read_roster(file, filename=None):
+    """CSV yoki XLSX fayl (yo'l yoki fayl obyekti) qatorlari"""
+    filename = (filename or getattr(file, 'name', '') or str(file)).lower()
+    if filename.endswith('.xlsx'):
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as exc:
+            raise RosterError(f"XLSX faylni o'qib bo'lmadi: {exc}")
+        try:
+            return list(_rows_from_table(workbook.active.iter_rows(values_only=True)))
+        finally:
+            workbook.close()
+    if filename.endswith('.csv'):
+        if hasattr(file, 'read'):
+            data = file.read()
+            text = data.decode('utf-8-sig') if isinstance(data, bytes) else data
+        else:
+            with open(file, encoding='utf-8-sig') as handle:
+                text = handle.read()
+        return list(_rows_from_table(csv.reader(io.StringIO(text))))
+    raise RosterError("Faqat .csv yoki .xlsx fayllar qabul qilinadi.")
+
+
+@transaction.atomic
+def import_roster(rows):
+    """
+    rows - read_roster() natijasi. Guruh nomi bo'yicha topiladi, yo'q foydalanuvchilar
+    STUDENT sifatida yaratiladi (parol berilmasa - ishlatib bo'lmaydigan parol).
+    Xato qatorlar o'tkazib yuboriladi va hisobotda qaytadi.
+    """
+    report = {
+        'users_created': 0,
+        'users_existing': 0,
+        'enrolled': 0,
+        'already_enrolled': 0,
+        'skipped': 0,
+        'errors': [],
+    }
+
+    def skip(line, message):
+        report['skipped'] += 1
+        report['errors'].append((line, message))
+
+    groups = {
+        group.name: group.pk
+        for group in Group.objects.filter(name__in={values['group'] for _, values in rows})
+    }
+    users = {
+        user.username: user
+        for user in User.objects.filter(username__in={values['username'] for _, values in rows})
+    }
+
+    pairs = set()
+    new_users = {}
+    for line, values in rows:
+        username, group_name = values.get('username', ''), values.get('group', '')
+        if not username:
+            skip(line, "username bo'sh")
+            continue
+        if group_name not in groups:
+            skip(line, f"'{group_name}' guruhi topilmadi")
+            continue
+        user = users.get(username) or new_users.get(username)
+        if user is None:
+            password = values.get('password')
+            user = new_users[username] = User(
+                username=username,
+                first_name=values.get('first_name', ''),
+                last_name=values.get('last_name', ''),
+                phone=values.get('phone') or None,
+                role=User.Role.STUDENT,
+                password=make_password(password or None)
+            )
+        elif user.role != User.Role.STUDENT:
+            skip(line, f"{username} o'quvchi emas ({user.role})")
+            continue
+        pairs.add((username, groups[group_name]))
+
+    User.objects.bulk_create(new_users.values(), batch_size=BATCH_SIZE)
+    report['users_created'] = len(new_users)
+    report['users_existing'] = len({username for username, _ in pairs} - set(new_users))
+
+    # bulk_create ba'zi backend'larda pk qaytarmaydi, shuning uchun id'lar qayta o'qiladi
+    ids = dict(User.objects.filter(username__in={username for username, _ in pairs}).values_list('username', 'pk'))
+    report['enrolled'], report['already_enrolled'] = enroll(
+        (ids[username], group_id) for username, group_id in pairs
+    )
+    return report
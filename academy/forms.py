@@ -108,3 +108,18 @@ class AssignUserToGroupsForm(forms.Form):
             elif user.role == 'STUDENT':
                 self.fields['groups'].queryset = Group.objects.all()
                 self.fields['groups'].initial = user.study_groups.all()
+
+
+class RosterImportForm(forms.Form):
+    """O'quvchilar ro'yxatini CSV/XLSX fayldan import qilish"""
+    file = forms.FileField(
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+        label="Fayl (.csv yoki .xlsx)",
+        help_text="Ustunlar: username, group (majburiy), first_name, last_name, phone, password"
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("Faqat .csv yoki .xlsx fayllar qabul qilinadi.")
+        return file
@@ -1,3 +1,103 @@
+from io import BytesIO
+from openpyxl import Workbook
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.benchmark import QueryCountBenchmarkMixin
+from homeworks.models import StudentGroupStats
+from users.models import User
+from . import benchmarks
+from .enrollment import RosterError, enroll, import_roster, read_roster
+from .models import Course, Group
 
-# Create your tests here.
+
+class AcademyQueryBenchmarkTests(QueryCountBenchmarkMixin, TestCase):
+    def cases(self, data):
+        return benchmarks.cases(data)
+
+
+def roster_csv(*lines, name='roster.csv'):
+    body = '\n'.join(['username,first_name,last_name,group', *lines])
+    return SimpleUploadedFile(name, body.encode('utf-8'))
+
+
+class EnrollmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        course = Course.objects.create(name='Python')
+        self.groups = [Group.objects.create(name=f'G-{i}', course=course) for i in range(3)]
+        self.students = [User.objects.create(username=f's{i}', role='STUDENT') for i in range(4)]
+        self.admin = User.objects.create(username='admin', role='ADMIN')
+
+    def test_enroll_is_one_insert_and_refreshes_stats(self):
+        self.groups[0].students.add(self.students[0])
+        pairs = [(student.pk, group.pk) for student in self.students for group in self.groups]
+        with CaptureQueriesContext(connection) as queries:
+            created, skipped = enroll(pairs)
+        self.assertEqual((created, skipped), (11, 1))
+        self.assertEqual(Group.students.through.objects.count(), 12)
+        self.assertEqual(StudentGroupStats.objects.count(), 12)
+        inserts = [q for q in queries if 'INSERT' in q['sql'] and 'academy_group_students' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+
+    def test_import_csv_creates_users_and_reports_skips(self):
+        User.objects.create(username='teacher', role='TEACHER')
+        rows = read_roster(roster_csv(
+            's0,,,G-0',
+            'new1,Ali,Valiyev,G-0',
+            'new1,Ali,Valiyev,G-1',
+            'new2,Vali,,G-404',
+            'teacher,,,G-0',
+        ))
+        report = import_roster(rows)
+        self.assertEqual(report['users_created'], 1)
+        self.assertEqual(report['users_existing'], 1)
+        self.assertEqual(report['enrolled'], 3)
+        self.assertEqual(report['skipped'], 2)
+        self.assertEqual([line for line, _ in report['errors']], [5, 6])
+        new1 = User.objects.get(username='new1')
+        self.assertEqual((new1.role, new1.first_name, new1.has_usable_password()), ('STUDENT', 'Ali', False))
+        self.assertEqual(new1.study_groups.count(), 2)
+
+    def test_import_xlsx(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Username', 'Group', 'First_name'])
+        sheet.append(['x1', 'G-2', 'Xurshid'])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        report = import_roster(read_roster(buffer, filename='roster.xlsx'))
+        self.assertEqual((report['users_created'], report['enrolled']), (1, 1))
+        self.assertTrue(self.groups[2].students.filter(username='x1', first_name='Xurshid').exists())
+
+    def test_missing_columns(self):
+        with self.assertRaises(RosterError):
+            read_roster(SimpleUploadedFile('roster.csv', b'name,surname\na,b'))
+
+    def test_import_page(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('import_roster'), {'file': roster_csv('s1,,,G-1')})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report']['enrolled'], 1)
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.get(reverse('import_roster')).status_code, 403)
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        enrollments = [{'student_id': self.students[0].pk, 'group_id': group.pk} for group in self.groups]
+        response = client.post('/api/v1/groups/enroll/', {'enrollments': enrollments}, format='json')
+        self.assertEqual(response.json(), {'created': 3, 'skipped': 0})
+
+        response = client.post('/api/v1/groups/enroll/', {'enrollments': [{'student_id': self.admin.pk, 'group_id': 0}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = client.post('/api/v1/groups/import_roster/', {'file': roster_csv('new,,,G-0', 'bad,,,G-9')})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['users_created'], 1)
+        self.assertEqual(response.json()['errors'], [{'line': 3, 'error': "'G-9' guruhi topilmadi"}])
@@ -7,7 +7,7 @@ from .views import (
     GroupListView, GroupDetailView, GroupCreateView,
     GroupUpdateView, GroupDeleteView,
     # Student management
-    add_students_to_group, remove_student_from_group, change_group_teacher, assign_user_to_groups
+    add_students_to_group, import_roster_view, remove_student_from_group, change_group_teacher, assign_user_to_groups
 )
 
 urlpatterns = [
@@ -26,6 +26,7 @@ urlpatterns = [
     path('groups/<int:pk>/delete/', GroupDeleteView.as_view(), name='group_delete'),
     
     # Student management
+    path('groups/import-roster/', import_roster_view, name='import_roster'),
     path('groups/<int:group_id>/add-students/', add_students_to_group, name='add_students_to_group'),
     path('groups/<int:group_id>/remove-student/<int:student_id>/', remove_student_from_group, name='remove_student_from_group'),
     path('groups/<int:group_id>/change-teacher/', change_group_teacher, name='change_group_teacher'),
@@ -5,10 +5,12 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse_lazy, reverse
 from django.http import HttpResponseForbidden
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from .models import Course, Group
-from .forms import CourseForm, GroupForm, AddStudentsToGroupForm, AssignUserToGroupsForm
-from homeworks.models import Homework, Submission
+from .enrollment import RosterError, import_roster, read_roster
+from .forms import CourseForm, GroupForm, AddStudentsToGroupForm, AssignUserToGroupsForm, RosterImportForm
+from homeworks.models import Homework, Submission, StudentGroupStats
 from users.models import User
 
 
@@ -32,12 +34,15 @@ class CourseListView(LoginRequiredMixin, ListView):
     template_name = 'academy/course_list.html'
     context_object_name = 'courses'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        for course in context['courses']:
-            course.group_count = course.groups.count()
-            course.student_count = sum(g.students.count() for g in course.groups.all())
-        return context
+    def get_queryset(self):
+        # Guruhlar va o'quvchilar soni har bir kurs uchun alohida so'ralmaydi
+        student_count = Group.students.through.objects.filter(
+            group__course=OuterRef('pk')
+        ).values('group__course').annotate(total=Count('pk')).values('total')
+        return Course.objects.annotate(
+            group_count=Count('groups'),
+            student_count=Coalesce(Subquery(student_count), 0)
+        )
 
 
 class CourseDetailView(LoginRequiredMixin, DetailView):
@@ -50,15 +55,17 @@ class CourseDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         course = self.object
         
-        groups = course.groups.all()
+        groups = list(course.groups.annotate(
+            student_count=Count('students')
+        ).prefetch_related('teachers'))
         context['groups'] = groups
         
         # Statistika
-        total_students = sum(g.students.count() for g in groups)
-        total_homeworks = Homework.objects.filter(group__in=groups).count()
+        total_students = sum(g.student_count for g in groups)
+        total_homeworks = Homework.objects.filter(group__course=course).count()
         
         subs = Submission.objects.filter(
-            homework__group__in=groups,
+            homework__group__course=course,
             is_graded=True
         )
         avg_score = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
@@ -157,19 +164,18 @@ class GroupDetailView(LoginRequiredMixin, DetailView):
         
         # O'quvchilar statistikasi (teacher/admin uchun)
         if user.role in ['ADMIN', 'MODERATOR', 'TEACHER']:
+            stats = {
+                row.student_id: row
+                for row in StudentGroupStats.objects.filter(group=group)
+            }
             student_stats = []
             for student in context['students']:
-                subs = Submission.objects.filter(
-                    homework__group=group,
-                    student=student,
-                    is_graded=True
-                )
-                avg = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
+                row = stats.get(student.pk) or StudentGroupStats(student=student, group=group)
                 student_stats.append({
                     'student': student,
-                    'avg_score': round(avg, 1),
-                    'submitted': subs.count(),
-                    'total': context['homeworks'].count()
+                    'avg_score': row.avg_score,
+                    'submitted': row.graded_count,
+                    'total': row.homework_total
                 })
             context['student_stats'] = student_stats
             
@@ -256,8 +262,8 @@ def add_students_to_group(request, group_id):
         form = AddStudentsToGroupForm(request.POST, group=group, search_query=search_query)
         if form.is_valid():
             students = form.cleaned_data['students']
-            for student in students:
-                group.students.add(student)
+            # Bitta INSERT va bitta m2m_changed signali (statistika ham bir marta yangilanadi)
+            group.students.add(*students)
             messages.success(request, f"{len(students)} ta o'quvchi qo'shildi!")
             return redirect('group_detail', pk=group_id)
     else:
@@ -272,6 +278,29 @@ def add_students_to_group(request, group_id):
     })
 
 
+@login_required
+def import_roster_view(request):
+    """CSV/XLSX fayldan o'quvchilarni yaratish va guruhlarga biriktirish"""
+    if request.user.role not in ['ADMIN', 'MODERATOR']:
+        return HttpResponseForbidden("Faqat Admin yoki Moderator import qila oladi.")
+
+    report = None
+    form = RosterImportForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        try:
+            report = import_roster(read_roster(form.cleaned_data['file']))
+        except RosterError as exc:
+            form.add_error('file', str(exc))
+        else:
+            messages.success(
+                request,
+                f"{report['users_created']} ta o'quvchi yaratildi, {report['enrolled']} ta a'zolik qo'shildi, "
+                f"{report['skipped']} ta qator o'tkazib yuborildi."
+            )
+
+    return render(request, 'academy/import_roster.html', {'form': form, 'report': report})
+
+
 @login_required
 def remove_student_from_group(request, group_id, student_id):
     """Guruhdan o'quvchini olib tashlash"""
@@ -0,0 +1,23 @@
+"""API query-count benchmark cases, shared by api.tests and the benchmark_views command"""
+
+
+def cases(data):
+    """[(name, user, url), ...] for the data built by core.benchmark.generate_data"""
+    admin, teacher, student = data['admin'], data['teachers'][0], data['students'][0]
+    group, course = data['groups'][0], data['courses'][0]
+    return [
+        ('users', admin, '/api/v1/users/'),
+        ('users_by_role', admin, '/api/v1/users/by_role/?role=STUDENT'),
+        ('courses', admin, '/api/v1/courses/'),
+        ('course_detail', admin, f'/api/v1/courses/{course.pk}/'),
+        ('groups', admin, '/api/v1/groups/'),
+        ('group_detail', admin, f'/api/v1/groups/{group.pk}/'),
+        ('homeworks', admin, '/api/v1/homeworks/'),
+        ('homeworks_teacher', teacher, '/api/v1/homeworks/'),
+        ('homeworks_student', student, '/api/v1/homeworks/'),
+        ('submissions', admin, '/api/v1/submissions/'),
+        ('submissions_teacher', teacher, '/api/v1/submissions/'),
+        ('submissions_pending', teacher, '/api/v1/submissions/pending/'),
+        ('my_submissions', student, '/api/v1/submissions/my_submissions/'),
+        ('leaderboard', admin, '/api/v1/leaderboard/'),
+    ]
@@ -0,0 +1,65 @@
+import hashlib
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from core.cache import GLOBAL, get_versions
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """
+    GET javoblari uchun ETag: URL, foydalanuvchi va u ko'radigan ma'lumotlar versiyalaridan
+    (core.cache, signal'lar oshiradi) quriladi. If-None-Match mos kelsa 304 qaytadi va
+    queryset umuman bajarilmaydi / serializatsiya qilinmaydi.
+    etag_global = True bo'lgan viewset'lar (hamma uchun umumiy ro'yxatlar: kurslar, guruhlar,
+    foydalanuvchilar) har qanday o'zgarishda eskiradigan GLOBAL versiyaga bog'lanadi.
+    """
+    etag_global = False
+
+    def etag_depends_on(self):
+        user = self.request.user
+        if self.etag_global or not user.is_authenticated or user.role in ('ADMIN', 'MODERATOR'):
+            return [GLOBAL]
+        if user.role == 'TEACHER':
+            group_ids = user.teaching_groups.values_list('pk', flat=True)
+        else:
+            group_ids = user.study_groups.values_list('pk', flat=True)
+        return [('user', user.pk)] + [('group', pk) for pk in group_ids]
+
+    def compute_etag(self, request):
+        depends_on = self.etag_depends_on()
+        raw = ':'.join(map(str, [
+            request.get_full_path(),
+            request.user.pk,
+            request.accepted_renderer.format,
+            *get_versions(*depends_on),
+        ]))
+        return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        self.etag = self.compute_etag(request)
+        if_none_match = request.headers.get('If-None-Match', '')
+        if self.etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': self.etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            # Javob foydalanuvchiga bog'liq: oraliq keshlar saqlamasin, mijoz har safar tekshirsin
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Kichik ro'yxatlar uchun: ?page=N&page_size=M
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SubmissionCursorPagination(CursorPagination):
+    """
+    Katta jadval uchun cursor pagination: COUNT(*) va chuqur OFFSET yo'q.
+    Pozitsiya (submitted_at, id) bo'yicha saqlanadi, shuning uchun yangi topshiriqlar
+    qo'shilganda sahifalar siljimaydi.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-submitted_at', '-id')
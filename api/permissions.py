@@ -55,3 +55,25 @@ class IsOwnerOrAdmin(permissions.BasePermission):
             # For User objects
             return obj == request.user or request.user.role == 'ADMIN'
         return request.user.role == 'ADMIN'
+
+
+class CanViewLeaderboard(permissions.BasePermission):
+    """
+    Admins and moderators see every leaderboard; teachers only the ones
+    filtered to a group (or a course) they teach.
+    """
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if user.role in ['ADMIN', 'MODERATOR']:
+            return True
+        if user.role != 'TEACHER':
+            return False
+        group_id = view._int_param('group')
+        if group_id:
+            return user.teaching_groups.filter(pk=group_id).exists()
+        course_id = view._int_param('course')
+        if course_id:
+            return user.teaching_groups.filter(course_id=course_id).exists()
+        return False
@@ -1,13 +1,34 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from academy.enrollment import BATCH_SIZE as ENROLL_BATCH_SIZE
 from academy.models import Course, Group
+from homeworks.grading import MAX_BULK_GRADES
 from homeworks.models import Homework, Submission
 
 User = get_user_model()
 
 
+class SparseFieldsMixin:
+    """
+    ?fields=id,title kabi so'rovda faqat ko'rsatilgan ustunlar qaytariladi.
+    Faqat o'qish (GET) so'rovlariga ta'sir qiladi; noma'lum nomlar e'tiborsiz qoldiriladi.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        requested = request.query_params.get('fields')
+        if not requested:
+            return
+        allowed = {name.strip() for name in requested.split(',') if name.strip()}
+        if allowed & set(self.fields):
+            for name in set(self.fields) - allowed:
+                self.fields.pop(name)
+
+
 # ==================== USER SERIALIZERS ====================
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Minimal user data for lists"""
     class Meta:
         model = User
@@ -15,7 +36,7 @@ class UserListSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Full user details"""
     class Meta:
         model = User
@@ -53,7 +74,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
 
 
 # ==================== COURSE SERIALIZERS ====================
-class CourseListSerializer(serializers.ModelSerializer):
+class CourseListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Course list view"""
     class Meta:
         model = Course
@@ -61,17 +82,14 @@ class CourseListSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
-class CourseDetailSerializer(serializers.ModelSerializer):
-    """Full course details with groups"""
-    groups_count = serializers.SerializerMethodField()
+class CourseDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Full course details with groups (groups_count is annotated by CourseViewSet)"""
+    groups_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Course
-        fields = ('id', 'name', 'description', 'groups_count', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
-    
-    def get_groups_count(self, obj):
-        return obj.groups.count()
+        fields = ('id', 'name', 'description', 'groups_count', 'created_at')
+        read_only_fields = ('id', 'created_at')
 
 
 class CourseCreateUpdateSerializer(serializers.ModelSerializer):
@@ -82,56 +100,50 @@ class CourseCreateUpdateSerializer(serializers.ModelSerializer):
 
 
 # ==================== GROUP SERIALIZERS ====================
-class GroupListSerializer(serializers.ModelSerializer):
-    """Group list view"""
+class GroupListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Group list view (course is select_related, teachers prefetched, students_count annotated)"""
     course_name = serializers.CharField(source='course.name', read_only=True)
-    students_count = serializers.SerializerMethodField()
+    students_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Group
-        fields = ('id', 'name', 'course', 'course_name', 'teacher', 'students_count', 'created_at')
+        fields = ('id', 'name', 'course', 'course_name', 'teachers', 'students_count', 'created_at')
         read_only_fields = ('id', 'created_at')
-    
-    def get_students_count(self, obj):
-        return obj.students.count()
 
 
-class GroupDetailSerializer(serializers.ModelSerializer):
-    """Full group details with students and teacher"""
+class GroupDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Full group details with students and teachers"""
     course_name = serializers.CharField(source='course.name', read_only=True)
-    teacher_name = serializers.CharField(source='teacher.get_full_name', read_only=True)
+    teachers = UserListSerializer(many=True, read_only=True)
     students = UserListSerializer(many=True, read_only=True)
     
     class Meta:
         model = Group
-        fields = ('id', 'name', 'course', 'course_name', 'teacher', 'teacher_name',
-                  'students', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        fields = ('id', 'name', 'course', 'course_name', 'teachers',
+                  'students', 'created_at')
+        read_only_fields = ('id', 'created_at')
 
 
 class GroupCreateUpdateSerializer(serializers.ModelSerializer):
     """Create/Update group"""
     class Meta:
         model = Group
-        fields = ('name', 'course', 'teacher')
+        fields = ('name', 'course', 'teachers')
 
 
 # ==================== HOMEWORK SERIALIZERS ====================
-class HomeworkListSerializer(serializers.ModelSerializer):
-    """Homework list view"""
+class HomeworkListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Homework list view (group is select_related, submissions_count annotated)"""
     group_name = serializers.CharField(source='group.name', read_only=True)
-    submissions_count = serializers.SerializerMethodField()
+    submissions_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Homework
         fields = ('id', 'title', 'group', 'group_name', 'deadline', 'submissions_count', 'created_at')
         read_only_fields = ('id', 'created_at')
-    
-    def get_submissions_count(self, obj):
-        return obj.submissions.count()
 
 
-class HomeworkDetailSerializer(serializers.ModelSerializer):
+class HomeworkDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Full homework details"""
     group_name = serializers.CharField(source='group.name', read_only=True)
     file_url = serializers.SerializerMethodField()
@@ -139,8 +151,8 @@ class HomeworkDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Homework
         fields = ('id', 'title', 'description', 'group', 'group_name', 'deadline',
-                  'code_language', 'file', 'file_url', 'options', 'sequence', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+                  'max_score', 'file', 'file_url', 'sequence', 'created_at')
+        read_only_fields = ('id', 'created_at')
     
     def get_file_url(self, obj):
         if obj.file:
@@ -155,23 +167,23 @@ class HomeworkCreateUpdateSerializer(serializers.ModelSerializer):
     """Create/Update homework"""
     class Meta:
         model = Homework
-        fields = ('title', 'description', 'group', 'deadline', 'code_language', 'file', 'options', 'sequence')
+        fields = ('title', 'description', 'group', 'deadline', 'max_score', 'file', 'sequence')
 
 
 # ==================== SUBMISSION SERIALIZERS ====================
-class SubmissionListSerializer(serializers.ModelSerializer):
-    """Submission list view"""
+class SubmissionListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Submission list view (student and homework are select_related)"""
     student_name = serializers.CharField(source='student.get_full_name', read_only=True)
     homework_title = serializers.CharField(source='homework.title', read_only=True)
     
     class Meta:
         model = Submission
         fields = ('id', 'homework', 'homework_title', 'student', 'student_name',
-                  'grade', 'status', 'submitted_at')
+                  'score_percent', 'is_graded', 'submitted_at')
         read_only_fields = ('id', 'submitted_at')
 
 
-class SubmissionDetailSerializer(serializers.ModelSerializer):
+class SubmissionDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Full submission details"""
     student_name = serializers.CharField(source='student.get_full_name', read_only=True)
     homework_title = serializers.CharField(source='homework.title', read_only=True)
@@ -180,8 +192,8 @@ class SubmissionDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Submission
         fields = ('id', 'homework', 'homework_title', 'student', 'student_name',
-                  'text_answer', 'code_answer', 'file', 'file_url', 'grade',
-                  'feedback', 'status', 'submitted_at', 'graded_at')
+                  'content', 'is_code', 'code_language', 'file', 'file_url', 'score_percent',
+                  'teacher_comment', 'is_graded', 'submitted_at', 'graded_at')
         read_only_fields = ('id', 'submitted_at', 'graded_at')
     
     def get_file_url(self, obj):
@@ -197,7 +209,7 @@ class SubmissionCreateUpdateSerializer(serializers.ModelSerializer):
     """Create/Update submission"""
     class Meta:
         model = Submission
-        fields = ('homework', 'text_answer', 'code_answer', 'file')
+        fields = ('homework', 'content', 'is_code', 'code_language', 'file')
     
     def validate_file(self, value):
         """5MB dan katta bo'lgan faylni qabul qilmaslik"""
@@ -216,4 +228,68 @@ class SubmissionGradeSerializer(serializers.ModelSerializer):
     """Grade submission"""
     class Meta:
         model = Submission
-        fields = ('grade', 'feedback', 'status')
+        fields = ('score_percent', 'teacher_comment', 'is_graded')
+        read_only_fields = ('is_graded',)
+
+
+class BulkGradeEntrySerializer(serializers.Serializer):
+    """One row of a bulk grading request"""
+    submission_id = serializers.IntegerField()
+    score_percent = serializers.IntegerField(min_value=0, max_value=100)
+    teacher_comment = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkGradeSerializer(serializers.Serializer):
+    """Grade many submissions in one request"""
+    grades = BulkGradeEntrySerializer(many=True, allow_empty=False)
+
+    def validate_grades(self, value):
+        if len(value) > MAX_BULK_GRADES:
+            raise serializers.ValidationError(f'At most {MAX_BULK_GRADES} grades per request.')
+        ids = [entry['submission_id'] for entry in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each submission may appear only once.')
+        return value
+
+    def entries(self):
+        return [
+            (entry['submission_id'], entry['score_percent'], entry.get('teacher_comment'))
+            for entry in self.validated_data['grades']
+        ]
+
+
+class EnrollmentSerializer(serializers.Serializer):
+    """One (student, group) membership"""
+    student_id = serializers.IntegerField()
+    group_id = serializers.IntegerField()
+
+
+class BulkEnrollSerializer(serializers.Serializer):
+    """Enroll many students into many groups in one request"""
+    enrollments = EnrollmentSerializer(many=True, allow_empty=False)
+
+    def validate_enrollments(self, value):
+        if len(value) > ENROLL_BATCH_SIZE * 10:
+            raise serializers.ValidationError(f'At most {ENROLL_BATCH_SIZE * 10} enrollments per request.')
+        student_ids = {entry['student_id'] for entry in value}
+        group_ids = {entry['group_id'] for entry in value}
+        missing_students = student_ids - set(
+            User.objects.filter(pk__in=student_ids, role='STUDENT').values_list('pk', flat=True)
+        )
+        missing_groups = group_ids - set(Group.objects.filter(pk__in=group_ids).values_list('pk', flat=True))
+        errors = []
+        if missing_students:
+            errors.append(f'Unknown students: {sorted(missing_students)}')
+        if missing_groups:
+            errors.append(f'Unknown groups: {sorted(missing_groups)}')
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+
+    def pairs(self):
+        return [(entry['student_id'], entry['group_id']) for entry in self.validated_data['enrollments']]
+
+
+class RosterImportSerializer(serializers.Serializer):
+    """CSV/XLSX roster upload"""
+    file = serializers.FileField()
@@ -1,3 +1,142 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from academy.models import Course, Group
+from core.benchmark import QueryCountBenchmarkMixin
+from homeworks.models import Homework, Submission
+from users.models import User
+from . import benchmarks
 
-# Create your tests here.
+
+class ApiQueryBenchmarkTests(QueryCountBenchmarkMixin, TestCase):
+    def cases(self, data):
+        return benchmarks.cases(data)
+
+
+class ApiSerializerTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(username='teacher', role='TEACHER')
+        self.student = User.objects.create(username='student', first_name='Ali', last_name='Valiyev', role='STUDENT')
+        self.group = Group.objects.create(name='G-1', course=Course.objects.create(name='Python'))
+        self.group.teachers.add(self.teacher)
+        self.group.students.add(self.student)
+        self.homework = Homework.objects.create(
+            title='HW', description='-', group=self.group, deadline='2030-01-01T00:00:00Z'
+        )
+        self.submission = Submission.objects.create(homework=self.homework, student=self.student, content='ok')
+        self.client = APIClient()
+
+    def test_list_fields_come_from_annotations(self):
+        self.client.force_authenticate(self.teacher)
+        group = self.client.get('/api/v1/groups/').json()['results'][0]
+        self.assertEqual((group['students_count'], group['teachers']), (1, [self.teacher.pk]))
+        homework = self.client.get('/api/v1/homeworks/').json()['results'][0]
+        self.assertEqual((homework['group_name'], homework['submissions_count']), ('G-1', 1))
+        submission = self.client.get('/api/v1/submissions/pending/').json()['results'][0]
+        self.assertEqual(submission['student_name'], 'Ali Valiyev')
+
+    def test_teacher_grades_submission(self):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post(
+            f'/api/v1/submissions/{self.submission.pk}/grade/',
+            {'score_percent': 90, 'teacher_comment': "Zo'r"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.submission.refresh_from_db()
+        self.assertEqual((self.submission.is_graded, self.submission.graded_by), (True, self.teacher))
+
+
+class ApiPaginationTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(username='student', role='STUDENT')
+        group = Group.objects.create(name='G-1', course=Course.objects.create(name='Python'))
+        group.students.add(self.student)
+        for i in range(5):
+            homework = Homework.objects.create(
+                title=f'HW {i}', description='-', group=group, deadline='2030-01-01T00:00:00Z', sequence=i
+            )
+            Submission.objects.create(homework=homework, student=self.student, content='ok')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_submissions_use_cursor_without_count(self):
+        seen = []
+        url = '/api/v1/submissions/?page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            self.assertNotIn('count', body)
+            seen += [row['id'] for row in body['results']]
+            url = body['next']
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_custom_actions_are_paginated(self):
+        body = self.client.get('/api/v1/submissions/my_submissions/?page_size=3').json()
+        self.assertEqual(len(body['results']), 3)
+        self.assertIsNotNone(body['next'])
+
+    def test_sparse_fieldsets(self):
+        row = self.client.get('/api/v1/submissions/?fields=id,score_percent').json()['results'][0]
+        self.assertEqual(set(row), {'id', 'score_percent'})
+        row = self.client.get('/api/v1/homeworks/?fields=title,unknown').json()['results'][0]
+        self.assertEqual(set(row), {'title'})
+
+
+class ApiConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create(username='student', role='STUDENT')
+        self.teacher = User.objects.create(username='teacher', role='TEACHER')
+        group = Group.objects.create(name='G-1', course=Course.objects.create(name='Python'))
+        group.students.add(self.student)
+        group.teachers.add(self.teacher)
+        self.homework = Homework.objects.create(
+            title='HW', description='-', group=group, deadline='2030-01-01T00:00:00Z'
+        )
+        self.submission = Submission.objects.create(homework=self.homework, student=self.student, content='ok')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_if_none_match_returns_304_without_payload_queries(self):
+        url = '/api/v1/submissions/my_submissions/'
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertFalse(any('homeworks_submission' in q['sql'] for q in queries))
+
+    def test_etag_changes_after_grading_and_homework_edit(self):
+        etags = [self.client.get('/api/v1/homeworks/')['ETag']]
+
+        self.submission.is_graded = True
+        self.submission.score_percent = 70
+        self.submission.save()
+        etags.append(self.client.get('/api/v1/homeworks/')['ETag'])
+
+        self.homework.title = 'HW (yangilangan)'
+        self.homework.save()
+        response = self.client.get('/api/v1/homeworks/', HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        etags.append(response['ETag'])
+
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_global_collections_change_when_any_course_or_group_is_added(self):
+        for url, create in (
+            ('/api/v1/courses/', lambda: Course.objects.create(name='Java')),
+            ('/api/v1/groups/', lambda: Group.objects.create(name='G-2', course=Course.objects.get(name='Python'))),
+        ):
+            etag = self.client.get(url)['ETag']
+            create()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_user(self):
+        student_etag = self.client.get('/api/v1/homeworks/')['ETag']
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get('/api/v1/homeworks/', HTTP_IF_NONE_MATCH=student_etag)
+        self.assertEqual(response.status_code, 200)
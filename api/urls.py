@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UserViewSet, CourseViewSet, GroupViewSet, 
-    HomeworkViewSet, SubmissionViewSet
+    HomeworkViewSet, SubmissionViewSet, LeaderboardView
 )
 
 # Create a router and register viewsets
@@ -17,5 +17,6 @@ router.register(r'submissions', SubmissionViewSet, basename='submission')
 app_name = 'api'
 
 urlpatterns = [
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
     path('', include(router.urls)),
 ]
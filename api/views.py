@@ -1,27 +1,46 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.authentication import TokenAuthentication
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from academy import enrollment
 from academy.models import Course, Group
+from homeworks import grading
 from homeworks.models import Homework, Submission
+from homeworks import leaderboard
+from homeworks.leaderboard import get_leaderboard, get_leaderboard_count
 from .serializers import (
     UserListSerializer, UserDetailSerializer, UserCreateSerializer, UserUpdateSerializer,
     CourseListSerializer, CourseDetailSerializer, CourseCreateUpdateSerializer,
     GroupListSerializer, GroupDetailSerializer, GroupCreateUpdateSerializer,
     HomeworkListSerializer, HomeworkDetailSerializer, HomeworkCreateUpdateSerializer,
     SubmissionListSerializer, SubmissionDetailSerializer, SubmissionCreateUpdateSerializer,
-    SubmissionGradeSerializer
+    SubmissionGradeSerializer, BulkGradeSerializer, BulkEnrollSerializer, RosterImportSerializer
 )
-from .permissions import IsAdmin, IsTeacher, IsAdminOrReadOnly
+from .conditional import ConditionalGetMixin
+from .pagination import SubmissionCursorPagination
+from .permissions import IsAdmin, IsTeacher, IsAdminOrTeacher, IsAdminOrReadOnly, CanViewLeaderboard
 
 User = get_user_model()
 
 
+class PaginatedActionsMixin:
+    """Ro'yxat qaytaradigan @action'lar ham list() kabi sahifalanadi"""
+    def paginated_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
 # ==================== USER VIEWSET ====================
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, PaginatedActionsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing users
     - List: GET /api/v1/users/
@@ -30,7 +49,8 @@ class UserViewSet(viewsets.ModelViewSet):
     - Update: PUT/PATCH /api/v1/users/{id}/
     - Delete: DELETE /api/v1/users/{id}/
     """
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('id')
+    etag_global = True
     authentication_classes = [JWTAuthentication, TokenAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdmin]
     
@@ -66,12 +86,11 @@ class UserViewSet(viewsets.ModelViewSet):
         else:
             queryset = self.queryset
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
 
 
 # ==================== COURSE VIEWSET ====================
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing courses
     - List: GET /api/v1/courses/
@@ -80,7 +99,8 @@ class CourseViewSet(viewsets.ModelViewSet):
     - Update: PUT/PATCH /api/v1/courses/{id}/
     - Delete: DELETE /api/v1/courses/{id}/
     """
-    queryset = Course.objects.all()
+    queryset = Course.objects.annotate(groups_count=Count('groups')).order_by('name', 'id')
+    etag_global = True
     authentication_classes = [JWTAuthentication, TokenAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdminOrReadOnly]
     
@@ -93,7 +113,7 @@ class CourseViewSet(viewsets.ModelViewSet):
 
 
 # ==================== GROUP VIEWSET ====================
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing groups
     - List: GET /api/v1/groups/
@@ -101,8 +121,11 @@ class GroupViewSet(viewsets.ModelViewSet):
     - Detail: GET /api/v1/groups/{id}/
     - Update: PUT/PATCH /api/v1/groups/{id}/
     - Delete: DELETE /api/v1/groups/{id}/
+    - Bulk enroll: POST /api/v1/groups/enroll/ {"enrollments": [{"student_id", "group_id"}]}
+    - Roster import: POST /api/v1/groups/import_roster/ (multipart "file": .csv or .xlsx)
     """
-    queryset = Group.objects.all()
+    queryset = Group.objects.order_by('name', 'id')
+    etag_global = True
     authentication_classes = [JWTAuthentication, TokenAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdminOrReadOnly]
     
@@ -111,8 +134,24 @@ class GroupViewSet(viewsets.ModelViewSet):
             return GroupDetailSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return GroupCreateUpdateSerializer
+        elif self.action == 'enroll':
+            return BulkEnrollSerializer
+        elif self.action == 'import_roster':
+            return RosterImportSerializer
         return GroupListSerializer
     
+    def get_queryset(self):
+        """Course/teachers are loaded up front, students_count is a subquery (no per-row COUNT)"""
+        student_count = Group.students.through.objects.filter(
+            group=OuterRef('pk')
+        ).values('group').annotate(total=Count('pk')).values('total')
+        queryset = self.queryset.select_related('course').prefetch_related('teachers').annotate(
+            students_count=Coalesce(Subquery(student_count), 0)
+        )
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('students')
+        return queryset
+    
     @action(detail=True, methods=['post'])
     def add_student(self, request, pk=None):
         """Add student to group"""
@@ -125,6 +164,26 @@ class GroupViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
     
+    @action(detail=False, methods=['post'])
+    def enroll(self, request):
+        """Add many (student, group) memberships with one bulk insert"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created, skipped = enrollment.enroll(serializer.pairs())
+        return Response({'created': created, 'skipped': skipped})
+    
+    @action(detail=False, methods=['post'])
+    def import_roster(self, request):
+        """Create missing students from a CSV/XLSX roster and enroll them (one transaction per file)"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            report = enrollment.import_roster(enrollment.read_roster(serializer.validated_data['file']))
+        except enrollment.RosterError as exc:
+            return Response({'file': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        report['errors'] = [{'line': line, 'error': message} for line, message in report['errors']]
+        return Response(report)
+    
     @action(detail=True, methods=['post'])
     def remove_student(self, request, pk=None):
         """Remove student from group"""
@@ -139,7 +198,7 @@ class GroupViewSet(viewsets.ModelViewSet):
 
 
 # ==================== HOMEWORK VIEWSET ====================
-class HomeworkViewSet(viewsets.ModelViewSet):
+class HomeworkViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing homeworks
     - List: GET /api/v1/homeworks/
@@ -148,7 +207,9 @@ class HomeworkViewSet(viewsets.ModelViewSet):
     - Update: PUT/PATCH /api/v1/homeworks/{id}/
     - Delete: DELETE /api/v1/homeworks/{id}/
     """
-    queryset = Homework.objects.all()
+    queryset = Homework.objects.select_related('group').annotate(
+        submissions_count=Count('submissions')
+    ).order_by('sequence', 'created_at', 'id')
     authentication_classes = [JWTAuthentication, TokenAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdminOrReadOnly]
     
@@ -165,10 +226,10 @@ class HomeworkViewSet(viewsets.ModelViewSet):
         if user.is_authenticated:
             if user.role == 'STUDENT':
                 # Students see only homeworks from their groups
-                return Homework.objects.filter(group__students=user)
+                return self.queryset.filter(group__students=user)
             elif user.role == 'TEACHER':
                 # Teachers see only their group homeworks
-                return Homework.objects.filter(group__teacher=user)
+                return self.queryset.filter(group__teachers=user)
         return self.queryset.all()
     
     @action(detail=True, methods=['post'])
@@ -184,24 +245,31 @@ class HomeworkViewSet(viewsets.ModelViewSet):
 
 
 # ==================== SUBMISSION VIEWSET ====================
-class SubmissionViewSet(viewsets.ModelViewSet):
+class SubmissionViewSet(ConditionalGetMixin, PaginatedActionsMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing submissions
-    - List: GET /api/v1/submissions/
+    - List: GET /api/v1/submissions/?cursor={cursor}&page_size={n}&fields=id,score_percent
     - Create: POST /api/v1/submissions/
     - Detail: GET /api/v1/submissions/{id}/
     - Update: PUT/PATCH /api/v1/submissions/{id}/
     - Delete: DELETE /api/v1/submissions/{id}/
+    - Bulk grade: POST /api/v1/submissions/bulk_grade/ {"grades": [{"submission_id", "score_percent", "teacher_comment"}]}
     """
-    queryset = Submission.objects.all()
+    queryset = Submission.objects.select_related('student', 'homework').order_by('-submitted_at', '-id')
     authentication_classes = [JWTAuthentication, TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SubmissionCursorPagination
+    # Cursor tartibi qat'iy (submitted_at, id); ?ordering= bilan o'zgartirilmaydi
+    ordering = SubmissionCursorPagination.ordering
+    ordering_fields = []
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return SubmissionDetailSerializer
         elif self.action == 'grade':
             return SubmissionGradeSerializer
+        elif self.action == 'bulk_grade':
+            return BulkGradeSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return SubmissionCreateUpdateSerializer
         return SubmissionListSerializer
@@ -210,9 +278,9 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         """Filter submissions based on user role"""
         user = self.request.user
         if user.role == 'STUDENT':
-            return Submission.objects.filter(student=user)
+            return self.queryset.filter(student=user)
         elif user.role == 'TEACHER':
-            return Submission.objects.filter(homework__group__teacher=user)
+            return self.queryset.filter(homework__group__teachers=user)
         return self.queryset.all()
     
     def perform_create(self, serializer):
@@ -225,20 +293,74 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         submission = self.get_object()
         serializer = SubmissionGradeSerializer(submission, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save(graded_at=timezone.now())
+            serializer.save(is_graded=True, graded_at=timezone.now(), graded_by=request.user)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminOrTeacher])
+    def bulk_grade(self, request):
+        """Grade many submissions in one transaction (teacher of every group, or admin)"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            graded = grading.bulk_grade(request.user, serializer.entries())
+        except DjangoValidationError as exc:
+            return Response({'grades': exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'graded': len(graded),
+            'submission_ids': [submission.pk for submission in graded],
+        })
+    
     @action(detail=False, methods=['get'])
     def my_submissions(self, request):
         """Get current user's submissions"""
-        submissions = Submission.objects.filter(student=request.user)
-        serializer = self.get_serializer(submissions, many=True)
-        return Response(serializer.data)
+        submissions = self.queryset.filter(student=request.user)
+        return self.paginated_response(submissions)
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get pending submissions (ungraded)"""
-        submissions = self.get_queryset().filter(status='PENDING')
-        serializer = self.get_serializer(submissions, many=True)
-        return Response(serializer.data)
+        submissions = self.get_queryset().filter(is_graded=False)
+        return self.paginated_response(submissions)
+
+
+# ==================== LEADERBOARD ====================
+class LeaderboardView(ConditionalGetMixin, APIView):
+    """
+    API endpoint for the students leaderboard (cached, invalidated on grading)
+    - List: GET /api/v1/leaderboard/?course={id}&group={id}&page={n}&page_size={n}
+    Admins/moderators only; teachers for their own groups or courses.
+    """
+    authentication_classes = [JWTAuthentication, TokenAuthentication]
+    permission_classes = [CanViewLeaderboard]
+    default_page_size = 20
+    max_page_size = 100
+
+    def etag_depends_on(self):
+        return leaderboard.DEPENDS_ON
+
+    def _int_param(self, name, default=None, minimum=1, maximum=None):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except (TypeError, ValueError):
+            return default
+        value = max(value, minimum)
+        return min(value, maximum) if maximum else value
+
+    def get(self, request):
+        course_id = self._int_param('course')
+        group_id = self._int_param('group')
+        page = self._int_param('page', default=1)
+        page_size = self._int_param('page_size', default=self.default_page_size, maximum=self.max_page_size)
+
+        return Response({
+            'count': get_leaderboard_count(course_id=course_id, group_id=group_id),
+            'page': page,
+            'page_size': page_size,
+            'results': get_leaderboard(
+                course_id=course_id,
+                group_id=group_id,
+                offset=(page - 1) * page_size,
+                limit=page_size
+            ),
+        })
@@ -0,0 +1,340 @@
+"""
+View'lar uchun so'rovlar soni va tezlik benchmarki.
+
+generate_data() sun'iy kurs/guruh/o'quvchi/vazifa/topshiriqlarni bulk_create bilan
+yaratadi (setup_test_data.py --scale ham shundan foydalanadi). measure() bitta
+chaqiruvning so'rovlar sonini, vaqtini va eng yuqori xotira sarfini o'lchaydi.
+QueryCountBenchmarkMixin esa har bir ilovaning tests.py fayliga qo'shiladi va
+ma'lumot hajmi oshganda so'rovlar soni o'sadigan (N+1) view'larni yiqitadi.
+index_misses() esa issiq so'rovlar EXPLAIN rejasida kutilgan indeks borligini tekshiradi.
+login_burst() dars boshidagi bir vaqtdagi loginlarning parol tekshirish narxini o'lchaydi.
+http_login() / http_burst() ishlab turgan serverni (gunicorn WSGI yoki uvicorn worker'li ASGI)
+HTTP orqali bir vaqtdagi so'rovlar bilan o'lchaydi.
+"""
+import http.cookiejar
+import random
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode, urljoin
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from academy.models import Course, Group
+from homeworks import leaderboard
+from homeworks.models import Homework, Notification, Submission
+from homeworks.stats import rebuild_stats
+from users.models import User
+from . import cache as payload_cache
+
+# Testlarda ishlatiladigan ikki o'lcham: so'rovlar soni ikkalasida bir xil bo'lishi kerak
+BENCHMARK_SCALES = (1, 3)
+
+
+def scaled_size(scale):
+    """Bitta son bo'yicha barcha o'lchamlarni kattalashtirish"""
+    return {
+        'courses': scale,
+        'groups_per_course': 1 + scale,
+        'students_per_group': 3 * scale,
+        'homeworks_per_group': 2 * scale,
+    }
+
+
+def generate_data(courses=1, groups_per_course=2, students_per_group=5, homeworks_per_group=3,
+                  submission_ratio=0.7, graded_ratio=0.6, seed=0, prefix=None):
+    """
+    Sun'iy ma'lumotlar to'plami. Har bir kursda bitta o'qituvchi uning barcha guruhlariga
+    biriktiriladi; vazifalarning yarmi muddati o'tgan, yarmi kelajakda.
+    bulk_create signal yubormagani uchun StudentGroupStats va keshlar qo'lda yangilanadi.
+    """
+    rng = random.Random(seed)
+    prefix = prefix or f'bench-{uuid.uuid4().hex[:6]}'
+    password = make_password(None)
+    now = timezone.now()
+
+    admin = User.objects.create(username=f'{prefix}-admin', role='ADMIN', password=password)
+    course_objs = Course.objects.bulk_create([
+        Course(name=f'{prefix} kurs {c}') for c in range(courses)
+    ])
+    teachers = User.objects.bulk_create([
+        User(username=f'{prefix}-t{c}', role='TEACHER', password=password) for c in range(courses)
+    ])
+    groups = Group.objects.bulk_create([
+        Group(name=f'{prefix}-G{c}-{g}', course=course)
+        for c, course in enumerate(course_objs) for g in range(groups_per_course)
+    ])
+    students = User.objects.bulk_create([
+        User(username=f'{prefix}-g{g}-s{s}', first_name=f'Ism{s}', last_name=f'Familiya{g}',
+             role='STUDENT', password=password)
+        for g in range(len(groups)) for s in range(students_per_group)
+    ])
+
+    Group.teachers.through.objects.bulk_create([
+        Group.teachers.through(group=group, user=teachers[index // groups_per_course])
+        for index, group in enumerate(groups)
+    ])
+    members = {
+        group.pk: students[index * students_per_group:(index + 1) * students_per_group]
+        for index, group in enumerate(groups)
+    }
+    Group.students.through.objects.bulk_create([
+        Group.students.through(group_id=group_id, user=student)
+        for group_id, group_students in members.items() for student in group_students
+    ])
+
+    homeworks = Homework.objects.bulk_create([
+        Homework(
+            title=f'Vazifa {h + 1}', description='-', group=group, sequence=h + 1,
+            created_by=teachers[index // groups_per_course],
+            deadline=now + timedelta(days=(h - homeworks_per_group // 2) * 2 + 1)
+        )
+        for index, group in enumerate(groups) for h in range(homeworks_per_group)
+    ])
+
+    submissions = []
+    for homework in homeworks:
+        for student in members[homework.group_id]:
+            if rng.random() >= submission_ratio:
+                continue
+            graded = rng.random() < graded_ratio
+            submissions.append(Submission(
+                homework=homework, student=student, content='print("salom")',
+                is_graded=graded, score_percent=rng.randint(30, 100) if graded else 0,
+                graded_at=now if graded else None
+            ))
+    Submission.objects.bulk_create(submissions, batch_size=500)
+
+    rebuild_stats(Group.objects.filter(pk__in=[group.pk for group in groups]))
+    leaderboard.invalidate()
+    payload_cache.invalidate(users=[user.pk for user in teachers + students], groups=list(members))
+
+    return {
+        'admin': admin,
+        'teachers': teachers,
+        'students': students,
+        'courses': course_objs,
+        'groups': groups,
+        'homeworks': homeworks,
+        'counts': {
+            'courses': len(course_objs),
+            'groups': len(groups),
+            'students': len(students),
+            'homeworks': len(homeworks),
+            'submissions': len(submissions),
+        },
+    }
+
+
+def measure(func):
+    """func() ni bir marta bajarib (natija, {'queries', 'ms', 'peak_kb'}) qaytarish"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {
+        'queries': len(queries),
+        'ms': round(elapsed * 1000, 1),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def client_for(user, url):
+    """API token/JWT autentifikatsiyasini talab qiladi, qolgan view'lar sessiya bilan ishlaydi"""
+    if url.startswith('/api/'):
+        client = APIClient()
+        client.force_authenticate(user)
+    else:
+        client = Client()
+        client.force_login(user)
+    return client
+
+
+def measure_view(user, url):
+    """URL'ni sovuq keshda GET qilib o'lchash"""
+    client = client_for(user, url)
+    cache.clear()
+    response, metrics = measure(lambda: client.get(url))
+    metrics['status'] = response.status_code
+    return metrics
+
+
+def measure_case(user, target):
+    """target - URL (GET qilinadi) yoki argumentsiz funksiya (masalan, export quruvchisi)"""
+    if callable(target):
+        cache.clear()
+        _, metrics = measure(target)
+        metrics['status'] = 200
+        return metrics
+    return measure_view(user, target)
+
+
+def run_cases(cases, scales=BENCHMARK_SCALES):
+    """
+    cases(data) -> [(nom, foydalanuvchi, url yoki funksiya), ...] har bir o'lcham uchun chaqiriladi.
+    Natija: [{'case', 'scale', 'queries', 'ms', 'peak_kb', 'status'}, ...]
+    """
+    results = []
+    for scale in scales:
+        data = generate_data(**scaled_size(scale))
+        for name, user, target in cases(data):
+            results.append({'case': name, 'scale': scale, **measure_case(user, target)})
+    return results
+
+
+def growing_cases(results):
+    """So'rovlar soni o'lchamga qarab o'zgaradigan holatlar: {nom: [so'rovlar, ...]}"""
+    counts = {}
+    for row in results:
+        counts.setdefault(row['case'], []).append(row['queries'])
+    return {name: values for name, values in counts.items() if len(set(values)) > 1}
+
+
+def hot_queries():
+    """
+    (nom, queryset, kutilgan indeks): dashboard, check_deadlines va badge so'rovlari.
+    Ular jadval o'sganda ham indeks orqali o'qilishi kerak.
+    """
+    now = timezone.now()
+    return [
+        ('submissions_by_student', Submission.objects.filter(student_id=1, is_graded=True),
+         'submission_student_graded_idx'),
+        ('submissions_by_homework', Submission.objects.filter(homework_id=1, is_graded=False),
+         'submission_hw_graded_idx'),
+        ('homeworks_by_group', Homework.objects.filter(group_id=1).order_by('sequence'),
+         'homework_group_seq_idx'),
+        ('expired_homeworks', Homework.objects.filter(deadline__gte=now - timedelta(days=1), deadline__lt=now),
+         'homework_deadline_idx'),
+        ('notifications', Notification.objects.filter(user_id=1).order_by('-created_at'),
+         'notification_user_created_idx'),
+        ('unread_notifications', Notification.objects.filter(user_id=1, is_read=False),
+         'notification_unread_idx'),
+    ]
+
+
+def explain(queryset):
+    """So'rov rejasi; PostgreSQL kichik jadvallarda seq scan tanlamasligi uchun u o'chiriladi"""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def index_misses():
+    """Kutilgan indeksni ishlatmayotgan so'rovlar: {nom: reja}"""
+    misses = {}
+    for name, queryset, index in hot_queries():
+        plan = explain(queryset)
+        if index not in plan:
+            misses[name] = plan
+    return misses
+
+
+def login_burst(encoded_passwords, password, concurrency=8):
+    """
+    Har bir hash uchun check_password() ni concurrency ta oqimda bajarish.
+    hashlib (pbkdf2/scrypt) GIL'ni qo'yib yuboradi, shuning uchun natija worker'lar
+    CPU bo'yicha qanchalik band bo'lishini ko'rsatadi.
+    Natija: {'logins', 'failed', 'seconds', 'per_second', 'latencies_ms' (saralangan)}
+    """
+    def verify(encoded):
+        started = time.perf_counter()
+        ok = check_password(password, encoded)
+        return ok, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(verify, encoded_passwords))
+    elapsed = time.perf_counter() - started
+    return {
+        'logins': len(results),
+        'failed': sum(1 for ok, _ in results if not ok),
+        'seconds': round(elapsed, 3),
+        'per_second': round(len(results) / elapsed, 1) if elapsed else 0,
+        'latencies_ms': sorted(round(ms, 1) for _, ms in results),
+    }
+
+
+def http_login(base_url, username, password):
+    """
+    Serverga login qilish. Qaytaradi: (sessiya cookie'li opener, dashboard URL'i) -
+    login view foydalanuvchini roli bo'yicha dashboard'ga yo'naltiradi.
+    """
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    login_url = urljoin(base_url, '/login/')
+    with opener.open(login_url) as response:
+        response.read()
+    token = next((cookie.value for cookie in jar if cookie.name == settings.CSRF_COOKIE_NAME), '')
+    request = urllib.request.Request(
+        login_url,
+        data=urlencode({'username': username, 'password': password, 'csrfmiddlewaretoken': token}).encode(),
+        headers={'Referer': login_url}
+    )
+    with opener.open(request) as response:
+        response.read()
+        dashboard_url = response.url
+    if dashboard_url.rstrip('/') == login_url.rstrip('/'):
+        raise ValueError(f"{username}: login muvaffaqiyatsiz")
+    return opener, dashboard_url
+
+
+def http_burst(opener, url, requests=100, concurrency=8):
+    """
+    url'ni concurrency ta oqimdan jami requests marta GET qilish.
+    Natija: {'requests', 'failed', 'seconds', 'per_second', 'latencies_ms' (saralangan)}
+    """
+    def fetch(_):
+        started = time.perf_counter()
+        try:
+            with opener.open(url, timeout=60) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return ok, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(results),
+        'failed': sum(1 for ok, _ in results if not ok),
+        'seconds': round(elapsed, 3),
+        'per_second': round(len(results) / elapsed, 1) if elapsed else 0,
+        'latencies_ms': sorted(round(ms, 1) for _, ms in results),
+    }
+
+
+class QueryCountBenchmarkMixin:
+    """
+    TestCase bilan birga ishlatiladi: cases(data) ni qayta belgilash kifoya (odatda
+    <app>/benchmarks.py dagi cases ga uzatiladi - benchmark_views buyrug'i ham shuni o'qiydi).
+    Har bir view 200 (yoki redirect) qaytarishi va so'rovlar soni
+    BENCHMARK_SCALES o'lchamlarida bir xil bo'lishi tekshiriladi.
+    """
+
+    def cases(self, data):
+        return []
+
+    def test_query_count_does_not_grow(self):
+        results = run_cases(self.cases)
+        for row in results:
+            self.assertIn(row['status'], (200, 302), row)
+        self.assertEqual(growing_cases(results), {})
@@ -0,0 +1,191 @@
+"""
+Versiyalangan read-through kesh.
+
+Har bir payload kaliti u bog'liq bo'lgan obyektlar versiyalaridan quriladi,
+masalan [('user', 5), ('group', 3)]. Signal'lar o'zgarishda tegishli versiyani
+bump() orqali oshiradi, shuning uchun eski payload hech qachon o'qilmaydi va
+TIMEOUT o'tgach o'zi tozalanadi. Tranzaksiya ichidagi bump() commit'dan keyin
+takrorlanadi: aks holda parallel so'rov commit'dan oldingi ma'lumotdan qurilgan
+payload'ni yangi versiya ostida saqlab qo'yishi mumkin.
+
+bump() versiyani incr() bilan emas, har safar yangi tasodifiy qiymat yozib o'zgartiradi:
+FileBasedCache'da incr() o'qish-yozish bo'lib, ikki parallel bump bittaga qo'shilib ketadi.
+Backend settings.CACHES orqali almashtiriladi va barcha serverlar uchun umumiy bo'lishi
+kerak - check_shared_cache() LocMem va FileBasedCache'da ogohlantiradi.
+Hit/miss hisoblagichlari har bir o'qishga qo'shimcha yozuv qo'shadi, shuning uchun faqat
+CACHE_STATS_SAMPLE_RATE ulushidagi so'rovlar sanaladi (standart 0 - o'chirilgan).
+"""
+import hashlib
+import random
+import uuid
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+CACHE_ALIAS = 'default'
+DEFAULT_TIMEOUT = 60 * 10
+STATS_NAMES_KEY = 'cache-stats:names'
+
+# Payload kalitlari uchun umumiy scope'lar
+GLOBAL = ('global', 'all')
+
+_MISSING = object()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def check_shared_cache(app_configs=None, **kwargs):
+    """Deploy tekshiruvi: LocMem jarayon ichida, FileBasedCache bitta server diskida"""
+    if settings.DEBUG or not isinstance(get_cache(), (LocMemCache, FileBasedCache)):
+        return []
+    return [checks.Warning(
+        f"Versiyalangan kesh {type(get_cache()).__name__}'da: boshqa jarayon yoki serverlardagi "
+        "invalidatsiya hamma worker'larga yetib bormasligi mumkin.",
+        hint="CACHE_BACKEND ni RedisCache yoki PyMemcacheCache qiling.",
+        id='core.W001',
+    )]
+
+
+def version_key(scope, pk):
+    return f'version:{scope}:{pk}'
+
+
+def _new_version():
+    # Har safar yangi qiymat: kalit keshdan siqib chiqarilsa ham, parallel bump'lar ham
+    # eski payload'ni qayta ishlatmaydi
+    return uuid.uuid4().hex
+
+
+def get_versions(*depends_on):
+    """[(scope, pk), ...] uchun joriy versiyalar (bitta get_many bilan)"""
+    cache = get_cache()
+    keys = [version_key(scope, pk) for scope, pk in depends_on]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _new_version(), timeout=None)
+        found.update(cache.get_many(missing))
+    return [found[key] for key in keys]
+
+
+def bump(scope, *pks):
+    """
+    Berilgan obyektlarga bog'liq barcha payload'larni eskirgan deb belgilash.
+    Versiya darhol (shu tranzaksiyadagi keyingi o'qishlar uchun) va commit'dan keyin yana
+    oshiriladi; ochiq tranzaksiya bo'lmasa on_commit darhol bajariladi.
+    """
+    pks = set(pks)
+    if not pks:
+        return
+    if transaction.get_connection().in_atomic_block:
+        _bump(scope, pks)
+    transaction.on_commit(lambda: _bump(scope, pks))
+
+
+def _bump(scope, pks):
+    get_cache().set_many({version_key(scope, pk): _new_version() for pk in pks}, timeout=None)
+
+
+def invalidate(users=(), groups=()):
+    """O'quvchi/o'qituvchi, guruh va umumiy (admin) payload'larini eskirgan deb belgilash"""
+    bump('user', *users)
+    bump('group', *groups)
+    bump(*GLOBAL)
+
+
+def payload_key(name, depends_on=(), parts=()):
+    versions = get_versions(*depends_on)
+    raw = ':'.join(
+        [str(part) for part in parts]
+        + [f'{scope}.{pk}.{version}' for (scope, pk), version in zip(depends_on, versions)]
+    )
+    return f'payload:{name}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def cached(name, builder, depends_on=(), parts=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Read-through: payload keshda bo'lsa qaytariladi, aks holda builder() chaqirilib saqlanadi.
+    depends_on - versiyalari kalitga kiradigan (scope, pk) juftliklari,
+    parts - kalitni ajratuvchi qo'shimcha qiymatlar (filtr, sahifa va h.k.).
+    """
+    cache = get_cache()
+    key = payload_key(name, depends_on, parts)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.set(key, value, timeout)
+        if _sampled():
+            _count(name, 'misses')
+    elif _sampled():
+        _count(name, 'hits')
+    return value
+
+
+async def acached(name, builder, depends_on=(), parts=(), timeout=DEFAULT_TIMEOUT):
+    """cached() ning async varianti: builder() korutina qaytaradi (masalan, asyncio.gather)"""
+    cache = get_cache()
+    key = await sync_to_async(payload_key)(name, depends_on, parts)
+    value = await cache.aget(key, _MISSING)
+    if value is _MISSING:
+        value = await builder()
+        await cache.aset(key, value, timeout)
+        if _sampled():
+            await sync_to_async(_count)(name, 'misses')
+    elif _sampled():
+        await sync_to_async(_count)(name, 'hits')
+    return value
+
+
+def _sampled():
+    rate = settings.CACHE_STATS_SAMPLE_RATE
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+def _stats_key(name, kind):
+    return f'cache-stats:{name}:{kind}'
+
+
+def _count(name, kind):
+    cache = get_cache()
+    key = _stats_key(name, kind)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            names = set(cache.get(STATS_NAMES_KEY, ()))
+            if name not in names:
+                cache.set(STATS_NAMES_KEY, sorted(names | {name}), timeout=None)
+        else:
+            cache.incr(key)
+
+
+def hit_stats():
+    """Har bir payload nomi bo'yicha hit/miss hisoblagichlari (CACHE_STATS_SAMPLE_RATE ulushi)"""
+    cache = get_cache()
+    names = cache.get(STATS_NAMES_KEY, [])
+    counters = cache.get_many([_stats_key(name, kind) for name in names for kind in ('hits', 'misses')])
+    stats = {}
+    for name in names:
+        hits = counters.get(_stats_key(name, 'hits'), 0)
+        misses = counters.get(_stats_key(name, 'misses'), 0)
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'ratio': round(hits / total * 100, 1) if total else 0,
+        }
+    return stats
+
+
+def reset_stats():
+    cache = get_cache()
+    names = cache.get(STATS_NAMES_KEY, [])
+    cache.delete_many([_stats_key(name, kind) for name in names for kind in ('hits', 'misses')])
+    cache.delete(STATS_NAMES_KEY)
@@ -0,0 +1,22 @@
+"""
+Narxi settings orqali sozlanadigan parol hasherlari.
+
+Algoritm nomlari Django standartidagidek qoladi, shuning uchun mavjud hashlar
+o'qilaveradi. Narx (iteratsiyalar, scrypt work factor) yoki PASSWORD_HASHER
+o'zgarsa, must_update() True qaytaradi va User.check_password() parolni
+foydalanuvchi keyingi safar kirganda yangi sozlama bilan qayta hashlaydi.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', None) or ScryptPasswordHasher.work_factor
@@ -0,0 +1,174 @@
+"""
+So'rov darajasidagi vaqt va SQL o'lchovi.
+
+Har bir so'rov uchun umumiy vaqt, so'rovlar soni, SQL vaqti va eng ko'p takrorlangan
+SQL ifodasi (N+1 belgisi) URL nomi bo'yicha yoziladi. Natija REQUEST_TIMING_LOG asosidagi
+har bir worker'ning o'z fayliga (<nom>.<pid>.jsonl, hajm oshganda aylantiriladi) JSON qatorlar
+ko'rinishida qo'shiladi; REQUEST_TIMING_HEADER yoqilganda Server-Timing sarlavhasida ham qaytadi.
+Hisobot: manage.py request_timing_report
+
+So'rovlar har bir DB ulanishiga bir marta o'rnatiladigan execute_wrapper orqali joriy
+so'rovning (contextvar) hisoblagichiga yoziladi - shuning uchun async view'larning
+sync_to_async oqimlaridagi so'rovlar ham hisobga olinadi.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'[^']*'|\b\d+\b")
+
+_store = {}
+_recorder = ContextVar('request_timing_recorder', default=None)
+
+
+def normalize_sql(sql):
+    """Parametrlari bir-biridan farq qiladigan bir xil shakldagi so'rovlarni birlashtirish"""
+    return _LITERAL.sub('?', _IN_LIST.sub('IN (...)', sql))
+
+
+def worker_log_path(path, pid=None):
+    """Har bir jarayon o'z fayliga yozadi: aylantirish boshqa worker'ning faylini buzmaydi"""
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{pid or os.getpid()}{path.suffix}')
+
+
+def get_store():
+    """JSON qatorlar yoziladigan aylanma fayl logger'i (har bir fayl va jarayon uchun bir marta)"""
+    path = worker_log_path(settings.REQUEST_TIMING_LOG)
+    if path not in _store:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.REQUEST_TIMING_MAX_BYTES,
+            backupCount=settings.REQUEST_TIMING_BACKUPS,
+            encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger(f'hoowork.request_timing.{path.name}')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers = [handler]
+        _store[path] = logger
+    return _store[path]
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_hook, dispatch_uid='request_timing_query_hook')
+
+
+class QueryRecorder:
+    """connection.execute_wrapper: so'rovlar soni, umumiy vaqt va shakllar bo'yicha hisob"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        # DASHBOARD_PARALLEL_QUERIES: bitta so'rovning SQL'lari bir nechta oqimda bajariladi
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+                self.statements[normalize_sql(sql)] += 1
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            # ASGI'da async view'lar (SSE oqimi, dashboard'lar) sinxron oqimga o'tkazilmaydi
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.REQUEST_TIMING_ENABLED:
+            return self.get_response(request)
+
+        for conn in connections.all(initialized_only=True):
+            install_query_hook(conn)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, time.perf_counter() - started, recorder)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_TIMING_ENABLED:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, time.perf_counter() - started, recorder)
+
+    def finish(self, request, response, elapsed, recorder):
+        if settings.REQUEST_TIMING_HEADER:
+            # So'rovlar soni ichki ma'lumot - faqat DEBUG yoki sozlama bilan ko'rsatiladi
+            response['Server-Timing'] = ', '.join([
+                f'app;dur={elapsed * 1000:.1f}',
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+            ])
+        self.record(request, response, elapsed, recorder)
+        return response
+
+    def record(self, request, response, elapsed, recorder):
+        match = request.resolver_match
+        top_sql, top_count = recorder.statements.most_common(1)[0] if recorder.statements else ('', 0)
+        entry = {
+            'ts': timezone.now().isoformat(),
+            'view': match.view_name if match else '<unresolved>',
+            'method': request.method,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 2),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.duration * 1000, 2),
+            'top_sql': top_sql[:500],
+            'top_sql_count': top_count,
+        }
+        try:
+            get_store().info(json.dumps(entry))
+        except OSError:
+            # O'lchov yozilmasa ham so'rov javobi buzilmasligi kerak
+            pass
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import sys
+import tempfile
 from pathlib import Path
 import dj_database_url
 from dotenv import load_dotenv
@@ -21,6 +23,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Load environment variables
 load_dotenv(os.path.join(BASE_DIR, '.env'))
 
+# manage.py test ishlayaptimi (kesh va o'lchov logi test uchun jarayon ichida qoladi)
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -60,6 +65,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +87,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'homeworks.context_processors.notifications',
             ],
         },
     },
@@ -99,6 +106,65 @@ DATABASES = {
     )
 }
 
+# PostgreSQL ulanishlar puli (psycopg[pool]); pul bilan doimiy ulanishlar (CONN_MAX_AGE) ishlatilmaydi
+if os.getenv('DATABASE_POOL', 'False') == 'True' and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+    }
+
+# Async dashboard'lar (users/dashboards.py): ASGI deploy'da /student/ va /admin-panel/ async
+# view'larga ulanadi. PARALLEL_QUERIES har bir mustaqil so'rovni alohida ulanishda bajaradi -
+# faqat DATABASE_POOL bilan yoqing
+ASYNC_DASHBOARDS = os.getenv('ASYNC_DASHBOARDS', 'False') == 'True'
+DASHBOARD_PARALLEL_QUERIES = os.getenv('DASHBOARD_PARALLEL_QUERIES', 'False') == 'True'
+
+
+# Cache
+# Versiyalangan kesh (core/cache.py) bump'lari barcha gunicorn worker'lari va manage.py buyruqlariga
+# (check_deadlines, rebuild_stats, run_export_jobs) ko'rinishi kerak, shuning uchun standart backend
+# bitta server ichida umumiy FileBasedCache. Production uchun Redis:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1.
+# Jarayon ichidagi LocMem faqat testlarda - LocMem va FileBasedCache'da `manage.py check --deploy`
+# ogohlantiradi.
+
+if TESTING:
+    _default_cache = ('django.core.cache.backends.locmem.LocMemCache', 'hoowork')
+else:
+    _default_cache = (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(tempfile.gettempdir(), 'hoowork_cache'),
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', _default_cache[0]),
+        'LOCATION': os.getenv('CACHE_LOCATION', _default_cache[1]),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '600')),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', 'hoowork'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+        },
+    }
+}
+# cache_stats hit/miss hisoblagichlari uchun sanaladigan o'qishlar ulushi (0 - o'chirilgan, 1 - hammasi)
+CACHE_STATS_SAMPLE_RATE = float(os.getenv('CACHE_STATS_SAMPLE_RATE', '0'))
+
+
+# Request timing (core/middleware.py)
+# Har bir so'rov vaqti va SQL statistikasi REQUEST_TIMING_LOG asosidagi worker fayllariga
+# (<nom>.<pid>.jsonl) yoziladi: manage.py request_timing_report. Testlarda o'chiq.
+# Server-Timing sarlavhasi (so'rovlar soni bilan) faqat DEBUG'da yoki REQUEST_TIMING_HEADER=True bilan
+
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', str(not TESTING)) == 'True'
+REQUEST_TIMING_LOG = os.getenv(
+    'REQUEST_TIMING_LOG', os.path.join(tempfile.gettempdir(), 'hoowork', 'request_timing.jsonl')
+)
+REQUEST_TIMING_HEADER = os.getenv('REQUEST_TIMING_HEADER', str(DEBUG)) == 'True'
+REQUEST_TIMING_MAX_BYTES = int(os.getenv('REQUEST_TIMING_MAX_BYTES', str(10 * 1024 * 1024)))
+REQUEST_TIMING_BACKUPS = int(os.getenv('REQUEST_TIMING_BACKUPS', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -119,6 +185,45 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Notification retention (manage.py prune_notifications)
+# Shundan eski o'qilgan bildirishnomalar o'chiriladi; ARCHIVE_DIR berilsa oldin .jsonl.gz ga yoziladi
+
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', '90'))
+NOTIFICATION_ARCHIVE_DIR = os.getenv('NOTIFICATION_ARCHIVE_DIR', '')
+NOTIFICATIONS_PER_PAGE = 20
+# SSE oqimi (homeworks/stream.py, faqat ASGI): bir nechta worker'da DB shu oraliqda qayta tekshiriladi,
+# ulanish MAX_SECONDS dan keyin yopiladi va brauzer Last-Event-ID bilan qayta ulanadi
+NOTIFICATION_STREAM_POLL_SECONDS = int(os.getenv('NOTIFICATION_STREAM_POLL_SECONDS', '15'))
+NOTIFICATION_STREAM_MAX_SECONDS = int(os.getenv('NOTIFICATION_STREAM_MAX_SECONDS', '300'))
+
+
+# Excel export job'lari (homeworks/export_jobs.py) Procfile'dagi worker (run_export_jobs) tomonidan
+# bajariladi. Worker yo'q deploy'da True qiling - job so'rov ichida bajariladi
+EXPORT_JOBS_INLINE = os.getenv('EXPORT_JOBS_INLINE', 'False') == 'True'
+# Shundan uzoq RUNNING holatida qolgan job (worker o'lgan) qayta navbatga qo'yiladi, soniya
+EXPORT_JOB_TIMEOUT = int(os.getenv('EXPORT_JOB_TIMEOUT', '1800'))
+
+
+# Password hashing (core/hashers.py)
+# PASSWORD_HASHER yangi parollar uchun algoritm: pbkdf2 | scrypt | argon2 | bcrypt
+# (argon2 uchun argon2-cffi, bcrypt uchun bcrypt paketi kerak). Qolganlari eski hashlarni
+# tekshirish uchun ro'yxatda qoladi; algoritm yoki narx o'zgarsa parol login vaqtida qayta hashlanadi.
+
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'core.hashers.TunablePBKDF2PasswordHasher',
+    'scrypt': 'core.hashers.TunableScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+]
+# Bo'sh qoldirilsa Django standart qiymatlari ishlatiladi
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '0')) or None
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', '0')) or None
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -131,6 +236,7 @@ USE_I18N = True
 USE_TZ = True
 
 AUTH_USER_MODEL = 'users.User'
+AUTHENTICATION_BACKENDS = ['users.auth.LoginBackend']
 
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -145,9 +251,11 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # WhiteNoise storage optimization
+# Yuklangan fayllar kontent hash'i bo'yicha saqlanadi (core/storage.py); havolasizlarini
+# manage.py gc_files o'chiradi
 STORAGES = {
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "BACKEND": "core.storage.ContentAddressedStorage",
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -187,7 +295,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.StandardPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
@@ -0,0 +1,136 @@
+"""
+Kontent-manzilli fayl ombori (STORAGES['default']).
+
+Fayl nomi uning sha256 hash'idan quriladi: cas/ab/cd/<hash>/<asl nom>. Hash prefiksli
+ichma-ich papkalar bitta papkada yuz minglab fayl to'planishining oldini oladi, asl nom
+esa yuklab olishda va kengaytma bo'yicha Content-Type uchun saqlanadi. Bir xil kontent
+ikkinchi marta yozilmaydi - mavjud nom qaytariladi (masalan, har bir guruhga berilgan
+bir xil boshlang'ich fayl).
+
+Bitta faylga bir nechta FileField qiymati havola qilishi mumkin, shuning uchun delete()
+uni o'chirmaydi: havolalar soni homeworks.files da yuritiladi va havolasiz fayllarni
+gc_files buyrug'i purge() orqali o'chiradi. Prefiksdan tashqaridagi (eski) fayllar
+oddiy FileSystemStorage kabi ishlaydi.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.utils.text import get_valid_filename
+
+CONTENT_PREFIX = 'cas'
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+TEMP_PREFIX = '.tmp-'
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CONTENT_PREFIX + '/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def blob_directory(self, digest):
+        shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+        return posixpath.join(CONTENT_PREFIX, *shards, digest)
+
+    def find_blob(self, directory):
+        """Shu hash papkasida allaqachon saqlangan fayl nomi (yo'q bo'lsa None)"""
+        try:
+            entries = sorted(entry for entry in os.listdir(self.path(directory)) if not entry.startswith(TEMP_PREFIX))
+        except FileNotFoundError:
+            return None
+        return posixpath.join(directory, entries[0]) if entries else None
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+
+        directory = self.blob_directory(content_hash(content))
+        existing = self.find_blob(directory)
+        if existing is not None:
+            # gc_files yangi havola yozilguncha faylni "eski" deb hisoblamasin
+            os.utime(self.path(existing))
+            return existing
+
+        filename = get_valid_filename(posixpath.basename(name.replace('\\', '/'))) or 'file'
+        if max_length is not None:
+            room = max_length - len(directory) - 1
+            root, ext = os.path.splitext(filename)
+            if room < len(ext) + 1:
+                raise ValueError(f"Fayl nomi uchun joy yetarli emas (max_length={max_length}).")
+            filename = root[:room - len(ext)] + ext if len(filename) > room else filename
+        name = self._save(posixpath.join(directory, filename), content)
+        validate_file_name(name, allow_relative_path=True)
+        return name
+
+    def _save(self, name, content):
+        if not is_content_addressed(name):
+            return super()._save(name, content)
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        # Vaqtinchalik faylga yozib, so'ng atomar ko'chirish: bir xil kontentni parallel
+        # yuklagan so'rovlar bir-birining yarim yozilgan faylini ko'rmaydi
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in content.chunks():
+                    handle.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def delete(self, name):
+        if not is_content_addressed(name):
+            super().delete(name)
+
+    def purge(self, name):
+        """Faylni haqiqatan o'chirish va bo'shab qolgan hash/shard papkalarini tozalash"""
+        super().delete(name)
+        root = self.path(CONTENT_PREFIX)
+        directory = os.path.dirname(self.path(name))
+        while directory != root and directory.startswith(root):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+    def blobs(self):
+        """(nom, o'zgartirilgan vaqt - unix) - prefiks ostidagi barcha fayllar"""
+        root = self.path(CONTENT_PREFIX)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = posixpath.join(CONTENT_PREFIX, *os.path.relpath(path, root).split(os.sep))
+                try:
+                    yield name, os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
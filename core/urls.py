@@ -2,9 +2,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from users.views import login_view, logout_view, student_dashboard, teacher_dashboard, admin_dashboard
+from users.views import (
+    login_view, logout_view, student_dashboard, student_dashboard_async, teacher_dashboard,
+    admin_dashboard, admin_dashboard_async,
+)
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+# ASGI deploy'da dashboard'lar so'rovlarni bir vaqtda bajaradigan async view'lar bilan ishlaydi
+if settings.ASYNC_DASHBOARDS:
+    student_dashboard, admin_dashboard = student_dashboard_async, admin_dashboard_async
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('users/', include('users.urls')),
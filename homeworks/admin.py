@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Homework, Submission, Notification
+from .models import Homework, Submission, Notification, DeadlineCheckpoint, StudentGroupStats, ExportJob, StoredFile
 
 @admin.register(Homework)
 class HomeworkAdmin(admin.ModelAdmin):
@@ -19,3 +19,25 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('user__username', 'title', 'message')
 
+
+@admin.register(DeadlineCheckpoint)
+class DeadlineCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'processed_until', 'updated_at')
+
+@admin.register(StudentGroupStats)
+class StudentGroupStatsAdmin(admin.ModelAdmin):
+    list_display = ('student', 'group', 'submitted_count', 'graded_count', 'score_sum', 'homework_total', 'updated_at')
+    list_filter = ('group',)
+    search_fields = ('student__username',)
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'report_type', 'status', 'requested_by', 'created_at', 'finished_at')
+    list_filter = ('report_type', 'status')
+    readonly_fields = ('cache_key',)
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ('name', 'references', 'updated_at')
+    list_filter = ('references',)
+    search_fields = ('name',)
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class HomeworksConfig(AppConfig):
     name = 'homeworks'
+
+    def ready(self):
+        from django.core import checks
+        from core.cache import check_shared_cache
+        from . import signals  # noqa: F401
+        checks.register(check_shared_cache, checks.Tags.caches, deploy=True)
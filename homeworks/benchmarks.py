@@ -0,0 +1,22 @@
+"""View va export so'rovlari benchmark holatlari (homeworks tests va benchmark_views buyrug'i uchun umumiy)"""
+from django.urls import reverse
+from .export import export_all_submissions, export_course_report, export_group_report, save_workbook
+
+
+def cases(data):
+    """core.benchmark.generate_data natijasidan [(nom, foydalanuvchi, url yoki funksiya), ...]"""
+    teacher, student = data['teachers'][0], data['students'][0]
+    group, course, homework = data['groups'][0], data['courses'][0], data['homeworks'][0]
+    return [
+        ('homework_list_student', student, reverse('homework_list')),
+        ('homework_list_teacher', teacher, reverse('homework_list')),
+        ('homework_list_admin', data['admin'], reverse('homework_list')),
+        ('homework_detail_teacher', teacher, reverse('homework_detail', args=[homework.pk])),
+        ('homework_detail_student', student, reverse('homework_detail', args=[homework.pk])),
+        ('teacher_submissions', teacher, reverse('teacher_submissions')),
+        ('group_stats', teacher, reverse('group_stats', args=[group.pk])),
+        ('notifications', student, reverse('notifications')),
+        ('export_all', None, lambda: save_workbook(export_all_submissions())),
+        ('export_group', None, lambda: save_workbook(export_group_report(group.pk))),
+        ('export_course', None, lambda: save_workbook(export_course_report(course.pk))),
+    ]
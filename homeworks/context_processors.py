@@ -0,0 +1,19 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.functional import SimpleLazyObject
+from .notifications import unread_count
+
+
+def notifications(request):
+    """
+    Navbar badge: hisoblagich faqat shablon uni ishlatganda o'qiladi.
+    SSE oqimi faqat ASGI ostida ochiladi (WSGI'da notification_stream 204 qaytaradi) -
+    aks holda badge har sahifa yuklanganda shu hisoblagichdan yangilanadi.
+    """
+    stream_enabled = isinstance(request, ASGIRequest)
+    user = getattr(request, 'user', None)
+    if user is None:
+        return {'unread_notifications_count': 0, 'notification_stream_enabled': False}
+    return {
+        'unread_notifications_count': SimpleLazyObject(lambda: unread_count(user)),
+        'notification_stream_enabled': stream_enabled,
+    }
@@ -1,25 +1,37 @@
 """
 Excel Export funksiyalari - Admin uchun hisobotlar
+
+Workbook'lar write-only rejimda quriladi: qatorlar iterator() orqali bo'lak-bo'lak
+o'qilib, darhol diskka yoziladi, shuning uchun xotira sarfi topshiriqlar soniga bog'liq emas.
 """
-from io import BytesIO
-from django.http import HttpResponse
-from django.db.models import Avg
+from itertools import chain, islice
+from tempfile import SpooledTemporaryFile
+from django.http import FileResponse
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from .models import Homework, Submission
 from academy.models import Course, Group
-from users.models import User
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Ustun kengligi shuncha qatordan taxmin qilinadi
+WIDTH_SAMPLE_SIZE = 200
+ITERATOR_CHUNK_SIZE = 2000
+# Shu hajmgacha fayl xotirada, undan kattasi vaqtinchalik faylda saqlanadi
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
 
 
 def get_styled_workbook():
-    """Stillangan Excel workbook yaratish"""
-    wb = Workbook()
-    return wb
+    """Stillangan Excel workbook yaratish (write-only rejim)"""
+    return Workbook(write_only=True)
 
 
-def style_header_row(ws, row_num=1):
-    """Sarlavha qatorini stillash"""
+def header_cells(ws, values):
+    """Sarlavha qatori uchun stillangan cell'lar"""
     header_font = Font(bold=True, color="FFFFFF", size=11)
     header_fill = PatternFill(start_color="4A90D9", end_color="4A90D9", fill_type="solid")
     header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
@@ -29,33 +41,51 @@ def style_header_row(ws, row_num=1):
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
-    
-    for cell in ws[row_num]:
+
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
         cell.font = header_font
         cell.fill = header_fill
         cell.alignment = header_alignment
         cell.border = thin_border
+        cells.append(cell)
+    return cells
+
 
+def estimate_column_widths(rows):
+    """Ustun kengliklarini namunaviy qatorlardan taxmin qilish"""
+    widths = {}
+    for row in rows:
+        for index, value in enumerate(row, start=1):
+            length = len(str(value)) if value is not None else 0
+            widths[index] = max(widths.get(index, 0), length)
+    return {index: min(length + 2, 50) for index, length in widths.items()}
 
-def auto_adjust_columns(ws):
-    """Ustun kengliklarini avtomatik sozlash"""
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
+
+def write_sheet(ws, headers, rows, preamble=()):
+    """
+    Qatorlarni write-only varaqqa oqim tarzida yozish.
+    Kengliklar birinchi WIDTH_SAMPLE_SIZE qatordan hisoblanadi va ular
+    yozilishidan oldin o'rnatiladi (write-only rejim talabi).
+    """
+    rows = iter(rows)
+    sample = list(islice(rows, WIDTH_SAMPLE_SIZE))
+
+    for index, width in estimate_column_widths([headers] + sample).items():
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    for line in preamble:
+        ws.append(line)
+    ws.append(header_cells(ws, headers))
+    for row in chain(sample, rows):
+        ws.append(row)
 
 
 def export_all_submissions(course_id=None, group_id=None):
     """
     Barcha topshiriqlarni Excel formatda export qilish
-    
+
     Ustunlar:
     - O'quvchi ismi
     - Kurs
@@ -66,9 +96,8 @@ def export_all_submissions(course_id=None, group_id=None):
     - Status
     """
     wb = get_styled_workbook()
-    ws = wb.active
-    ws.title = "Natijalar"
-    
+    ws = wb.create_sheet("Natijalar")
+
     # Sarlavhalar
     headers = [
         "O'quvchi ismi",
@@ -81,72 +110,76 @@ def export_all_submissions(course_id=None, group_id=None):
         "Topshirilgan sana",
         "Baholangan sana"
     ]
-    ws.append(headers)
-    style_header_row(ws)
-    
+
     # Ma'lumotlarni olish
     submissions = Submission.objects.select_related(
         'student', 'homework', 'homework__group', 'homework__group__course'
     ).order_by('homework__group__course__name', 'homework__group__name', 'student__last_name')
-    
+
     if course_id:
         submissions = submissions.filter(homework__group__course_id=course_id)
     if group_id:
         submissions = submissions.filter(homework__group_id=group_id)
-    
-    for sub in submissions:
-        student_name = f"{sub.student.last_name} {sub.student.first_name}".strip() or sub.student.username
-        status = "Baholangan" if sub.is_graded else "Tekshirilmagan"
-        if sub.is_graded and sub.score_percent == 0:
-            status = "Topshirmagan (0%)"
-        
-        ws.append([
-            student_name,
-            sub.student.username,
-            sub.homework.group.course.name,
-            sub.homework.group.name,
-            sub.homework.title,
-            sub.score_percent if sub.is_graded else "-",
-            status,
-            sub.submitted_at.strftime("%d.%m.%Y %H:%M") if sub.submitted_at else "-",
-            sub.graded_at.strftime("%d.%m.%Y %H:%M") if sub.graded_at else "-"
-        ])
-    
-    auto_adjust_columns(ws)
-    
+
+    def submission_rows():
+        for sub in submissions.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            student_name = f"{sub.student.last_name} {sub.student.first_name}".strip() or sub.student.username
+            status = "Baholangan" if sub.is_graded else "Tekshirilmagan"
+            if sub.is_graded and sub.score_percent == 0:
+                status = "Topshirmagan (0%)"
+
+            yield [
+                student_name,
+                sub.student.username,
+                sub.homework.group.course.name,
+                sub.homework.group.name,
+                sub.homework.title,
+                sub.score_percent if sub.is_graded else "-",
+                status,
+                sub.submitted_at.strftime("%d.%m.%Y %H:%M") if sub.submitted_at else "-",
+                sub.graded_at.strftime("%d.%m.%Y %H:%M") if sub.graded_at else "-"
+            ]
+
+    write_sheet(ws, headers, submission_rows())
+
     # O'rtachalar sahifasi
     ws2 = wb.create_sheet("O'rtachalar")
     headers2 = ["O'quvchi", "Username", "Kurs", "Guruh", "Jami vazifalar", "Topshirganlar", "O'rtacha %"]
-    ws2.append(headers2)
-    style_header_row(ws2)
-    
-    # O'rtachalarni hisoblash
-    students = User.objects.filter(role='STUDENT')
-    for student in students:
-        for group in student.study_groups.all():
-            subs = Submission.objects.filter(
-                student=student, 
-                homework__group=group,
-                is_graded=True
-            )
-            total_hw = Homework.objects.filter(group=group).count()
-            submitted = subs.count()
-            avg = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
-            
+
+    # O'rtachalarni hisoblash: barcha (o'quvchi, guruh) juftliklari bitta pivot so'rovda
+    def average_rows():
+        Membership = Group.students.through
+        totals = dict(
+            Homework.objects.values('group_id').annotate(total=Count('id')).values_list('group_id', 'total')
+        )
+        graded = {
+            (row['student_id'], row['homework__group_id']): row
+            for row in Submission.objects.filter(is_graded=True).values(
+                'student_id', 'homework__group_id'
+            ).annotate(submitted=Count('id'), avg=Avg('score_percent'))
+        }
+        memberships = Membership.objects.filter(
+            user__role='STUDENT'
+        ).select_related('user', 'group__course').order_by('user_id', 'group_id')
+
+        for membership in memberships.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            student, group = membership.user, membership.group
+            total_hw = totals.get(group.pk, 0)
             if total_hw > 0:
+                row = graded.get((student.pk, group.pk), {})
                 student_name = f"{student.last_name} {student.first_name}".strip() or student.username
-                ws2.append([
+                yield [
                     student_name,
                     student.username,
                     group.course.name,
                     group.name,
                     total_hw,
-                    submitted,
-                    round(avg, 1)
-                ])
-    
-    auto_adjust_columns(ws2)
-    
+                    row.get('submitted', 0),
+                    round(row.get('avg') or 0, 1)
+                ]
+
+    write_sheet(ws2, headers2, average_rows())
+
     return wb
 
 
@@ -154,81 +187,97 @@ def export_group_report(group_id):
     """Guruh bo'yicha batafsil hisobot"""
     group = Group.objects.select_related('course').get(pk=group_id)
     wb = get_styled_workbook()
-    ws = wb.active
-    ws.title = f"{group.name}"
-    
+    ws = wb.create_sheet(f"{group.name}")
+
     # Ma'lumot
-    ws.append([f"Guruh: {group.name}"])
-    ws.append([f"Kurs: {group.course.name}"])
-    ws.append([])
-    
+    preamble = [
+        [f"Guruh: {group.name}"],
+        [f"Kurs: {group.course.name}"],
+        [],
+    ]
+
     # Sarlavhalar
-    homeworks = Homework.objects.filter(group=group).order_by('sequence')
+    homeworks = list(Homework.objects.filter(group=group).order_by('sequence'))
     headers = ["O'quvchi"] + [hw.title for hw in homeworks] + ["O'rtacha %"]
-    ws.append(headers)
-    style_header_row(ws, row_num=4)
-    
+
+    # Butun baholar matritsasi bitta so'rovda: (student_id, homework_id) -> ball
+    scores_by_cell = dict(
+        ((student_id, homework_id), score)
+        for student_id, homework_id, score in Submission.objects.filter(
+            homework__group=group, is_graded=True
+        ).values_list('student_id', 'homework_id', 'score_percent')
+    )
+
     # O'quvchilar va baholar
-    students = group.students.all().order_by('last_name')
-    for student in students:
-        row = [f"{student.last_name} {student.first_name}".strip() or student.username]
-        scores = []
-        for hw in homeworks:
-            sub = Submission.objects.filter(homework=hw, student=student).first()
-            if sub and sub.is_graded:
-                row.append(sub.score_percent)
-                scores.append(sub.score_percent)
-            else:
-                row.append("-")
-        
-        avg = sum(scores) / len(scores) if scores else 0
-        row.append(round(avg, 1))
-        ws.append(row)
-    
-    auto_adjust_columns(ws)
-    
+    def student_rows():
+        students = group.students.all().order_by('last_name')
+        for student in students.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            row = [f"{student.last_name} {student.first_name}".strip() or student.username]
+            scores = []
+            for hw in homeworks:
+                score = scores_by_cell.get((student.pk, hw.pk))
+                if score is not None:
+                    row.append(score)
+                    scores.append(score)
+                else:
+                    row.append("-")
+
+            avg = sum(scores) / len(scores) if scores else 0
+            row.append(round(avg, 1))
+            yield row
+
+    write_sheet(ws, headers, student_rows(), preamble=preamble)
+
     return wb
 
 
 def export_course_report(course_id):
     """Kurs bo'yicha umumiy hisobot"""
     course = Course.objects.get(pk=course_id)
-    groups = Group.objects.filter(course=course)
-    
+
+    # Guruh ko'rsatkichlari bitta annotate() so'rovida; o'quvchilar soni subquery
+    # orqali olinadi, aks holda students x submissions JOIN qatorlari ko'payadi
+    student_count = Group.students.through.objects.filter(
+        group=OuterRef('pk')
+    ).values('group').annotate(total=Count('pk')).values('total')
+    groups = Group.objects.filter(course=course).annotate(
+        student_count=Coalesce(Subquery(student_count), 0),
+        homework_count=Count('homeworks', distinct=True),
+        avg_score=Avg('homeworks__submissions__score_percent', filter=Q(homeworks__submissions__is_graded=True)),
+    )
+
     wb = get_styled_workbook()
-    ws = wb.active
-    ws.title = "Umumiy"
-    
-    ws.append([f"Kurs: {course.name}"])
-    ws.append([])
-    
+    ws = wb.create_sheet("Umumiy")
+
+    preamble = [
+        [f"Kurs: {course.name}"],
+        [],
+    ]
+
     headers = ["Guruh", "Talabalar soni", "Vazifalar soni", "O'rtacha %"]
-    ws.append(headers)
-    style_header_row(ws, row_num=3)
-    
-    for group in groups:
-        student_count = group.students.count()
-        hw_count = Homework.objects.filter(group=group).count()
-        
-        subs = Submission.objects.filter(homework__group=group, is_graded=True)
-        avg = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
-        
-        ws.append([group.name, student_count, hw_count, round(avg, 1)])
-    
-    auto_adjust_columns(ws)
-    
+
+    def group_rows():
+        for group in groups:
+            yield [group.name, group.student_count, group.homework_count, round(group.avg_score or 0, 1)]
+
+    write_sheet(ws, headers, group_rows(), preamble=preamble)
+
     return wb
 
 
-def workbook_to_response(wb, filename):
-    """Workbook'ni HTTP response sifatida qaytarish"""
-    output = BytesIO()
+def save_workbook(wb):
+    """Workbook'ni vaqtinchalik faylga yozib, boshiga qaytarilgan fayl obyektini qaytarish"""
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
     wb.save(output)
     output.seek(0)
-    
-    response = HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return output
+
+
+def workbook_to_response(wb, filename):
+    """Workbook'ni HTTP response sifatida qaytarish (fayl bo'laklab uzatiladi)"""
+    return FileResponse(
+        save_workbook(wb),
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
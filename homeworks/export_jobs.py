@@ -0,0 +1,149 @@
+"""
+Excel hisobotlarni fon rejimida tayyorlash.
+
+Har bir so'rov (hisobot turi, filtrlar, ma'lumot versiyasi) bo'yicha hash qilinadi.
+Ma'lumot o'zgarmagan bo'lsa, avval tayyorlangan fayl qayta beriladi; aks holda
+yangi ExportJob navbatga qo'yiladi va run_export_jobs buyrug'i (Procfile: worker) uni bajaradi.
+Worker ishga tushirilmagan deploy'da EXPORT_JOBS_INLINE job'ni so'rov ichida bajaradi.
+Worker jarayoni o'lib qolsa (OOM, kill) job RUNNING da qoladi - EXPORT_JOB_TIMEOUT dan
+eski bunday job'lar yana navbatdagi hisoblanadi.
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from academy.models import Course, Group
+from core.cache import GLOBAL, get_versions
+from .models import ExportJob, Homework, Submission
+from .export import export_all_submissions, export_group_report, export_course_report, save_workbook
+
+logger = logging.getLogger(__name__)
+
+
+def data_version():
+    """
+    Hisobotlarga ta'sir qiladigan ma'lumotlarning arzon "versiyasi".
+    Topshiriq qo'shilsa, baholansa yoki vazifa o'zgarsa qiymat o'zgaradi. Nomlar (vazifa,
+    guruh, kurs, o'quvchi) o'zgarishi sonlarga ta'sir qilmaydi, shuning uchun signal'lar
+    oshiradigan umumiy kesh versiyasi (core.cache GLOBAL) ham qo'shiladi.
+    """
+    submissions = Submission.objects.aggregate(
+        count=Count('id'),
+        last_id=Max('id'),
+        last_graded=Max('graded_at'),
+    )
+    homeworks = Homework.objects.aggregate(count=Count('id'), last_id=Max('id'))
+    memberships = Group.students.through.objects.aggregate(count=Count('id'), last_id=Max('id'))
+    return json.dumps([submissions, homeworks, memberships, get_versions(GLOBAL)], sort_keys=True, default=str)
+
+
+def job_cache_key(report_type, filters, version):
+    payload = json.dumps([report_type, filters, version], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def report_filename(report_type, filters):
+    if report_type == ExportJob.ReportType.GROUP:
+        group = Group.objects.get(pk=filters['group_id'])
+        return f"hoowork_{group.name}_hisobot.xlsx"
+    if report_type == ExportJob.ReportType.COURSE:
+        course = Course.objects.get(pk=filters['course_id'])
+        return f"hoowork_{course.name}_hisobot.xlsx"
+
+    if filters.get('group_id'):
+        group = Group.objects.get(pk=filters['group_id'])
+        return f"hoowork_{group.name}_natijalar.xlsx"
+    if filters.get('course_id'):
+        course = Course.objects.get(pk=filters['course_id'])
+        return f"hoowork_{course.name}_natijalar.xlsx"
+    return "hoowork_natijalar.xlsx"
+
+
+def claimable():
+    """Navbatdagi job'lar: PENDING va worker'i o'lib qolgan (eskirgan RUNNING)"""
+    stale = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    return Q(status=ExportJob.Status.PENDING) | Q(status=ExportJob.Status.RUNNING, started_at__lt=stale)
+
+
+def request_export(report_type, filters, user):
+    """
+    Hisobot uchun ExportJob qaytaradi. Ma'lumot versiyasi o'zgarmagan bo'lsa
+    mavjud (tayyor yoki navbatdagi) job qayta ishlatiladi.
+    """
+    filters = {key: value for key, value in filters.items() if value}
+    key = job_cache_key(report_type, filters, data_version())
+    job, created = ExportJob.objects.get_or_create(
+        cache_key=key,
+        defaults={
+            'report_type': report_type,
+            'filters': filters,
+            'filename': report_filename(report_type, filters),
+            'requested_by': user,
+        }
+    )
+    if job.status != ExportJob.Status.DONE:
+        # Xatolik bilan tugagan yoki worker'i o'lib qolgan job'ni qayta navbatga qo'yish
+        requeue = Q(status=ExportJob.Status.FAILED) | claimable()
+        if ExportJob.objects.filter(requeue, pk=job.pk).update(status=ExportJob.Status.PENDING, error=''):
+            job.status = ExportJob.Status.PENDING
+    if settings.EXPORT_JOBS_INLINE and job.status == ExportJob.Status.PENDING and claim_job(job.pk):
+        run_job(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def build_workbook(job):
+    filters = job.filters
+    if job.report_type == ExportJob.ReportType.GROUP:
+        return export_group_report(filters['group_id'])
+    if job.report_type == ExportJob.ReportType.COURSE:
+        return export_course_report(filters['course_id'])
+    return export_all_submissions(
+        course_id=filters.get('course_id'),
+        group_id=filters.get('group_id')
+    )
+
+
+def claim_job(job_id):
+    """Job'ni RUNNING holatiga o'tkazish; boshqa worker olgan bo'lsa False"""
+    return ExportJob.objects.filter(claimable(), pk=job_id).update(
+        status=ExportJob.Status.RUNNING, started_at=timezone.now()
+    ) == 1
+
+
+def fail_job(job_id, error):
+    """Worker jarayoni natija qaytarmagan job'ni FAILED deb belgilash (DONE bo'lsa tegilmaydi)"""
+    ExportJob.objects.filter(pk=job_id, status=ExportJob.Status.RUNNING).update(
+        status=ExportJob.Status.FAILED, error=str(error) or type(error).__name__, finished_at=timezone.now()
+    )
+    return ExportJob.Status.FAILED
+
+
+def run_job(job_id):
+    """Oldindan claim qilingan job uchun hisobotni yaratib MEDIA_ROOT ga saqlash"""
+    job = ExportJob.objects.get(pk=job_id)
+    try:
+        output = save_workbook(build_workbook(job))
+        with output:
+            job.file.save(f"{job.cache_key}.xlsx", File(output), save=False)
+    except Exception as exc:
+        logger.exception("Export job %s failed", job_id)
+        job.status = ExportJob.Status.FAILED
+        job.error = str(exc)
+    else:
+        job.status = ExportJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'error', 'finished_at'])
+    return job.status
+
+
+def can_access(job, user):
+    if user.role == 'ADMIN' or job.requested_by_id == user.pk:
+        return True
+    if user.role == 'TEACHER' and job.report_type == ExportJob.ReportType.GROUP:
+        return Group.objects.filter(pk=job.filters.get('group_id'), teachers=user).exists()
+    return False
@@ -1,39 +1,49 @@
 """
 Admin uchun Excel Export Views
+
+Hisobotlar so'rov ichida qurilmaydi: ExportJob navbatga qo'yiladi, sahifa holatni
+so'rab turadi va fayl tayyor bo'lgach yuklab olinadi.
 """
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import get_object_or_404
-from django.http import HttpResponseForbidden
-from .export import (
-    export_all_submissions, export_group_report, 
-    export_course_report, workbook_to_response
-)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.http import FileResponse, Http404, HttpResponseForbidden, JsonResponse
+from django.urls import reverse
+from .models import ExportJob
+from .export import XLSX_CONTENT_TYPE
+from .export_jobs import request_export, can_access
 from academy.models import Course, Group
 
 
+def _int_or_none(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _job_redirect(job):
+    if job.status == ExportJob.Status.DONE and job.file:
+        return redirect('export_job_download', pk=job.pk)
+    return redirect('export_job_detail', pk=job.pk)
+
+
 @login_required
 def export_all_view(request):
     """Barcha natijalarni export qilish"""
     if request.user.role != 'ADMIN':
         return HttpResponseForbidden("Faqat Admin yuklab olishi mumkin.")
-    
-    course_id = request.GET.get('course')
-    group_id = request.GET.get('group')
-    
-    wb = export_all_submissions(
-        course_id=course_id if course_id else None,
-        group_id=group_id if group_id else None
-    )
-    
-    filename = "hoowork_natijalar.xlsx"
-    if group_id:
-        group = Group.objects.get(pk=group_id)
-        filename = f"hoowork_{group.name}_natijalar.xlsx"
-    elif course_id:
-        course = Course.objects.get(pk=course_id)
-        filename = f"hoowork_{course.name}_natijalar.xlsx"
-    
-    return workbook_to_response(wb, filename)
+
+    filters = {
+        'course_id': _int_or_none(request.GET.get('course')),
+        'group_id': _int_or_none(request.GET.get('group')),
+    }
+    if filters['group_id']:
+        get_object_or_404(Group, pk=filters['group_id'])
+    elif filters['course_id']:
+        get_object_or_404(Course, pk=filters['course_id'])
+
+    job = request_export(ExportJob.ReportType.ALL, filters, request.user)
+    return _job_redirect(job)
 
 
 @login_required
@@ -41,18 +51,16 @@ def export_group_view(request, group_id):
     """Guruh hisobotini export qilish"""
     if request.user.role not in ['ADMIN', 'TEACHER']:
         return HttpResponseForbidden("Ruxsat yo'q.")
-    
+
     group = get_object_or_404(Group, pk=group_id)
-    
+
     # Teacher faqat o'z guruhlarini
     if request.user.role == 'TEACHER':
         if not group.teachers.filter(id=request.user.id).exists():
             return HttpResponseForbidden("Bu sizning guruhingiz emas.")
-    
-    wb = export_group_report(group_id)
-    filename = f"hoowork_{group.name}_hisobot.xlsx"
-    
-    return workbook_to_response(wb, filename)
+
+    job = request_export(ExportJob.ReportType.GROUP, {'group_id': group.pk}, request.user)
+    return _job_redirect(job)
 
 
 @login_required
@@ -60,9 +68,51 @@ def export_course_view(request, course_id):
     """Kurs hisobotini export qilish"""
     if request.user.role != 'ADMIN':
         return HttpResponseForbidden("Faqat Admin yuklab olishi mumkin.")
-    
+
     course = get_object_or_404(Course, pk=course_id)
-    wb = export_course_report(course_id)
-    filename = f"hoowork_{course.name}_hisobot.xlsx"
-    
-    return workbook_to_response(wb, filename)
+    job = request_export(ExportJob.ReportType.COURSE, {'course_id': course.pk}, request.user)
+    return _job_redirect(job)
+
+
+def _get_job(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk)
+    if not can_access(job, request.user):
+        raise Http404
+    return job
+
+
+@login_required
+def export_job_detail(request, pk):
+    """Hisobot tayyorlanish holati sahifasi"""
+    job = _get_job(request, pk)
+    return render(request, 'homeworks/export_job.html', {'job': job})
+
+
+@login_required
+def export_job_status(request, pk):
+    """Holatni JSON ko'rinishida qaytarish (sahifa shu endpointni so'rab turadi)"""
+    job = _get_job(request, pk)
+    data = {
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'error': job.error,
+        'download_url': None,
+    }
+    if job.status == ExportJob.Status.DONE and job.file:
+        data['download_url'] = reverse('export_job_download', kwargs={'pk': job.pk})
+    return JsonResponse(data)
+
+
+@login_required
+def export_job_download(request, pk):
+    """Tayyor hisobot faylini yuklab berish"""
+    job = _get_job(request, pk)
+    if job.status != ExportJob.Status.DONE or not job.file:
+        return redirect('export_job_detail', pk=job.pk)
+
+    return FileResponse(
+        job.file.open('rb'),
+        as_attachment=True,
+        filename=job.filename,
+        content_type=XLSX_CONTENT_TYPE
+    )
@@ -0,0 +1,113 @@
+"""
+Kontent-manzilli fayllar (core.storage) havolalari soni va axlat yig'ish.
+
+StoredFile.references - shu faylga havola qilayotgan FILE_FIELDS qiymatlari soni.
+Bitta save()/delete() signal orqali (homeworks/signals.py) hisobga olinadi; bulk yo'llar
+yoki qo'lda o'zgartirishlardan keyin recount_references() sonlarni qaytadan quradi.
+collect_garbage() havolasiz va GRACE davridan eski fayllarni o'chiradi: fayl storage.save()
+va model save() orasida hali havolasiz bo'ladi, shuning uchun yangi fayllarga tegilmaydi.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from core.storage import CONTENT_PREFIX, is_content_addressed
+from .models import ExportJob, Homework, StoredFile, Submission
+
+FILE_FIELDS = [(Homework, 'file'), (Submission, 'file'), (ExportJob, 'file')]
+DEFAULT_GRACE = timedelta(hours=24)
+BATCH_SIZE = 500
+
+
+def change_references(deltas):
+    """{nom: +n yoki -n}. Faqat kontent-manzilli nomlar hisobga olinadi"""
+    deltas = {name: delta for name, delta in deltas.items() if delta and is_content_addressed(name)}
+    if not deltas:
+        return
+    now = timezone.now()
+    StoredFile.objects.bulk_create(
+        [StoredFile(name=name, updated_at=now) for name, delta in deltas.items() if delta > 0],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    by_delta = defaultdict(list)
+    for name, delta in deltas.items():
+        by_delta[delta].append(name)
+    for delta, names in by_delta.items():
+        for start in range(0, len(names), BATCH_SIZE):
+            StoredFile.objects.filter(name__in=names[start:start + BATCH_SIZE]).update(
+                references=Greatest(F('references') + delta, 0), updated_at=now
+            )
+
+
+def referenced_files():
+    """Barcha FILE_FIELDS qiymatlari bo'yicha {nom: havolalar soni}"""
+    counts = Counter()
+    for model, field in FILE_FIELDS:
+        names = model.objects.filter(**{f'{field}__startswith': CONTENT_PREFIX + '/'}).values_list(field, flat=True)
+        counts.update(names.iterator())
+    return counts
+
+
+@transaction.atomic
+def recount_references():
+    """StoredFile jadvalini FileField qiymatlaridan qayta qurish. Qaytaradi: tuzatilgan qatorlar soni"""
+    counts = referenced_files()
+    current = dict(StoredFile.objects.values_list('name', 'references'))
+    now = timezone.now()
+    StoredFile.objects.bulk_create(
+        [StoredFile(name=name, references=0, updated_at=now) for name in counts.keys() - current.keys()],
+        batch_size=BATCH_SIZE
+    )
+    changed = 0
+    by_count = defaultdict(list)
+    for name in counts.keys() | current.keys():
+        if counts.get(name, 0) != current.get(name):
+            by_count[counts.get(name, 0)].append(name)
+            changed += 1
+    for references, names in by_count.items():
+        for start in range(0, len(names), BATCH_SIZE):
+            StoredFile.objects.filter(name__in=names[start:start + BATCH_SIZE]).update(
+                references=references, updated_at=now
+            )
+    return changed
+
+
+def garbage(storage=None, grace=DEFAULT_GRACE, now=None):
+    """O'chirishga nomzodlar: (nom, hajm) - havolasiz va grace'dan eski fayllar"""
+    storage = storage or default_storage
+    cutoff = ((now or timezone.now()) - grace).timestamp()
+    referenced = set(StoredFile.objects.filter(references__gt=0).values_list('name', flat=True))
+    for name, modified in storage.blobs():
+        if name not in referenced and modified < cutoff:
+            yield name, storage.size(name)
+
+
+def collect_garbage(storage=None, grace=DEFAULT_GRACE, dry_run=False, now=None):
+    """
+    Havolasiz fayllarni o'chirish. Qaytaradi: {'files', 'bytes', 'rows'}.
+    Fayl o'chirishdan oldin uning StoredFile qatori references=0 sharti bilan o'chiriladi -
+    oraliqda yangi havola paydo bo'lsa fayl qoldiriladi.
+    """
+    storage = storage or default_storage
+    report = {'files': 0, 'bytes': 0, 'rows': 0}
+    for name, size in list(garbage(storage, grace, now)):
+        if not dry_run:
+            StoredFile.objects.filter(name=name, references=0).delete()
+            if StoredFile.objects.filter(name=name).exists():
+                continue
+            storage.purge(name)
+        report['files'] += 1
+        report['bytes'] += size
+
+    # Fayli yo'q, havolasiz qatorlar
+    missing = [name for name in StoredFile.objects.filter(references=0).values_list('name', flat=True)
+               if not storage.exists(name)]
+    report['rows'] = len(missing)
+    if missing and not dry_run:
+        for start in range(0, len(missing), BATCH_SIZE):
+            StoredFile.objects.filter(name__in=missing[start:start + BATCH_SIZE], references=0).delete()
+    return report
@@ -129,3 +129,50 @@ class GradeSubmissionForm(forms.ModelForm):
         labels = {
             'teacher_comment': "O'qituvchi izohi",
         }
+
+
+class BulkGradeForm(forms.Form):
+    """Bitta vazifaning barcha topshiriqlarini bir sahifada baholash (har bir topshiriq - bitta qator)"""
+
+    def __init__(self, *args, submissions=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submissions = list(submissions)
+        for submission in self.submissions:
+            self.fields[f'score_{submission.pk}'] = forms.IntegerField(
+                min_value=0,
+                max_value=100,
+                required=False,
+                initial=submission.score_percent if submission.is_graded else None,
+                widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': '0-100', 'min': 0, 'max': 100})
+            )
+            self.fields[f'comment_{submission.pk}'] = forms.CharField(
+                required=False,
+                initial=submission.teacher_comment,
+                widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Izoh (ixtiyoriy)'})
+            )
+
+    def rows(self):
+        """Shablon uchun: (topshiriq, ball maydoni, izoh maydoni)"""
+        for submission in self.submissions:
+            yield submission, self[f'score_{submission.pk}'], self[f'comment_{submission.pk}']
+
+    def entries(self):
+        """
+        Ball kiritilgan va o'zgargan qatorlar: [(submission_id, ball, izoh), ...].
+        Oldindan to'ldirilgan, o'zgartirilmagan baholar qayta yuborilmaydi (graded_at va
+        bildirishnoma takrorlanmasin).
+        """
+        entries = []
+        for submission in self.submissions:
+            score = self.cleaned_data.get(f'score_{submission.pk}')
+            comment = self.cleaned_data.get(f'comment_{submission.pk}', '')
+            if score is None:
+                continue
+            unchanged = (
+                submission.is_graded
+                and score == submission.score_percent
+                and comment == (submission.teacher_comment or '')
+            )
+            if not unchanged:
+                entries.append((submission.pk, score, comment))
+        return entries
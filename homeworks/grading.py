@@ -0,0 +1,94 @@
+"""
+Ko'p topshiriqni bitta tranzaksiyada baholash.
+
+bulk_grade() ruxsatni har bir guruh uchun bitta so'rovda tekshiradi, baholarni
+bulk_update bilan yozadi va GRADED bildirishnomalarini notifications.notify() orqali
+bitta bulk_create bilan yaratadi. bulk_update signal yubormagani uchun statistika,
+reyting va dashboard keshlari shu yerda yangilanadi.
+"""
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.utils import timezone
+from academy.models import Group
+from core import cache as payload_cache
+from .models import Notification, Submission
+from .notifications import notify
+from .stats import refresh_stats
+from . import leaderboard
+
+GRADE_FIELDS = ['score_percent', 'teacher_comment', 'is_graded', 'graded_at', 'graded_by']
+MAX_BULK_GRADES = 500
+
+
+def graded_notification(submission):
+    return Notification(
+        user_id=submission.student_id,
+        notification_type=Notification.NotificationType.GRADED,
+        title='Vazifangiz baholandi',
+        message=f'"{submission.homework.title}" vazifangiz baholandi. Ball: {submission.score_percent}%',
+        related_homework=submission.homework
+    )
+
+
+def _clean_entries(entries):
+    """(submission_id, ball, izoh) ro'yxatini tekshirish: {submission_id: (ball, izoh)}"""
+    cleaned = {}
+    for submission_id, score, comment in entries:
+        if submission_id in cleaned:
+            raise ValidationError(f'Topshiriq #{submission_id} bir necha marta berilgan.')
+        if not isinstance(score, int) or not 0 <= score <= 100:
+            raise ValidationError(f'Topshiriq #{submission_id}: ball 0 dan 100 gacha bo\'lishi kerak.')
+        cleaned[submission_id] = (score, comment)
+    if not cleaned:
+        raise ValidationError('Baholash uchun topshiriq berilmagan.')
+    if len(cleaned) > MAX_BULK_GRADES:
+        raise ValidationError(f'Bir so\'rovda ko\'pi bilan {MAX_BULK_GRADES} ta topshiriq baholanadi.')
+    return cleaned
+
+
+def check_grader(grader, group_ids):
+    """Admin hamma guruhni, o'qituvchi faqat o'zi dars beradigan guruhlarni baholaydi"""
+    if grader.role == 'ADMIN':
+        return
+    if grader.role != 'TEACHER':
+        raise PermissionDenied("Sizda baholash huquqi yo'q.")
+    allowed = set(Group.objects.filter(pk__in=group_ids, teachers=grader).values_list('pk', flat=True))
+    if set(group_ids) - allowed:
+        raise PermissionDenied("Ba'zi topshiriqlar siz dars bermaydigan guruhlarga tegishli.")
+
+
+def bulk_grade(grader, entries):
+    """
+    entries - (submission_id, ball, izoh) lar. Izoh None bo'lsa avvalgisi saqlanadi.
+    Qaytaradi: baholangan Submission obyektlari ro'yxati.
+    """
+    cleaned = _clean_entries(entries)
+    submissions = list(
+        Submission.objects.select_related('homework').filter(pk__in=cleaned).order_by('pk')
+    )
+    missing = set(cleaned) - {submission.pk for submission in submissions}
+    if missing:
+        raise ValidationError(f'Topshiriqlar topilmadi: {", ".join(map(str, sorted(missing)))}')
+
+    group_ids = {submission.homework.group_id for submission in submissions}
+    check_grader(grader, group_ids)
+
+    now = timezone.now()
+    for submission in submissions:
+        score, comment = cleaned[submission.pk]
+        submission.score_percent = score
+        if comment is not None:
+            submission.teacher_comment = comment
+        submission.is_graded = True
+        submission.graded_at = now
+        submission.graded_by = grader
+
+    pairs = {(submission.student_id, submission.homework.group_id) for submission in submissions}
+    with transaction.atomic():
+        Submission.objects.bulk_update(submissions, GRADE_FIELDS, batch_size=MAX_BULK_GRADES)
+        notify([graded_notification(submission) for submission in submissions])
+        refresh_stats(pairs)
+
+    leaderboard.invalidate()
+    payload_cache.invalidate(users={student_id for student_id, _ in pairs}, groups=group_ids)
+    return submissions
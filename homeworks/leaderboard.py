@@ -0,0 +1,89 @@
+"""
+O'quvchilar reytingi (leaderboard).
+
+Reyting bitta annotate(...).order_by(...)[offset:limit] so'rovi bilan hisoblanadi,
+backend qo'llasa o'rin Window(Rank()) orqali SQL ichida beriladi. Natijalar
+core.cache orqali keshlanadi; har qanday baholash 'leaderboard' versiyasini oshiradi
+va eski yozuvlar avtomatik ravishda ishlatilmay qoladi.
+"""
+from django.db import connection
+from django.db.models import Avg, Count, Exists, F, OuterRef, Q, Window
+from django.db.models.functions import Rank
+from academy.models import Group
+from core.cache import bump, cached
+from users.models import User
+
+CACHE_TIMEOUT = 60 * 10
+DEPENDS_ON = [('leaderboard', 'all')]
+
+
+def invalidate():
+    """Baholash o'zgarganda chaqiriladi"""
+    bump('leaderboard', 'all')
+
+
+def leaderboard_queryset(course_id=None, group_id=None):
+    """Faol o'quvchilar baholangan topshiriqlari o'rtachasi bo'yicha kamayish tartibida"""
+    graded = Q(submissions__is_graded=True)
+    students = User.objects.filter(role='STUDENT', is_active=True)
+
+    membership = Group.students.through.objects.filter(user=OuterRef('pk'))
+    if group_id:
+        graded &= Q(submissions__homework__group_id=group_id)
+        students = students.filter(Exists(membership.filter(group_id=group_id)))
+    elif course_id:
+        graded &= Q(submissions__homework__group__course_id=course_id)
+        students = students.filter(Exists(membership.filter(group__course_id=course_id)))
+
+    queryset = students.annotate(
+        avg_score=Avg('submissions__score_percent', filter=graded),
+        graded_count=Count('submissions', filter=graded),
+    ).filter(graded_count__gt=0)
+
+    if connection.features.supports_over_clause:
+        queryset = queryset.annotate(rank=Window(Rank(), order_by=F('avg_score').desc()))
+    return queryset.order_by('-avg_score', 'id')
+
+
+def _entry(student, rank, group_id=None):
+    groups = student.study_groups.all()
+    if group_id:
+        groups = [g for g in groups if g.pk == int(group_id)]
+    group = groups[0] if groups else None
+    return {
+        'id': student.id,
+        'username': student.username,
+        'first_name': student.first_name,
+        'last_name': student.last_name,
+        'full_name': student.get_full_name(),
+        'avg_score': round(student.avg_score, 1),
+        'graded_count': student.graded_count,
+        'rank': rank,
+        'group_name': group.name if group else None,
+    }
+
+
+def get_leaderboard(course_id=None, group_id=None, offset=0, limit=10):
+    """Reytingning [offset, offset + limit) oralig'i (keshlangan)"""
+    def build():
+        students = leaderboard_queryset(course_id, group_id).prefetch_related('study_groups')
+        return [
+            _entry(student, getattr(student, 'rank', offset + index + 1), group_id)
+            for index, student in enumerate(students[offset:offset + limit])
+        ]
+
+    return cached(
+        'leaderboard', build, depends_on=DEPENDS_ON,
+        parts=(course_id, group_id, offset, limit), timeout=CACHE_TIMEOUT
+    )
+
+
+def get_leaderboard_count(course_id=None, group_id=None):
+    return cached(
+        'leaderboard_count', lambda: leaderboard_queryset(course_id, group_id).count(),
+        depends_on=DEPENDS_ON, parts=(course_id, group_id), timeout=CACHE_TIMEOUT
+    )
+
+
+def top_students(limit=5):
+    return get_leaderboard(limit=limit)
@@ -0,0 +1,64 @@
+from urllib.parse import urlparse
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmark import http_burst, http_login
+from .request_timing_report import percentile
+
+
+def parse_pair(value, separator):
+    name, sep, rest = value.partition(separator)
+    if not sep or not name or not rest:
+        raise CommandError(f"Noto'g'ri qiymat: {value}")
+    return name, rest
+
+
+class Command(BaseCommand):
+    help = (
+        "Dashboard'larning p50/p95 kechikishini ishlab turgan serverlarda solishtirish. Masalan:\n"
+        "  gunicorn core.wsgi -w 4 -b :8000\n"
+        "  ASYNC_DASHBOARDS=True gunicorn core.asgi -k uvicorn.workers.UvicornWorker -w 4 -b :8001\n"
+        "  manage.py benchmark_dashboards --target wsgi=http://127.0.0.1:8000 "
+        "--target asgi=http://127.0.0.1:8001 --user admin:parol --user talaba:parol"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True,
+                            help="nom=URL, masalan wsgi=http://127.0.0.1:8000 (bir necha marta)")
+        parser.add_argument('--user', action='append', required=True,
+                            help="username:parol - shu foydalanuvchining dashboard'i o'lchanadi (bir necha marta)")
+        parser.add_argument('--requests', type=int, default=200, help="Har bir dashboard uchun so'rovlar soni")
+        parser.add_argument('--concurrency', type=int, default=16, help="Bir vaqtdagi so'rovlar soni")
+
+    def handle(self, *args, **options):
+        targets = [parse_pair(value, '=') for value in options['target']]
+        users = [parse_pair(value, ':') for value in options['user']]
+
+        rows = []
+        for target, base_url in targets:
+            for username, password in users:
+                try:
+                    opener, url = http_login(base_url, username, password)
+                except (ValueError, OSError) as exc:
+                    raise CommandError(f"{target}: {exc}")
+                # Birinchi so'rov keshni to'ldiradi - o'lchanadigani barqaror holat
+                http_burst(opener, url, requests=1, concurrency=1)
+                burst = http_burst(opener, url, options['requests'], options['concurrency'])
+                rows.append({
+                    'target': target,
+                    'path': urlparse(url).path,
+                    'per_second': burst['per_second'],
+                    'p50': percentile(burst['latencies_ms'], 50),
+                    'p95': percentile(burst['latencies_ms'], 95),
+                    'failed': burst['failed'],
+                })
+
+        self.stdout.write(
+            f"{options['requests']} ta so'rov, {options['concurrency']} ta parallel\n"
+            f"{'target':<10} {'dashboard':<16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'failed':>7}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['target']:<10} {row['path']:<16} {row['per_second']:>8} "
+                f"{row['p50']:>8} {row['p95']:>8} {row['failed']:>7}"
+            )
+            if row['failed']:
+                self.stdout.write(self.style.ERROR(f"{row['target']} {row['path']}: {row['failed']} ta so'rov xato"))
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from core.benchmark import login_burst, measure
+from users.models import User
+from .request_timing_report import percentile
+
+PASSWORD = 'benchmark-parol-123'
+
+
+def available_hashers(names):
+    """Kutubxonasi o'rnatilgan hasherlar: {nom: yo'l}"""
+    hashers = {}
+    for name in names:
+        path = settings.PASSWORD_HASHER_CHOICES[name]
+        hasher = import_string(path)()
+        if hasher.library:
+            try:
+                hasher._load_library()
+            except ValueError:
+                continue
+        hashers[name] = path
+    return hashers
+
+
+class Command(BaseCommand):
+    help = ("Login yo'lini har bir parol hasheri bilan o'lchash: bitta login so'rovi (so'rovlar soni, vaqt) "
+            "va bir vaqtda kirayotgan o'quvchilar to'lqini (vaqtinchalik test DB'da)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50, help="To'lqindagi loginlar soni")
+        parser.add_argument('--concurrency', type=int, default=8, help="Bir vaqtdagi worker'lar soni")
+        parser.add_argument('--hashers', nargs='+', choices=list(settings.PASSWORD_HASHER_CHOICES),
+                            default=list(settings.PASSWORD_HASHER_CHOICES))
+
+    def handle(self, *args, **options):
+        hashers = available_hashers(options['hashers'])
+        if not hashers:
+            raise CommandError("Tanlangan hasherlarning birortasi ham o'rnatilmagan.")
+
+        rows = []
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            for name, path in hashers.items():
+                others = [p for p in settings.PASSWORD_HASHERS if p != path]
+                with override_settings(PASSWORD_HASHERS=[path, *others]):
+                    encoded = make_password(PASSWORD)
+                    User.objects.create(username=f'login-{name}', role='STUDENT', password=encoded)
+                    response, single = measure(lambda: Client().post(
+                        reverse('login'), {'username': f'login-{name}', 'password': PASSWORD}
+                    ))
+                    burst = login_burst([encoded] * options['logins'], PASSWORD, options['concurrency'])
+                rows.append({
+                    'hasher': name,
+                    'status': response.status_code,
+                    'queries': single['queries'],
+                    'login_ms': single['ms'],
+                    'per_second': burst['per_second'],
+                    'p50': percentile(burst['latencies_ms'], 50),
+                    'p95': percentile(burst['latencies_ms'], 95),
+                    'failed': burst['failed'],
+                })
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{options['logins']} ta login, {options['concurrency']} ta parallel worker\n"
+            f"{'hasher':<8} {'status':>6} {'queries':>8} {'login ms':>9} {'login/s':>8} {'p50 ms':>8} {'p95 ms':>8}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['hasher']:<8} {row['status']:>6} {row['queries']:>8} {row['login_ms']:>9} "
+                f"{row['per_second']:>8} {row['p50']:>8} {row['p95']:>8}"
+            )
+            if row['failed'] or row['status'] != 302:
+                self.stdout.write(self.style.ERROR(f"{row['hasher']}: login muvaffaqiyatsiz"))
@@ -0,0 +1,69 @@
+from importlib import import_module
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils.module_loading import module_has_submodule
+from core.benchmark import BENCHMARK_SCALES, growing_cases, index_misses, run_cases
+
+LOCAL_APPS = ('users', 'academy', 'homeworks', 'api')
+
+
+def benchmark_modules():
+    """Ilovalarning benchmarks.py modullari (har birida cases(data) funksiyasi)"""
+    modules = []
+    for label in LOCAL_APPS:
+        app_config = apps.get_app_config(label)
+        if module_has_submodule(app_config.module, 'benchmarks'):
+            modules.append((label, import_module(f'{app_config.name}.benchmarks')))
+    return modules
+
+
+class Command(BaseCommand):
+    help = "View'larning so'rovlar soni, vaqti va xotira sarfini bir necha ma'lumot hajmida o'lchash (vaqtinchalik test DB'da)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=list(BENCHMARK_SCALES),
+                            help="Ma'lumot hajmlari (core.benchmark.scaled_size ga beriladi)")
+        parser.add_argument('--case', help="Faqat nomida shu matn bor holatlar")
+        parser.add_argument('--fail-on-growth', action='store_true',
+                            help="So'rovlar soni hajm bilan o'ssa yoki indeks ishlatilmasa xato bilan chiqish")
+
+    def handle(self, *args, **options):
+        modules = benchmark_modules()
+
+        def cases(data):
+            rows = []
+            for label, module in modules:
+                for name, user, target in module.cases(data):
+                    name = f'{label}.{name}'
+                    if not options['case'] or options['case'] in name:
+                        rows.append((name, user, target))
+            return rows
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_cases(cases, scales=options['scales'])
+            misses = index_misses()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'case':<40} {'scale':>5} {'queries':>8} {'ms':>9} {'peak KB':>9} {'status':>6}")
+        for row in sorted(results, key=lambda r: (r['case'], r['scale'])):
+            self.stdout.write(
+                f"{row['case']:<40} {row['scale']:>5} {row['queries']:>8} "
+                f"{row['ms']:>9} {row['peak_kb']:>9} {row['status']:>6}"
+            )
+
+        for name, plan in misses.items():
+            self.stdout.write(self.style.ERROR(f"{name}: kutilgan indeks ishlatilmayapti\n    {plan}"))
+
+        growing = growing_cases(results)
+        for name, counts in growing.items():
+            self.stdout.write(self.style.ERROR(f"{name}: so'rovlar soni o'smoqda {counts}"))
+        if (growing or misses) and options['fail_on_growth']:
+            raise CommandError(f"{len(growing)} ta view'da N+1, {len(misses)} ta so'rovda indeks muammosi")
+        if not growing and not misses:
+            self.stdout.write(self.style.SUCCESS("So'rovlar soni o'zgarmas, issiq so'rovlar indeksdan foydalanadi."))
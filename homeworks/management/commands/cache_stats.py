@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from core.cache import hit_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = "Dashboard/analytics keshining hit/miss hisoblagichlarini ko'rsatish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help="Ko'rsatilgandan keyin hisoblagichlarni nolga tushirish")
+
+    def handle(self, *args, **options):
+        stats = hit_stats()
+        if not stats:
+            self.stdout.write(
+                "Hali hech qanday kesh so'rovi sanalmagan: CACHE_STATS_SAMPLE_RATE ni yoqing "
+                "(yoki backend jarayonlar orasida umumiy emas)."
+            )
+        for name, row in stats.items():
+            self.stdout.write(f"{name:<24} hits={row['hits']:<8} misses={row['misses']:<8} ratio={row['ratio']}%")
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Hisoblagichlar tozalandi."))
@@ -1,54 +1,79 @@
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import timedelta
-from homeworks.models import Homework, Submission, Notification
-from users.models import User
+from homeworks.models import Homework, DeadlineCheckpoint
+from homeworks.utils import fill_missed_submissions, send_deadline_warnings
+
+CHECKPOINT_NAME = 'check_deadlines'
+
 
 class Command(BaseCommand):
     help = 'Check deadlines, auto-grade missed homeworks and send warnings'
 
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--since',
+            help="Shu vaqtdan keyin muddati tugagan vazifalarni qayta ishlash (ISO format)"
+        )
+        mode.add_argument(
+            '--full',
+            action='store_true',
+            help="Watermark'ga qaramay barcha muddati o'tgan vazifalarni qayta ishlash"
+        )
+
+    def get_start(self, options):
+        """(start, watermark): watermark=True - start oldingi ishga tushirishdan olingan"""
+        if options['full']:
+            return None, False
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Noto'g'ri sana: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            return since, False
+        checkpoint = DeadlineCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+        return (checkpoint.processed_until, True) if checkpoint else (None, False)
+
     def handle(self, *args, **options):
+        started = time.monotonic()
         now = timezone.now()
         one_hour_later = now + timedelta(hours=1)
-        
-        # 1. Auto-grade missed homeworks (expired)
+        start, watermark = self.get_start(options)
+
+        # 1. Auto-grade missed homeworks (faqat oxirgi ishga tushirishdan keyin muddati tugaganlar)
         expired_hws = Homework.objects.filter(deadline__lt=now)
-        for hw in expired_hws:
-            students = hw.group.students.all()
-            for student in students:
-                if not Submission.objects.filter(homework=hw, student=student).exists():
-                    Submission.objects.create(
-                        homework=hw,
-                        student=student,
-                        score_percent=0,
-                        is_graded=True,
-                        content="Muddat o'tganligi sababli tizim tomonidan 0% ball qo'yildi."
-                    )
-                    self.stdout.write(self.style.SUCCESS(f"Auto-graded {student.username} for HW {hw.pk}"))
+        if watermark:
+            # Watermark'dan keyin o'tgan sana bilan qo'shilgan yoki muddati orqaga
+            # surilgan vazifalar ham (deadline < processed_until bo'lsa ham)
+            expired_hws = expired_hws.filter(Q(deadline__gte=start) | Q(updated_at__gte=start))
+        elif start is not None:
+            expired_hws = expired_hws.filter(deadline__gte=start)
+
+        with transaction.atomic():
+            expired_count = expired_hws.count()
+            missed = fill_missed_submissions(expired_hws)
+            DeadlineCheckpoint.objects.update_or_create(
+                name=CHECKPOINT_NAME,
+                defaults={'processed_until': now}
+            )
 
         # 2. Deadline warning (1 hour left)
         upcoming_hws = Homework.objects.filter(
             deadline__gt=now,
             deadline__lte=one_hour_later
-        )
-        for hw in upcoming_hws:
-            students = hw.group.students.all()
-            for student in students:
-                # Topshirmagan bo'lsa ogohlantirish
-                if not Submission.objects.filter(homework=hw, student=student).exists():
-                    # Allaqachon ogohlantirilganmi?
-                    if not Notification.objects.filter(
-                        user=student, 
-                        related_homework=hw, 
-                        notification_type='DEADLINE'
-                    ).exists():
-                        Notification.objects.create(
-                            user=student,
-                            notification_type='DEADLINE',
-                            title='Vazifa muddati tugamoqda!',
-                            message=f'"{hw.title}" vazifasini topshirishga 1 soatdan kam vaqt qoldi. Shoshiling!',
-                            related_homework=hw
-                        )
-                        self.stdout.write(self.style.NOTICE(f"Warning sent to {student.username} for HW {hw.pk}"))
-
-        self.stdout.write(self.style.SUCCESS('Deadline check completed.'))
+        ).only('id', 'title')
+        warnings = send_deadline_warnings(upcoming_hws)
+
+        elapsed = time.monotonic() - started
+        window = start.isoformat() if start else 'boshidan'
+        self.stdout.write(f"Oyna: {window} .. {now.isoformat()}")
+        self.stdout.write(f"Muddati tugagan vazifalar: {expired_count}")
+        self.stdout.write(self.style.SUCCESS(f"Auto-graded: {len(missed)} submission(s)"))
+        self.stdout.write(self.style.NOTICE(f"Warnings sent: {len(warnings)}"))
+        self.stdout.write(self.style.SUCCESS(f'Deadline check completed in {elapsed:.2f}s.'))
@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from core.storage import ContentAddressedStorage
+from homeworks.files import DEFAULT_GRACE, collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = ("Kontent-manzilli omborda hech bir vazifa, topshiriq yoki eksportga tegishli bo'lmagan "
+            "(havolasiz) fayllarni o'chirish")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=DEFAULT_GRACE.total_seconds() / 3600,
+                            help="Shundan yangi fayllarga tegilmaydi (yuklanib, hali saqlanmagan bo'lishi mumkin)")
+        parser.add_argument('--recount', action='store_true',
+                            help="Oldin havolalar sonini FileField qiymatlaridan qayta hisoblash")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat sanash, hech narsa o'chirmaslik")
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("STORAGES['default'] core.storage.ContentAddressedStorage emas.")
+
+        started = time.monotonic()
+        if options['recount']:
+            self.stdout.write(f"Havolalar soni tuzatildi: {recount_references()}")
+
+        report = collect_garbage(
+            grace=timedelta(hours=options['grace_hours']), dry_run=options['dry_run']
+        )
+        verb = "o'chiriladi" if options['dry_run'] else "o'chirildi"
+        self.stdout.write(f"Fayllar: {verb} {report['files']} ({report['bytes'] / 1024:.1f} KB)")
+        self.stdout.write(f"Fayli yo'q qatorlar: {verb} {report['rows']}")
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Storage garbage collected in {elapsed:.2f}s."))
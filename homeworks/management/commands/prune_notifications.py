@@ -0,0 +1,46 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from homeworks.retention import (
+    DEFAULT_BATCH_SIZE, NotificationArchive, delete_in_batches, duplicate_notifications, expired_notifications
+)
+
+
+class Command(BaseCommand):
+    help = ("Takrorlangan bildirishnomalarni siqish va saqlash muddati o'tgan o'qilganlarini "
+            "partiyalab o'chirish (ixtiyoriy ravishda arxivlab)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+                            help="Shundan eski o'qilgan bildirishnomalar o'chiriladi")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--archive-dir', default=settings.NOTIFICATION_ARCHIVE_DIR,
+                            help="O'chirishdan oldin .jsonl.gz arxiv yoziladigan papka (bo'sh - arxivsiz)")
+        parser.add_argument('--no-collapse', action='store_true',
+                            help="Bir vazifa bo'yicha takrorlangan bildirishnomalarni siqmaslik")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat sanash, hech narsa o'chirmaslik")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        steps = [('expired', expired_notifications(options['days']))]
+        if not options['no_collapse']:
+            steps.insert(0, ('duplicates', duplicate_notifications()))
+
+        if options['dry_run']:
+            for name, queryset in steps:
+                self.stdout.write(f"{name}: {queryset.count()}")
+            return
+
+        archive = NotificationArchive(options['archive_dir']) if options['archive_dir'] else None
+        try:
+            for name, queryset in steps:
+                deleted = delete_in_batches(queryset, options['batch_size'], archive)
+                self.stdout.write(f"{name}: o'chirildi {deleted}")
+        finally:
+            if archive is not None:
+                archive.close()
+
+        if archive is not None and archive.rows:
+            self.stdout.write(f"Arxiv: {archive.path} ({archive.rows} ta qator)")
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Notifications pruned in {elapsed:.2f}s."))
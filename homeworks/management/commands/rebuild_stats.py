@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from academy.models import Group
+from homeworks.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "StudentGroupStats jadvalini Submission ma'lumotlaridan qayta tiklash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--group',
+            type=int,
+            action='append',
+            dest='groups',
+            help="Faqat shu guruh(lar)ni qayta hisoblash (bir necha marta berish mumkin)"
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        groups = None
+        if options['groups']:
+            groups = Group.objects.filter(pk__in=options['groups'])
+
+        written, deleted = rebuild_stats(groups)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"Yozildi: {written}, o'chirildi: {deleted}")
+        self.stdout.write(self.style.SUCCESS(f"Stats rebuilt in {elapsed:.2f}s."))
@@ -0,0 +1,100 @@
+import json
+import math
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+SORT_KEYS = ('p50', 'p95', 'p99', 'count', 'queries')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank usulida foizli qiymat (ro'yxat saralangan bo'lishi kerak)"""
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def log_files(path):
+    """
+    Worker fayllari (<nom>.<pid>.jsonl, eski yozuvlar uchun <nom>.jsonl ham) va ularning
+    RotatingFileHandler nusxalari: har bir fayl uchun eng eskisidan (.N) joriy faylgacha
+    """
+    files = []
+    for base in [path, *sorted(path.parent.glob(f'{path.stem}.*{path.suffix}'))]:
+        backups = sorted(
+            base.parent.glob(f'{base.name}.*'),
+            key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0,
+            reverse=True
+        )
+        files.extend(p for p in backups + [base] if p.exists() and p not in files)
+    return files
+
+
+def read_entries(path, since=None):
+    for file in log_files(path):
+        with open(file, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if since and parse_datetime(entry['ts']) < since:
+                    continue
+                yield entry
+
+
+class Command(BaseCommand):
+    help = "RequestTimingMiddleware yozuvlaridan har bir view uchun p50/p95/p99 hisobot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help="Log fayli (standart: settings.REQUEST_TIMING_LOG)")
+        parser.add_argument('--hours', type=float, help="Faqat oxirgi N soat")
+        parser.add_argument('--view', help="Faqat nomida shu matn bor view'lar")
+        parser.add_argument('--sort', choices=SORT_KEYS, default='p95')
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        path = Path(options['file'] or settings.REQUEST_TIMING_LOG)
+        if not log_files(path):
+            raise CommandError(f"Log fayli topilmadi: {path}")
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] else None
+
+        views = {}
+        for entry in read_entries(path, since):
+            if options['view'] and options['view'] not in entry['view']:
+                continue
+            views.setdefault(entry['view'], []).append(entry)
+
+        rows = []
+        for view, entries in views.items():
+            times = sorted(e['ms'] for e in entries)
+            worst = max(entries, key=lambda e: e['top_sql_count'])
+            rows.append({
+                'view': view,
+                'count': len(entries),
+                'p50': percentile(times, 50),
+                'p95': percentile(times, 95),
+                'p99': percentile(times, 99),
+                'queries': round(sum(e['queries'] for e in entries) / len(entries), 1),
+                'sql_ms': round(sum(e['sql_ms'] for e in entries) / len(entries), 1),
+                'top_sql_count': worst['top_sql_count'],
+                'top_sql': worst['top_sql'],
+            })
+        rows.sort(key=lambda row: row[options['sort']], reverse=True)
+
+        self.stdout.write(
+            f"{'view':<36} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'sql ms':>8} {'repeat':>6}"
+        )
+        for row in rows[:options['limit']]:
+            self.stdout.write(
+                f"{row['view'][:36]:<36} {row['count']:>6} {row['p50']:>8} {row['p95']:>8} {row['p99']:>8} "
+                f"{row['queries']:>8} {row['sql_ms']:>8} {row['top_sql_count']:>6}"
+            )
+            # Bir xil so'rov ko'p marta takrorlansa - ehtimol N+1
+            if row['top_sql_count'] > 5:
+                self.stdout.write(self.style.WARNING(f"    N+1? {row['top_sql'][:160]}"))
@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+from homeworks.models import ExportJob
+from homeworks.export_jobs import claim_job, claimable, fail_job, run_job
+
+
+def _init_worker():
+    # Har bir jarayon o'z DB ulanishini ochadi
+    django.setup()
+    connections.close_all()
+
+
+def _run_in_worker(job_id):
+    try:
+        return job_id, run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Navbatdagi Excel export job'larini jarayonlar hovuzida bajarish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help="Jarayonlar soni (0 - joriy jarayonda bajarish)")
+        parser.add_argument('--once', action='store_true',
+                            help="Navbat bo'shaguncha ishlab, chiqib ketish")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Navbatni tekshirish oralig'i (soniya)")
+        parser.add_argument('--keep-days', type=int, default=7,
+                            help="Shundan eski tayyor hisobot fayllarini o'chirish")
+
+    def pending_ids(self, limit):
+        return list(
+            ExportJob.objects.filter(claimable())
+            .order_by('created_at')
+            .values_list('pk', flat=True)[:limit]
+        )
+
+    def prune(self, keep_days):
+        cutoff = timezone.now() - timedelta(days=keep_days)
+        old_jobs = ExportJob.objects.filter(finished_at__lt=cutoff)
+        for job in old_jobs:
+            if job.file:
+                job.file.delete(save=False)
+        deleted, _ = old_jobs.delete()
+        if deleted:
+            self.stdout.write(f"Eski hisobotlar o'chirildi: {deleted}")
+
+    def report(self, job_id, status):
+        style = self.style.SUCCESS if status == ExportJob.Status.DONE else self.style.ERROR
+        self.stdout.write(style(f"Job {job_id}: {status}"))
+
+    def handle(self, *args, **options):
+        self.prune(options['keep_days'])
+        workers = options['workers']
+
+        if workers <= 0:
+            while True:
+                job_ids = self.pending_ids(limit=10)
+                for job_id in job_ids:
+                    if claim_job(job_id):
+                        self.report(job_id, run_job(job_id))
+                if not job_ids:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+
+        pool = self.new_pool(workers)
+        running = {}
+        try:
+            while True:
+                free = workers - len(running)
+                for job_id in self.pending_ids(limit=free) if free else []:
+                    if claim_job(job_id):
+                        running[pool.submit(_run_in_worker, job_id)] = job_id
+
+                if not running:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        self.report(*future.result())
+                    except Exception as exc:
+                        broken = broken or isinstance(exc, BrokenProcessPool)
+                        self.report(job_id, fail_job(job_id, exc))
+                if broken:
+                    # Hovuzdagi jarayon o'ldi - qolgan job'lar ham natija bermaydi, hovuz qayta quriladi
+                    for job_id in running.values():
+                        self.report(job_id, fail_job(job_id, "Worker jarayoni to'xtab qoldi"))
+                    running.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self.new_pool(workers)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def new_pool(self, workers):
+        # Fork qilishdan oldin ota jarayon ulanishlarini yopish
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
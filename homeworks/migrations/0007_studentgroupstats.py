@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_stats(apps, schema_editor):
+    Group = apps.get_model('academy', 'Group')
+    Homework = apps.get_model('homeworks', 'Homework')
+    Submission = apps.get_model('homeworks', 'Submission')
+    StudentGroupStats = apps.get_model('homeworks', 'StudentGroupStats')
+
+    totals = dict(Homework.objects.values('group_id').annotate(total=Count('id')).values_list('group_id', 'total'))
+    aggregates = {
+        (row['student_id'], row['homework__group_id']): row
+        for row in Submission.objects.values('student_id', 'homework__group_id').annotate(
+            submitted=Count('id'),
+            graded=Count('id', filter=Q(is_graded=True)),
+            score=Sum('score_percent', filter=Q(is_graded=True)),
+        )
+    }
+    rows = []
+    for student_id, group_id in Group.students.through.objects.values_list('user_id', 'group_id'):
+        data = aggregates.get((student_id, group_id), {})
+        rows.append(StudentGroupStats(
+            student_id=student_id,
+            group_id=group_id,
+            submitted_count=data.get('submitted', 0),
+            graded_count=data.get('graded', 0),
+            score_sum=data.get('score') or 0,
+            homework_total=totals.get(group_id, 0),
+        ))
+    StudentGroupStats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academy', '0002_initial'),
+        ('homeworks', '0006_deadlinecheckpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentGroupStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submitted_count', models.IntegerField(default=0)),
+                ('graded_count', models.IntegerField(default=0)),
+                ('score_sum', models.IntegerField(default=0)),
+                ('homework_total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_stats', to='academy.group')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('student', 'group')},
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
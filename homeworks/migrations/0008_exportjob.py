@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-17 13:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homeworks', '0007_studentgroupstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('ALL', 'Barcha natijalar'), ('GROUP', 'Guruh hisoboti'), ('COURSE', 'Kurs hisoboti')], max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Navbatda'), ('RUNNING', 'Tayyorlanmoqda'), ('DONE', 'Tayyor'), ('FAILED', 'Xatolik')], default='PENDING', max_length=10)),
+                ('filename', models.CharField(max_length=255)),
+                ('file', models.FileField(blank=True, null=True, upload_to='exports/')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
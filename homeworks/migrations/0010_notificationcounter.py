@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Notification = apps.get_model('homeworks', 'Notification')
+    NotificationCounter = apps.get_model('homeworks', 'NotificationCounter')
+
+    rows = [
+        NotificationCounter(user_id=user_id, unread=unread)
+        for user_id, unread in Notification.objects.filter(is_read=False).order_by()
+        .values('user_id').annotate(unread=Count('id')).values_list('user_id', 'unread')
+    ]
+    NotificationCounter.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homeworks', '0009_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
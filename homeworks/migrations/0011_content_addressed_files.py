@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-17 13:04
+
+import django.utils.timezone
+import homeworks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homeworks', '0010_notificationcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('references', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='exports/'),
+        ),
+        migrations.AlterField(
+            model_name='homework',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='homework_files/', validators=[homeworks.models.validate_file_size_7mb]),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='submissions/', validators=[homeworks.models.validate_file_size_5mb]),
+        ),
+    ]
@@ -0,0 +1,21 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homeworks', '0011_content_addressed_files'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homework',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['updated_at'], name='homework_updated_idx'),
+        ),
+    ]
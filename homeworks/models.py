@@ -1,5 +1,7 @@
+import os
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from academy.models import Group
 
 from django.core.exceptions import ValidationError
@@ -17,10 +19,11 @@ def validate_file_size_5mb(value):
 class Homework(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
-    file = models.FileField(upload_to='homework_files/', blank=True, null=True, validators=[validate_file_size_7mb])
+    file = models.FileField(upload_to='homework_files/', max_length=255, blank=True, null=True, validators=[validate_file_size_7mb])
     deadline = models.DateTimeField()
     max_score = models.IntegerField(default=100)
-    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='homeworks')
+    # group_id bo'yicha qidiruvni (group, sequence) indeksi qoplaydi
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='homeworks', db_index=False)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.SET_NULL, 
@@ -28,23 +31,37 @@ class Homework(models.Model):
         related_name='created_homeworks'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # check_deadlines watermark'dan keyin qo'shilgan/o'zgartirilgan vazifalarni shu bo'yicha topadi
+    updated_at = models.DateTimeField(auto_now=True)
     sequence = models.IntegerField(default=1)
 
     class Meta:
         ordering = ['sequence', 'created_at']
+        indexes = [
+            models.Index(fields=['group', 'sequence'], name='homework_group_seq_idx'),
+            models.Index(fields=['deadline'], name='homework_deadline_idx'),
+            models.Index(fields=['updated_at'], name='homework_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.group.name}"
 
+    @property
+    def file_name(self):
+        """Ko'rsatish uchun asl fayl nomi (saqlangan nom hash papkasini ham o'z ichiga oladi)"""
+        return os.path.basename(self.file.name) if self.file else ''
+
 class Submission(models.Model):
-    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, related_name='submissions')
+    # homework_id/student_id bo'yicha qidiruvni Meta.indexes dagi kompozit indekslar qoplaydi
+    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, related_name='submissions', db_index=False)
     student = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.CASCADE, 
-        related_name='submissions'
+        related_name='submissions',
+        db_index=False
     )
     content = models.TextField(blank=True)
-    file = models.FileField(upload_to='submissions/', blank=True, null=True, validators=[validate_file_size_5mb])
+    file = models.FileField(upload_to='submissions/', max_length=255, blank=True, null=True, validators=[validate_file_size_5mb])
     is_code = models.BooleanField(default=False, verbose_name="Kod sifatida topshirilgan")
     code_language = models.CharField(max_length=50, blank=True, default='python')
     score_percent = models.IntegerField(default=0)
@@ -62,10 +79,18 @@ class Submission(models.Model):
 
     class Meta:
         unique_together = ('homework', 'student')
+        indexes = [
+            models.Index(fields=['student', 'is_graded'], name='submission_student_graded_idx'),
+            models.Index(fields=['homework', 'is_graded'], name='submission_hw_graded_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.homework.title}"
 
+    @property
+    def file_name(self):
+        return os.path.basename(self.file.name) if self.file else ''
+
     @property
     def is_late(self):
         return self.submitted_at > self.homework.deadline
@@ -80,10 +105,12 @@ class Notification(models.Model):
         GRADED = 'GRADED', 'Baholandi'
         SYSTEM = 'SYSTEM', 'Tizim xabari'
     
+    # user_id bo'yicha qidiruvni Meta.indexes dagi (user, -created_at) indeksi qoplaydi
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='notifications'
+        related_name='notifications',
+        db_index=False
     )
     notification_type = models.CharField(
         max_length=20,
@@ -104,7 +131,118 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+            # O'qilmaganlar soni (badge) uchun faqat is_read=False qatorlari
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
 
+
+class NotificationCounter(models.Model):
+    """Foydalanuvchining o'qilmagan bildirishnomalari soni (navbar badge, homeworks.notifications yangilaydi)"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter'
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.unread}"
+
+
+class StoredFile(models.Model):
+    """Kontent-manzilli fayl (core.storage) va unga havola qilgan FileField qiymatlari soni (homeworks.files)"""
+    name = models.CharField(max_length=255, primary_key=True)
+    references = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} - {self.references}"
+
+
+class DeadlineCheckpoint(models.Model):
+    """check_deadlines qaysi deadline'gacha ishlov berganini saqlaydi (watermark)"""
+    name = models.CharField(max_length=50, unique=True)
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} - {self.processed_until}"
+
+
+class StudentGroupStats(models.Model):
+    """O'quvchi-guruh kesimidagi tayyor statistika (Submission yozilganda yangilanadi)"""
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='group_stats'
+    )
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='student_stats')
+    submitted_count = models.IntegerField(default=0)
+    graded_count = models.IntegerField(default=0)
+    score_sum = models.IntegerField(default=0)
+    homework_total = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'group')
+
+    def __str__(self):
+        return f"{self.student_id} - {self.group_id}"
+
+    @property
+    def avg_score(self):
+        """Baholangan topshiriqlar bo'yicha o'rtacha %"""
+        return round(self.score_sum / self.graded_count, 1) if self.graded_count else 0
+
+    @property
+    def completion(self):
+        return round(self.submitted_count / self.homework_total * 100, 1) if self.homework_total else 0
+
+
+class ExportJob(models.Model):
+    """Fon rejimida tayyorlanadigan Excel hisobot (run_export_jobs buyrug'i bajaradi)"""
+
+    class ReportType(models.TextChoices):
+        ALL = 'ALL', 'Barcha natijalar'
+        GROUP = 'GROUP', 'Guruh hisoboti'
+        COURSE = 'COURSE', 'Kurs hisoboti'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Navbatda'
+        RUNNING = 'RUNNING', 'Tayyorlanmoqda'
+        DONE = 'DONE', 'Tayyor'
+        FAILED = 'FAILED', 'Xatolik'
+
+    report_type = models.CharField(max_length=10, choices=ReportType.choices)
+    filters = models.JSONField(default=dict, blank=True)
+    # sha256(report_type, filters, data version) - o'zgarmagan hisobot qayta qurilmaydi
+    cache_key = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    filename = models.CharField(max_length=255)
+    file = models.FileField(upload_to='exports/', max_length=255, blank=True, null=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='export_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} - {self.get_status_display()}"
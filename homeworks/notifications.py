@@ -0,0 +1,120 @@
+"""
+O'qilmagan bildirishnomalar hisoblagichi.
+
+NotificationCounter.unread har bir foydalanuvchi uchun F() ifodasi bilan atomar
+oshiriladi yoki kamaytiriladi, shuning uchun navbar badge Notification jadvalini
+sanamaydi. Bitta save()/delete() signal orqali (homeworks/signals.py) hisobga olinadi,
+bulk_create va ommaviy o'qish esa shu moduldagi notify() / mark_read() orqali.
+
+broker - jarayon ichidagi pub/sub: yangi bildirishnoma commit bo'lgach tegishli
+foydalanuvchilarning SSE oqimlari (homeworks/stream.py) uyg'otiladi.
+"""
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from .models import Notification, NotificationCounter
+
+BATCH_SIZE = 500
+
+
+class NotificationBroker:
+    """
+    user_id -> kutayotgan oqimlar (event loop, asyncio.Event). publish() istalgan oqimdan
+    (sinxron view, signal) chaqiriladi va call_soon_threadsafe orqali uyg'otadi.
+    Boshqa worker'dagi obunachilarga yetib bormaydi - ular DB'ni davriy tekshiradi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = defaultdict(set)
+
+    def subscribe(self, user_id):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters[user_id].add(waiter)
+        return waiter
+
+    def unsubscribe(self, user_id, waiter):
+        with self._lock:
+            self._waiters[user_id].discard(waiter)
+            if not self._waiters[user_id]:
+                del self._waiters[user_id]
+
+    def publish(self, user_ids):
+        with self._lock:
+            waiters = [waiter for user_id in set(user_ids) for waiter in self._waiters.get(user_id, ())]
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Oqim yopilgan loop'da qolib ketgan
+                pass
+
+
+broker = NotificationBroker()
+
+
+def announce(user_ids):
+    """Tranzaksiya commit bo'lgach obunachilarni uyg'otish"""
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: broker.publish(user_ids))
+
+
+def change_unread(deltas):
+    """
+    {user_id: +n yoki -n}. O'zgarishi bir xil foydalanuvchilar bitta UPDATE bilan yangilanadi.
+    Hisoblagich qatori faqat oshirishda yaratiladi (o'chirilayotgan foydalanuvchiga yozilmasin).
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id, delta in deltas.items() if delta > 0],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        by_delta[delta].append(user_id)
+    for delta, user_ids in by_delta.items():
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            NotificationCounter.objects.filter(user_id__in=user_ids[start:start + BATCH_SIZE]).update(
+                unread=Greatest(F('unread') + delta, 0)
+            )
+
+
+@transaction.atomic
+def notify(notifications):
+    """Bildirishnomalarni bitta bulk_create bilan yozish va hisoblagichlarni oshirish"""
+    created = Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+    change_unread(Counter(notification.user_id for notification in created if not notification.is_read))
+    announce(notification.user_id for notification in created)
+    return created
+
+
+@transaction.atomic
+def mark_read(user, notifications=None):
+    """
+    Foydalanuvchining o'qilmagan bildirishnomalarini (yoki ulardan notifications qismini)
+    o'qilgan qilish. Hisoblagichdan faqat UPDATE haqiqatan o'zgartirgan qatorlar ayiriladi.
+    """
+    queryset = Notification.objects.all() if notifications is None else notifications
+    updated = queryset.filter(user=user, is_read=False).update(is_read=True)
+    change_unread({user.pk: -updated})
+    return updated
+
+
+def unread_count(user):
+    """Badge uchun: bitta primary key bo'yicha o'qish"""
+    if not user.is_authenticated:
+        return 0
+    return NotificationCounter.objects.filter(user_id=user.pk).values_list('unread', flat=True).first() or 0
+
+
+async def aunread_count(user_id):
+    """unread_count() ning async varianti (SSE oqimi uchun)"""
+    return await NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).afirst() or 0
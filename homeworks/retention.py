@@ -0,0 +1,86 @@
+"""
+Bildirishnomalarni saqlash muddati va siqish.
+
+- expired_notifications(): NOTIFICATION_RETENTION_DAYS dan eski o'qilgan bildirishnomalar.
+- duplicate_notifications(): bir foydalanuvchi, vazifa va tur uchun takrorlanganlar
+  (masalan, qayta baholashdagi GRADED) - eng yangisidan boshqalari.
+- delete_in_batches(): har bir partiya alohida tranzaksiyada bitta DELETE bilan
+  o'chiriladi, xohlansa oldin gzip JSON qatorlar arxiviga yoziladi.
+O'chirilgan o'qilmagan bildirishnomalar hisoblagichi post_delete signali orqali kamayadi.
+"""
+import gzip
+import json
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import Notification
+
+DEFAULT_BATCH_SIZE = 1000
+ARCHIVE_FIELDS = [
+    'id', 'user_id', 'notification_type', 'title', 'message',
+    'is_read', 'related_homework_id', 'created_at',
+]
+
+
+def expired_notifications(days=None, now=None):
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+
+def duplicate_notifications():
+    newer = Notification.objects.filter(
+        user_id=OuterRef('user_id'),
+        related_homework_id=OuterRef('related_homework_id'),
+        notification_type=OuterRef('notification_type'),
+        pk__gt=OuterRef('pk'),
+    )
+    return Notification.objects.filter(related_homework__isnull=False).filter(Exists(newer))
+
+
+class NotificationArchive:
+    """Bitta ishga tushirish uchun bitta .jsonl.gz fayl; fayl birinchi yozuvda ochiladi"""
+
+    def __init__(self, directory, now=None):
+        stamp = (now or timezone.now()).strftime('%Y%m%d-%H%M%S')
+        self.path = Path(directory) / f'notifications-{stamp}.jsonl.gz'
+        self.rows = 0
+        self._file = None
+
+    def write(self, queryset):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.path, 'at', encoding='utf-8')
+        for row in queryset.values(*ARCHIVE_FIELDS).order_by('pk'):
+            self._file.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            self.rows += 1
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def delete_in_batches(queryset, batch_size=DEFAULT_BATCH_SIZE, archive=None):
+    """queryset qatorlarini batch_size tadan o'chirish. Qaytaradi: o'chirilganlar soni"""
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            batch = Notification.objects.filter(pk__in=ids)
+            if archive is not None:
+                archive.write(batch)
+            count, _ = batch.delete()
+        deleted += count
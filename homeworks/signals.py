@@ -0,0 +1,211 @@
+"""
+StudentGroupStats jadvali, reyting va dashboard keshlarini Submission, Homework, o'quvchi va guruh a'zoligi o'zgarganda,
+o'qilmagan bildirishnomalar hisoblagichini esa Notification o'zgarganda yangilab turish.
+Kontent-manzilli fayllarning havolalar soni (homeworks.files) FileField qiymati o'zgarganda yangilanadi.
+bulk_create/update kabi signal yubormaydigan yo'llar stats.refresh_stats, leaderboard.invalidate,
+core.cache.invalidate va notifications.notify/mark_read ni o'zi chaqiradi.
+"""
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, post_save, post_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+from academy.models import Course, Group
+from core import cache as payload_cache
+from users.models import User
+from .files import change_references
+from .models import ExportJob, Homework, Notification, Submission
+from .notifications import announce, change_unread
+from .stats import refresh_stats, refresh_group_totals, remove_stats, rebuild_stats
+from . import leaderboard
+
+LEADERBOARD_USER_FIELDS = {'is_active', 'first_name', 'last_name', 'username', 'role'}
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender, instance, **kwargs):
+    refresh_stats([(instance.student_id, instance.homework.group_id)])
+    payload_cache.invalidate(users=[instance.student_id], groups=[instance.homework.group_id])
+    if instance.is_graded:
+        leaderboard.invalidate()
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender, instance, origin=None, **kwargs):
+    if instance.is_graded:
+        leaderboard.invalidate()
+    # Homework/Group/User o'chirilganda kaskad bo'yicha kelgan signallar o'sha model handlerida ishlanadi
+    if origin is not None and _origin_model(origin) is not Submission:
+        return
+    group_id = Homework.objects.filter(pk=instance.homework_id).values_list('group_id', flat=True).first()
+    payload_cache.invalidate(users=[instance.student_id], groups=[group_id] if group_id else [])
+    if group_id is not None:
+        refresh_stats([(instance.student_id, group_id)])
+
+
+@receiver(pre_save, sender=Homework)
+def homework_pre_save(sender, instance, **kwargs):
+    instance._previous_group_id = None
+    if instance.pk:
+        instance._previous_group_id = Homework.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Homework)
+def homework_saved(sender, instance, created, **kwargs):
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    payload_cache.invalidate(groups={instance.group_id, previous_group_id} - {None})
+    if created:
+        refresh_group_totals(instance.group_id)
+    elif previous_group_id and previous_group_id != instance.group_id:
+        # Vazifa boshqa guruhga ko'chirildi: ikkala guruh ham qayta hisoblanadi
+        rebuild_stats(Group.objects.filter(pk__in=[previous_group_id, instance.group_id]))
+
+
+@receiver(post_delete, sender=Homework)
+def homework_deleted(sender, instance, origin=None, **kwargs):
+    payload_cache.invalidate(groups=[instance.group_id])
+    if origin is not None and _origin_model(origin) is not Homework:
+        return
+    rebuild_stats(Group.objects.filter(pk=instance.group_id))
+
+
+@receiver(pre_save, sender=Notification)
+def notification_pre_save(sender, instance, **kwargs):
+    instance._was_unread = None
+    if instance.pk:
+        instance._was_unread = Notification.objects.filter(
+            pk=instance.pk, is_read=False
+        ).exists()
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    was_unread = False if created else bool(getattr(instance, '_was_unread', False))
+    change_unread({instance.user_id: int(not instance.is_read) - int(was_unread)})
+    if created:
+        announce([instance.user_id])
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, origin=None, **kwargs):
+    # Foydalanuvchi o'chirilganda hisoblagich ham kaskad bo'yicha o'chadi
+    if instance.is_read or (origin is not None and _origin_model(origin) is User):
+        return
+    change_unread({instance.user_id: -1})
+
+
+def _file_name(instance):
+    # Deskriptor orqali emas: FieldFile yaratilmaydi, kechiktirilgan (defer) maydon yuklanmaydi
+    value = instance.__dict__.get('file')
+    return getattr(value, 'name', value) or None
+
+
+@receiver(post_init, sender=Homework)
+@receiver(post_init, sender=Submission)
+@receiver(post_init, sender=ExportJob)
+def file_loaded(sender, instance, **kwargs):
+    # Oldingi qiymat so'rovsiz eslab qolinadi; defer qilingan bo'lsa o'zgarish kuzatilmaydi
+    if 'file' in instance.__dict__:
+        instance._stored_file = _file_name(instance)
+
+
+@receiver(post_save, sender=Homework)
+@receiver(post_save, sender=Submission)
+@receiver(post_save, sender=ExportJob)
+def file_saved(sender, instance, update_fields=None, **kwargs):
+    if not hasattr(instance, '_stored_file') or (update_fields is not None and 'file' not in update_fields):
+        return
+    previous, current = instance._stored_file, _file_name(instance)
+    if previous != current:
+        change_references({name: delta for name, delta in ((current, 1), (previous, -1)) if name})
+        instance._stored_file = current
+
+
+@receiver(post_delete, sender=Homework)
+@receiver(post_delete, sender=Submission)
+@receiver(post_delete, sender=ExportJob)
+def file_deleted(sender, instance, **kwargs):
+    name = _file_name(instance)
+    if name:
+        change_references({name: -1})
+
+
+def _invalidate_pairs(pairs):
+    payload_cache.invalidate(
+        users={user_id for user_id, _ in pairs},
+        groups={group_id for _, group_id in pairs}
+    )
+
+
+@receiver(m2m_changed, sender=Group.students.through)
+def group_students_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # clear() dan keyin pk_set bo'lmaydi, shuning uchun juftliklarni oldindan eslab qolamiz
+        if reverse:
+            instance._cleared_pairs = {(instance.pk, group_id) for group_id in instance.study_groups.values_list('pk', flat=True)}
+        else:
+            instance._cleared_pairs = {(student_id, instance.pk) for student_id in instance.students.values_list('pk', flat=True)}
+        return
+    if action == 'post_clear':
+        pairs = getattr(instance, '_cleared_pairs', ())
+        remove_stats(pairs)
+        leaderboard.invalidate()
+        _invalidate_pairs(pairs)
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    if reverse:
+        pairs = [(instance.pk, group_id) for group_id in pk_set]
+    else:
+        pairs = [(student_id, instance.pk) for student_id in pk_set]
+
+    leaderboard.invalidate()
+    _invalidate_pairs(pairs)
+    if action == 'post_add':
+        refresh_stats(pairs)
+    else:
+        remove_stats(pairs)
+
+
+@receiver(m2m_changed, sender=Group.teachers.through)
+def group_teachers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # clear() da pk_set yo'q: o'qituvchi/guruhning o'zi bump qilinadi,
+    # ikkinchi tomon esa guruhlar ro'yxati o'zgargani uchun kalitga tushmay qoladi
+    if reverse:
+        payload_cache.invalidate(users=[instance.pk], groups=pk_set or ())
+    else:
+        payload_cache.invalidate(users=pk_set or (), groups=[instance.pk])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    payload_cache.invalidate(groups=[instance.pk])
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    # Kurs nomi o'quvchi/o'qituvchi payload'lari (va API ETag'lari) ichida ham bor.
+    # O'chirishda guruhlar kaskad bo'yicha o'chadi va group_changed ularni o'zi bump qiladi
+    payload_cache.invalidate(groups=instance.groups.values_list('pk', flat=True) if instance.pk else ())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Login vaqtida faqat last_login (va qayta hashlangan parol) yoziladi - bu hech qaysi payload'ga ta'sir qilmaydi
+    if update_fields and set(update_fields) <= {'last_login', 'password'}:
+        return
+    payload_cache.invalidate(users=[instance.pk])
+    # Reytingda ism, username va faqat faol o'quvchilar ko'rinadi (admin top-5 ham shundan)
+    if instance.role == User.Role.STUDENT or (update_fields and 'role' in update_fields):
+        if update_fields is None or set(update_fields) & LEADERBOARD_USER_FIELDS:
+            leaderboard.invalidate()
@@ -0,0 +1,139 @@
+"""
+StudentGroupStats jadvalini yangilash.
+
+Har bir (student, group) juftligi uchun topshirilgan, baholangan vazifalar soni,
+ballar yig'indisi va guruhdagi jami vazifalar soni saqlanadi. Dashboard va
+statistika sahifalari shu jadvaldan o'qiydi.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Avg, Count, Exists, OuterRef, Q, Sum
+from academy.models import Group
+from .models import Homework, Submission, StudentGroupStats
+
+STATS_FIELDS = ['submitted_count', 'graded_count', 'score_sum', 'homework_total']
+
+
+def annotate_group_students(group):
+    """
+    group.students ustida bitta annotate() so'rovi: har bir o'quvchi uchun
+    shu guruh vazifalari bo'yicha topshirilgan, baholangan soni va o'rtacha ball.
+    """
+    in_group = Q(submissions__homework__group=group)
+    graded = in_group & Q(submissions__is_graded=True)
+    return group.students.annotate(
+        submitted_count=Count('submissions', filter=in_group),
+        graded_count=Count('submissions', filter=graded),
+        avg_score=Avg('submissions__score_percent', filter=graded),
+    )
+
+
+def _pairs_filter(pairs, student_field, group_field):
+    """(student_id, group_id) juftliklarini guruh bo'yicha yig'ilgan Q filtriga aylantirish"""
+    by_group = defaultdict(set)
+    for student_id, group_id in pairs:
+        by_group[group_id].add(student_id)
+
+    condition = Q(pk__in=[])
+    for group_id, student_ids in by_group.items():
+        condition |= Q(**{group_field: group_id, f'{student_field}__in': student_ids})
+    return condition
+
+
+def _write_stats(memberships, submissions=None):
+    """A'zolik juftliklari uchun statistikani hisoblab, jadvalga upsert qiladi"""
+    if not memberships:
+        return []
+    if submissions is None:
+        submissions = Submission.objects.filter(
+            _pairs_filter(memberships, 'student_id', 'homework__group_id')
+        )
+
+    group_ids = {group_id for _, group_id in memberships}
+    totals = dict(
+        Homework.objects.filter(group_id__in=group_ids)
+        .values('group_id')
+        .annotate(total=Count('id'))
+        .values_list('group_id', 'total')
+    )
+    aggregates = {
+        (row['student_id'], row['homework__group_id']): row
+        for row in submissions.values('student_id', 'homework__group_id').annotate(
+            submitted=Count('id'),
+            graded=Count('id', filter=Q(is_graded=True)),
+            score=Sum('score_percent', filter=Q(is_graded=True)),
+        )
+    }
+
+    rows = []
+    for student_id, group_id in memberships:
+        data = aggregates.get((student_id, group_id), {})
+        rows.append(StudentGroupStats(
+            student_id=student_id,
+            group_id=group_id,
+            submitted_count=data.get('submitted', 0),
+            graded_count=data.get('graded', 0),
+            score_sum=data.get('score') or 0,
+            homework_total=totals.get(group_id, 0),
+        ))
+    return StudentGroupStats.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['student', 'group'],
+        update_fields=STATS_FIELDS + ['updated_at'],
+    )
+
+
+@transaction.atomic
+def refresh_stats(pairs):
+    """
+    Berilgan (student_id, group_id) juftliklari statistikasini qayta hisoblaydi.
+    Guruh a'zosi bo'lmagan juftliklar e'tiborsiz qoldiriladi.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return []
+
+    Membership = Group.students.through
+    memberships = set(
+        Membership.objects.filter(_pairs_filter(pairs, 'user_id', 'group_id'))
+        .values_list('user_id', 'group_id')
+    )
+    return _write_stats(memberships)
+
+
+def refresh_group_totals(group_id):
+    """Guruhga vazifa qo'shilganda faqat homework_total ustunini yangilash"""
+    total = Homework.objects.filter(group_id=group_id).count()
+    return StudentGroupStats.objects.filter(group_id=group_id).update(homework_total=total)
+
+
+def remove_stats(pairs):
+    pairs = set(pairs)
+    if pairs:
+        StudentGroupStats.objects.filter(_pairs_filter(pairs, 'student_id', 'group_id')).delete()
+
+
+@transaction.atomic
+def rebuild_stats(groups=None):
+    """
+    Jadvalni noldan tiklash. groups berilmasa barcha guruhlar qayta hisoblanadi.
+    Qaytaradi: (yozilgan qatorlar, o'chirilgan qatorlar)
+    """
+    Membership = Group.students.through
+    memberships = Membership.objects.all()
+    stats = StudentGroupStats.objects.all()
+    submissions = Submission.objects.all()
+    if groups is not None:
+        memberships = memberships.filter(group__in=groups)
+        stats = stats.filter(group__in=groups)
+        submissions = submissions.filter(homework__group__in=groups)
+
+    is_member = Membership.objects.filter(
+        group_id=OuterRef('group_id'),
+        user_id=OuterRef('student_id')
+    )
+    deleted, _ = stats.filter(~Exists(is_member)).delete()
+    written = _write_stats(set(memberships.values_list('user_id', 'group_id')), submissions)
+    return len(written), deleted
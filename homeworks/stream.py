@@ -0,0 +1,72 @@
+"""
+Bildirishnomalar uchun Server-Sent Events oqimi (ASGI ostida ishlaydi).
+
+Oqim foydalanuvchining last_id dan keyingi Notification qatorlarini yuboradi va keyin
+notifications.broker uyg'otishini kutadi. Bir nechta worker bo'lsa broker boshqa
+jarayondagi yozuvlarni ko'rmaydi, shuning uchun kutish NOTIFICATION_STREAM_POLL_SECONDS
+bilan cheklangan va har safar DB qayta tekshiriladi (bu vaqtda ": ping" ham yuboriladi).
+Ulanish NOTIFICATION_STREAM_MAX_SECONDS dan keyin yopiladi; brauzer EventSource
+Last-Event-ID bilan qayta ulanib, qolgan joyidan davom etadi.
+"""
+import asyncio
+import json
+import time
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Notification
+from .notifications import aunread_count, broker
+
+BATCH_SIZE = 50
+RETRY_MS = 5000
+
+
+def format_event(notification, unread):
+    data = {
+        'id': notification.pk,
+        'type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'homework_id': notification.related_homework_id,
+        'created_at': notification.created_at,
+        'unread': unread,
+    }
+    return f'id: {notification.pk}\nevent: notification\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+async def latest_id(user_id):
+    return await Notification.objects.filter(user_id=user_id).order_by('-pk').values_list('pk', flat=True).afirst() or 0
+
+
+async def event_stream(user_id, last_id, poll_seconds=None, max_seconds=None):
+    """last_id dan keyingi bildirishnomalarni SSE matni ko'rinishida beruvchi async generator"""
+    poll_seconds = poll_seconds or settings.NOTIFICATION_STREAM_POLL_SECONDS
+    deadline = time.monotonic() + (max_seconds or settings.NOTIFICATION_STREAM_MAX_SECONDS)
+    waiter = broker.subscribe(user_id)
+    _, wake = waiter
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        while True:
+            # Event so'rovdan oldin tozalanadi: so'rov paytidagi publish keyingi kutishni darhol tugatadi
+            wake.clear()
+            rows = [
+                notification async for notification in Notification.objects.filter(
+                    user_id=user_id, pk__gt=last_id
+                ).order_by('pk')[:BATCH_SIZE]
+            ]
+            if rows:
+                unread = await aunread_count(user_id)
+                for notification in rows:
+                    yield format_event(notification, unread)
+                last_id = rows[-1].pk
+                if len(rows) == BATCH_SIZE:
+                    continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=min(poll_seconds, remaining))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+    finally:
+        broker.unsubscribe(user_id, waiter)
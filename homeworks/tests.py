@@ -1,3 +1,895 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import BytesIO, StringIO
+import asyncio
+import gzip
+import json
+import shutil
+import tempfile
+from unittest import mock
+from pathlib import Path
+from openpyxl import load_workbook
+from django.core.management import call_command
+from django.db import connection
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from academy.models import Course, Group
+from users.models import User
+from .models import Homework, Submission, Notification, NotificationCounter, DeadlineCheckpoint, StudentGroupStats, ExportJob, StoredFile
+from .notifications import broker, mark_read, notify, unread_count
+from .retention import delete_in_batches, duplicate_notifications, expired_notifications
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from core.middleware import RequestTimingMiddleware, worker_log_path
+from core.benchmark import QueryCountBenchmarkMixin, generate_data, index_misses, scaled_size
+from . import benchmarks
+from .export_jobs import claim_job
+from .grading import bulk_grade
+from .files import collect_garbage, recount_references
+from .export import export_all_submissions, export_course_report, export_group_report, save_workbook
+from . import leaderboard
+from .utils import auto_grade_missed_homeworks, fill_missed_submissions, insert_new, is_homework_locked, locked_ids_for
 
-# Create your tests here.
+
+def make_group(name='G-1', students=0, course=None):
+    course = course or Course.objects.create(name=f'Kurs {name}')
+    group = Group.objects.create(name=name, course=course)
+    group.students.add(*[
+        User.objects.create(username=f'{name}-s{i}', role='STUDENT')
+        for i in range(students)
+    ])
+    return group
+
+
+def make_homeworks(group, count, deadline=None, start=1):
+    deadline = deadline or timezone.now() - timedelta(days=1)
+    return [
+        Homework.objects.create(
+            title=f'HW {i}', description='-', deadline=deadline,
+            group=group, sequence=i
+        )
+        for i in range(start, start + count)
+    ]
+
+
+class AutoGradeMissedHomeworksTests(TestCase):
+    def test_fills_only_missing_pairs(self):
+        group = make_group(students=2)
+        student, other = group.students.order_by('id')
+        expired = make_homeworks(group, 3)
+        make_homeworks(group, 1, deadline=timezone.now() + timedelta(days=1), start=4)
+        Submission.objects.create(homework=expired[0], student=student, content='ok')
+
+        created = fill_missed_submissions()
+
+        self.assertEqual(len(created), 5)
+        self.assertEqual(Submission.objects.filter(student=student).count(), 3)
+        self.assertEqual(Submission.objects.filter(student=other, is_graded=True, score_percent=0).count(), 3)
+        self.assertEqual(fill_missed_submissions(), [])
+
+    def test_returns_only_inserted_rows(self):
+        group = make_group(students=2)
+        student, other = group.students.order_by('id')
+        homework = make_homeworks(group, 1)[0]
+
+        def submitted_meanwhile(objs):
+            # Anti-join'dan keyin, INSERT'dan oldin o'quvchi o'zi topshiradi
+            Submission.objects.create(homework=homework, student=student, content='ok')
+            return insert_new(objs)
+
+        with mock.patch('homeworks.utils.insert_new', side_effect=submitted_meanwhile):
+            created = fill_missed_submissions()
+
+        self.assertEqual([sub.student_id for sub in created], [other.pk])
+        self.assertEqual(Submission.objects.get(student=student).content, 'ok')
+        self.assertEqual(StudentGroupStats.objects.get(student=student, group=group).graded_count, 0)
+
+    def test_concurrent_fill_reports_rows_once(self):
+        group = make_group(students=2)
+        make_homeworks(group, 1)
+        first = []
+
+        def other_caller_first(objs):
+            # Anti-join'dan keyin, INSERT'dan oldin boshqa chaqiruv (masalan dashboard) shu juftliklarni yozadi
+            if not first:
+                first.append(None)
+                first.extend(fill_missed_submissions())
+            return insert_new(objs)
+
+        with mock.patch('homeworks.utils.insert_new', side_effect=other_caller_first):
+            created = fill_missed_submissions()
+
+        self.assertEqual((len(first) - 1, created), (2, []))
+        self.assertEqual(Submission.objects.count(), 2)
+
+    def test_query_count_is_constant(self):
+        """Vazifalar va o'quvchilar soni so'rovlar soniga ta'sir qilmaydi"""
+        counts = []
+        for size in (2, 8):
+            group = make_group(name=f'G-{size}', students=size)
+            make_homeworks(group, size)
+            student = group.students.first()
+
+            with CaptureQueriesContext(connection) as per_student:
+                auto_grade_missed_homeworks(student)
+            with CaptureQueriesContext(connection) as everyone:
+                fill_missed_submissions()
+            with self.assertNumQueries(1):
+                fill_missed_submissions()
+            counts.append((len(per_student), len(everyone)))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class CheckDeadlinesCommandTests(TestCase):
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('check_deadlines', *args, stdout=out)
+        return out.getvalue()
+
+    def test_only_new_deadlines_after_watermark(self):
+        group = make_group(students=2)
+        make_homeworks(group, 2)
+        self.run_command()
+        self.assertEqual(Submission.objects.count(), 4)
+        checkpoint = DeadlineCheckpoint.objects.get(name='check_deadlines')
+
+        # Eski vazifalar oddiy rejimda qayta ko'rilmaydi
+        output = self.run_command()
+        self.assertIn('Muddati tugagan vazifalar: 0', output)
+        self.assertIn('Auto-graded: 0', output)
+
+        self.run_command('--full')
+        self.assertEqual(Submission.objects.count(), 4)
+
+    def test_backdated_homework_after_run_is_graded(self):
+        group = make_group(students=2)
+        make_homeworks(group, 1)
+        self.run_command()
+        checkpoint = DeadlineCheckpoint.objects.get(name='check_deadlines')
+
+        # Watermark'dan keyin o'tgan sana bilan qo'shilgan vazifa
+        make_homeworks(group, 1, deadline=checkpoint.processed_until - timedelta(hours=1), start=2)
+        output = self.run_command()
+        self.assertIn('Auto-graded: 2', output)
+
+        # Muddati watermark'dan oldingi sanaga surilgan vazifa
+        later = make_homeworks(group, 1, deadline=timezone.now() + timedelta(days=1), start=3)[0]
+        self.run_command()
+        later.deadline = checkpoint.processed_until - timedelta(days=1)
+        later.save()
+        output = self.run_command()
+        self.assertIn('Muddati tugagan vazifalar: 1', output)
+        self.assertIn('Auto-graded: 2', output)
+        self.assertEqual(Submission.objects.count(), 6)
+
+    def test_since_and_warnings(self):
+        group = make_group(students=3)
+        make_homeworks(group, 1, deadline=timezone.now() - timedelta(days=10))
+        upcoming = make_homeworks(group, 1, deadline=timezone.now() + timedelta(minutes=30), start=2)[0]
+        Submission.objects.create(homework=upcoming, student=group.students.first())
+
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        self.run_command('--since', since)
+        self.assertEqual(Submission.objects.filter(is_graded=True).count(), 0)
+        self.assertEqual(Notification.objects.filter(notification_type='DEADLINE').count(), 2)
+
+        self.run_command()
+        self.assertEqual(Notification.objects.filter(notification_type='DEADLINE').count(), 2)
+
+
+class HomeworkLockTests(TestCase):
+    def setUp(self):
+        self.group = make_group(students=1)
+        self.student = self.group.students.get()
+        self.homeworks = make_homeworks(self.group, 4, deadline=timezone.now() + timedelta(days=1))
+
+    def test_frontier_locks_everything_after_first_unsubmitted(self):
+        first, second, third, fourth = self.homeworks
+        Submission.objects.create(homework=first, student=self.student)
+        Submission.objects.create(homework=third, student=self.student)
+
+        with self.assertNumQueries(1):
+            locked = locked_ids_for(self.student, self.homeworks)
+        self.assertEqual(locked, {third.pk, fourth.pk})
+        self.assertFalse(is_homework_locked(self.student, second))
+        self.assertTrue(is_homework_locked(self.student, fourth))
+
+    def test_list_view_query_count_does_not_grow(self):
+        self.client.force_login(self.student)
+        url = reverse('homework_list')
+        # sessiya, foydalanuvchi, 3 ta ro'yxat so'rovi va navbar badge hisoblagichi
+        with self.assertNumQueries(6):
+            self.client.get(url)
+        make_homeworks(self.group, 6, deadline=timezone.now() + timedelta(days=1), start=5)
+        with self.assertNumQueries(6):
+            self.client.get(url)
+
+
+class StudentGroupStatsTests(TestCase):
+    def setUp(self):
+        self.group = make_group(students=2)
+        self.student, self.other = self.group.students.order_by('id')
+
+    def stats(self, student=None):
+        return StudentGroupStats.objects.get(student=student or self.student, group=self.group)
+
+    def test_maintained_on_writes(self):
+        first, second = make_homeworks(self.group, 2, deadline=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.stats().homework_total, 2)
+
+        submission = Submission.objects.create(homework=first, student=self.student)
+        submission.is_graded = True
+        submission.score_percent = 80
+        submission.save()
+        row = self.stats()
+        self.assertEqual((row.submitted_count, row.graded_count, row.score_sum), (1, 1, 80))
+        self.assertEqual(row.avg_score, 80)
+
+        first.delete()
+        row = self.stats()
+        self.assertEqual((row.submitted_count, row.homework_total), (0, 1))
+
+        self.group.students.remove(self.other)
+        self.assertFalse(StudentGroupStats.objects.filter(student=self.other).exists())
+        self.other.study_groups.add(self.group)
+        self.assertEqual(self.stats(self.other).homework_total, 1)
+
+    def test_auto_grade_updates_stats(self):
+        make_homeworks(self.group, 3)
+        fill_missed_submissions()
+        row = self.stats()
+        self.assertEqual((row.submitted_count, row.graded_count, row.score_sum), (3, 3, 0))
+
+    def test_rebuild_command_repairs_table(self):
+        homework = make_homeworks(self.group, 1)[0]
+        Submission.objects.create(homework=homework, student=self.student, is_graded=True, score_percent=50)
+        StudentGroupStats.objects.all().update(score_sum=999, homework_total=0)
+        StudentGroupStats.objects.filter(student=self.other).delete()
+
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self.stats().score_sum, 50)
+        self.assertEqual(self.stats(self.other).homework_total, 1)
+
+
+class GroupStatsViewTests(TestCase):
+    def test_query_count_independent_of_group_size(self):
+        admin = User.objects.create(username='admin', role='ADMIN')
+        self.client.force_login(admin)
+        counts = []
+        for size in (2, 10):
+            group = make_group(name=f'G-{size}', students=size)
+            homeworks = make_homeworks(group, size)
+            for student in group.students.all()[:size // 2]:
+                Submission.objects.create(homework=homeworks[0], student=student, is_graded=True, score_percent=90)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('group_stats', args=[group.pk]))
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+
+            averages = sorted(s['avg_score'] for s in response.context['stats'])
+            self.assertEqual(averages[-1], 90)
+            self.assertEqual(averages[0], 0)
+            self.assertEqual(response.context['stats'][0]['total'], size)
+            homework_reads = [q for q in queries if 'FROM "homeworks_homework"' in q['sql']]
+            self.assertEqual(len(homework_reads), 1)
+        self.assertEqual(counts[0], counts[1])
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.homeworks = make_homeworks(make_group('A'), 1) + make_homeworks(make_group('B'), 2)
+
+    def attach(self, homework, content, name='starter.py'):
+        homework.file.save(name, ContentFile(content))
+        return homework.file.name
+
+    def references(self, name):
+        return StoredFile.objects.filter(name=name).values_list('references', flat=True).first()
+
+    def test_identical_uploads_are_stored_once(self):
+        first = self.attach(self.homeworks[0], b'print(1)')
+        second = self.attach(self.homeworks[1], b'print(1)', name='boshqa.py')
+        other = self.attach(self.homeworks[2], b'print(2)')
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r'^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}/starter\.py$')
+        self.assertEqual(self.homeworks[1].file_name, 'starter.py')
+        self.assertEqual((self.references(first), self.references(other)), (2, 1))
+        with default_storage.open(first) as handle:
+            self.assertEqual(handle.read(), b'print(1)')
+
+    def test_long_names_fit_max_length(self):
+        name = self.attach(self.homeworks[0], b'-', name='x' * 300 + '.pdf')
+        self.assertEqual(len(name), 255)
+        self.assertTrue(name.endswith('x.pdf'))
+
+    def test_references_follow_replace_and_delete(self):
+        shared = self.attach(self.homeworks[0], b'print(1)')
+        self.attach(self.homeworks[1], b'print(1)')
+        replaced = self.attach(self.homeworks[1], b'print(3)')
+        self.assertEqual((self.references(shared), self.references(replaced)), (1, 1))
+
+        self.homeworks[0].delete()
+        # Fayl o'chirilmaydi, faqat havolasi kamayadi
+        self.assertEqual(self.references(shared), 0)
+        self.assertTrue(default_storage.exists(shared))
+
+    def test_garbage_collection(self):
+        shared = self.attach(self.homeworks[0], b'print(1)')
+        self.attach(self.homeworks[1], b'print(1)')
+        orphan = default_storage.save('tashlab-ketilgan.txt', ContentFile(b'orphan'))
+        self.homeworks[0].delete()
+
+        # Yangi fayllar grace davrida saqlanadi
+        self.assertEqual(collect_garbage()['files'], 0)
+
+        StoredFile.objects.filter(name=shared).update(references=0)
+        self.assertEqual(recount_references(), 1)
+        self.assertEqual(self.references(shared), 1)
+
+        out = StringIO()
+        call_command('gc_files', '--grace-hours', '0', '--dry-run', stdout=out)
+        self.assertIn("o'chiriladi 1", out.getvalue())
+        self.assertTrue(default_storage.exists(orphan))
+
+        report = collect_garbage(grace=timedelta(0))
+        self.assertEqual(report, {'files': 1, 'bytes': 6, 'rows': 0})
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(Path(default_storage.path(orphan)).parent.parent.exists())
+        self.assertTrue(default_storage.exists(shared))
+
+        self.homeworks[1].delete()
+        self.assertEqual(collect_garbage(grace=timedelta(0))['files'], 1)
+        self.assertFalse(StoredFile.objects.exists())
+        self.assertEqual(list(Path(self.media, 'cas').iterdir()), [])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.group = make_group(students=3)
+        self.homeworks = make_homeworks(self.group, 2)
+        fill_missed_submissions()
+        self.client.force_login(User.objects.create(username='admin', role='ADMIN'))
+
+    def run_jobs(self):
+        call_command('run_export_jobs', '--once', '--workers', '0', stdout=StringIO())
+
+    def download(self, url):
+        response = self.client.get(url)
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, reverse('export_job_detail', args=[job.pk]))
+        self.run_jobs()
+
+        # Ma'lumot o'zgarmagan - tayyor fayl qayta ishlatiladi
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('export_job_download', args=[job.pk]), fetch_redirect_response=False)
+        self.assertEqual(ExportJob.objects.count(), 1)
+
+        response = self.client.get(reverse('export_job_download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+
+    def test_export_all_streams_valid_workbook(self):
+        wb = self.download(reverse('export_all'))
+        self.assertEqual(wb.sheetnames, ['Natijalar', "O'rtachalar"])
+        rows = list(wb['Natijalar'].values)
+        self.assertEqual(rows[0][0], "O'quvchi ismi")
+        self.assertEqual(len(rows), 1 + 6)
+
+    def test_group_report_layout(self):
+        wb = self.download(reverse('export_group', args=[self.group.pk]))
+        rows = list(wb[self.group.name].values)
+        self.assertEqual(rows[0][0], f'Guruh: {self.group.name}')
+        self.assertEqual(rows[3], ("O'quvchi", 'HW 1', 'HW 2', "O'rtacha %"))
+        self.assertEqual(len(rows), 4 + 3)
+
+    def test_data_change_creates_new_job(self):
+        url = reverse('export_course', args=[self.group.course_id])
+        self.client.get(url)
+        self.run_jobs()
+        Submission.objects.filter(homework=self.homeworks[0]).update(graded_at=timezone.now())
+
+        response = self.client.get(url)
+        self.assertEqual(ExportJob.objects.count(), 2)
+        status = self.client.get(reverse('export_job_status', args=[ExportJob.objects.first().pk])).json()
+        self.assertEqual(status['status'], 'PENDING')
+
+    def test_rename_creates_new_job(self):
+        url = reverse('export_group', args=[self.group.pk])
+        self.client.get(url)
+        self.run_jobs()
+        self.homeworks[0].title = 'Yangi nom'
+        self.homeworks[0].save()
+        self.client.get(url)
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+    @override_settings(EXPORT_JOB_TIMEOUT=60)
+    def test_stale_running_job_is_requeued(self):
+        url = reverse('export_group', args=[self.group.pk])
+        self.client.get(url)
+        job = ExportJob.objects.get()
+        self.assertTrue(claim_job(job.pk))
+
+        # Yangi RUNNING job'ga tegilmaydi
+        self.client.get(url)
+        self.run_jobs()
+        self.assertEqual(ExportJob.objects.get().status, ExportJob.Status.RUNNING)
+
+        # Worker o'lib, job RUNNING da qolib ketgan
+        ExportJob.objects.update(started_at=timezone.now() - timedelta(minutes=5))
+        self.client.get(url)
+        self.assertEqual(ExportJob.objects.get().status, ExportJob.Status.PENDING)
+        self.run_jobs()
+        self.assertEqual(ExportJob.objects.get().status, ExportJob.Status.DONE)
+
+        # Navbatga qaytarilmagan bo'lsa ham worker uni oladi
+        ExportJob.objects.update(status=ExportJob.Status.RUNNING, started_at=timezone.now() - timedelta(minutes=5))
+        self.run_jobs()
+        self.assertEqual(ExportJob.objects.get().status, ExportJob.Status.DONE)
+
+    @override_settings(EXPORT_JOBS_INLINE=True)
+    def test_inline_mode_builds_without_worker(self):
+        response = self.client.get(reverse('export_group', args=[self.group.pk]))
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.Status.DONE)
+        self.assertRedirects(response, reverse('export_job_download', args=[job.pk]), fetch_redirect_response=False)
+
+
+class ExportQueryCountTests(TestCase):
+    def build(self, size):
+        group = make_group(name=f'G-{size}', students=size)
+        homeworks = make_homeworks(group, size)
+        for student in group.students.all():
+            Submission.objects.create(homework=homeworks[0], student=student, is_graded=True, score_percent=75)
+        fill_missed_submissions()
+        return group
+
+    def count_queries(self, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            save_workbook(func(*args, **kwargs)).close()
+        return len(queries)
+
+    def test_group_report_pivot_is_constant(self):
+        small, large = self.build(2), self.build(9)
+        self.assertEqual(
+            self.count_queries(export_group_report, small.pk),
+            self.count_queries(export_group_report, large.pk)
+        )
+
+    def test_all_submissions_averages_sheet_is_constant(self):
+        self.build(2)
+        small = self.count_queries(export_all_submissions)
+        self.build(9)
+        self.assertEqual(small, self.count_queries(export_all_submissions))
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = make_group(students=3)
+        self.students = list(self.group.students.order_by('id'))
+        self.homework = make_homeworks(self.group, 1)[0]
+        for student, score in zip(self.students, (40, 90, 70)):
+            Submission.objects.create(
+                homework=self.homework, student=student, content='-',
+                is_graded=True, score_percent=score
+            )
+
+    def test_ranking_order(self):
+        entries = leaderboard.get_leaderboard(limit=10)
+        self.assertEqual([e['avg_score'] for e in entries], [90, 70, 40])
+        self.assertEqual([e['rank'] for e in entries], [1, 2, 3])
+        self.assertEqual(entries[0]['group_name'], self.group.name)
+        self.assertEqual(leaderboard.get_leaderboard_count(group_id=self.group.pk), 3)
+
+    def test_cached_until_grading(self):
+        leaderboard.get_leaderboard(limit=10)
+        with self.assertNumQueries(0):
+            leaderboard.get_leaderboard(limit=10)
+
+        submission = Submission.objects.get(student=self.students[0])
+        submission.score_percent = 100
+        submission.save()
+
+        self.assertEqual(leaderboard.get_leaderboard(limit=1)[0]['id'], self.students[0].pk)
+
+    def test_blocking_or_renaming_student_invalidates(self):
+        leaderboard.get_leaderboard(limit=10)
+        student = self.students[1]
+        student.first_name = 'Yangi'
+        student.save(update_fields=['first_name'])
+        self.assertEqual(leaderboard.get_leaderboard(limit=1)[0]['full_name'], 'Yangi')
+
+        student.is_active = False
+        student.save()
+        self.assertNotIn(student.pk, [e['id'] for e in leaderboard.get_leaderboard(limit=10)])
+
+        # last_login kabi boshqa maydonlar reytingni eskirtirmaydi
+        leaderboard.get_leaderboard(limit=10)
+        self.students[0].save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            leaderboard.get_leaderboard(limit=10)
+
+    def test_api_paginates(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='admin', role='ADMIN'))
+        response = client.get('/api/v1/leaderboard/', {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual([e['rank'] for e in response.json()['results']], [3])
+
+    def test_api_access_by_role(self):
+        client = APIClient()
+        client.force_authenticate(self.students[0])
+        self.assertEqual(client.get('/api/v1/leaderboard/').status_code, 403)
+        self.assertEqual(client.get('/api/v1/leaderboard/', {'group': self.group.pk}).status_code, 403)
+
+        teacher = User.objects.create(username='teacher', role='TEACHER')
+        self.group.teachers.add(teacher)
+        other = make_group(name='G-2', course=Course.objects.create(name='Boshqa'))
+        client.force_authenticate(teacher)
+        self.assertEqual(client.get('/api/v1/leaderboard/').status_code, 403)
+        self.assertEqual(client.get('/api/v1/leaderboard/', {'group': other.pk}).status_code, 403)
+        self.assertEqual(client.get('/api/v1/leaderboard/', {'course': other.course_id}).status_code, 403)
+        self.assertEqual(client.get('/api/v1/leaderboard/', {'group': self.group.pk}).status_code, 200)
+        self.assertEqual(client.get('/api/v1/leaderboard/', {'course': self.group.course_id}).status_code, 200)
+
+
+class BulkGradeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = make_group(students=4)
+        self.teacher = User.objects.create(username='teacher', role='TEACHER')
+        self.group.teachers.add(self.teacher)
+        self.homework = make_homeworks(self.group, 1)[0]
+        self.submissions = [
+            Submission.objects.create(homework=self.homework, student=student, content='-')
+            for student in self.group.students.order_by('id')
+        ]
+
+    def entries(self, score=80):
+        return [(submission.pk, score, 'Yaxshi') for submission in self.submissions]
+
+    def test_grades_notifies_and_refreshes_stats(self):
+        leaderboard.get_leaderboard(limit=10)
+        bulk_grade(self.teacher, self.entries())
+
+        self.assertEqual(Submission.objects.filter(is_graded=True, score_percent=80, graded_by=self.teacher).count(), 4)
+        self.assertEqual(Notification.objects.filter(notification_type='GRADED').count(), 4)
+        self.assertEqual(set(StudentGroupStats.objects.values_list('graded_count', 'score_sum')), {(1, 80)})
+        self.assertEqual(leaderboard.get_leaderboard(limit=1)[0]['avg_score'], 80)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            bulk_grade(self.teacher, self.entries()[:1])
+        with CaptureQueriesContext(connection) as large:
+            bulk_grade(self.teacher, self.entries())
+        self.assertEqual(len(small), len(large))
+
+    def test_foreign_group_is_rejected_atomically(self):
+        other = make_group(name='G-2', students=1)
+        foreign = Submission.objects.create(
+            homework=make_homeworks(other, 1)[0], student=other.students.get(), content='-'
+        )
+        with self.assertRaises(PermissionDenied):
+            bulk_grade(self.teacher, self.entries() + [(foreign.pk, 50, '')])
+        self.assertFalse(Submission.objects.filter(is_graded=True).exists())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_invalid_entries(self):
+        with self.assertRaises(ValidationError):
+            bulk_grade(self.teacher, [(self.submissions[0].pk, 101, '')])
+        with self.assertRaises(ValidationError):
+            bulk_grade(self.teacher, [(0, 50, '')])
+
+    def test_grading_page(self):
+        self.client.force_login(self.teacher)
+        url = reverse('grade_homework', args=[self.homework.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        data = {f'score_{self.submissions[0].pk}': 65, f'comment_{self.submissions[0].pk}': 'Izoh'}
+        response = self.client.post(url, data)
+        self.assertRedirects(response, reverse('homework_detail', args=[self.homework.pk]))
+        self.assertEqual(Submission.objects.filter(is_graded=True).get().score_percent, 65)
+
+    def test_grading_page_skips_unchanged_rows(self):
+        bulk_grade(self.teacher, self.entries()[:2])
+        graded_at = dict(Submission.objects.values_list('pk', 'graded_at'))
+        self.client.force_login(self.teacher)
+        url = reverse('grade_homework', args=[self.homework.pk])
+
+        # Sahifa oldindan to'ldirilgan baholar bilan qayta yuboriladi, faqat bittasi o'zgargan
+        with CaptureQueriesContext(connection) as queries:
+            form = self.client.get(url).context['form']
+        # Vazifaning o'zi va topshiriqlar (JOIN bilan) - qatorlar soniga bog'liq emas
+        self.assertEqual(sum('homeworks_homework' in q['sql'] for q in queries), 2)
+        data = {name: field.initial for name, field in form.fields.items() if field.initial is not None}
+        data[f'score_{self.submissions[1].pk}'] = 95
+        self.client.post(url, data)
+
+        self.assertEqual(Notification.objects.filter(notification_type='GRADED').count(), 3)
+        first, second = Submission.objects.filter(pk__in=[self.submissions[0].pk, self.submissions[1].pk]).order_by('pk')
+        self.assertEqual(first.graded_at, graded_at[first.pk])
+        self.assertEqual((second.score_percent, second.teacher_comment), (95, 'Yaxshi'))
+
+        response = self.client.post(url, data | {f'score_{self.submissions[1].pk}': 95})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Notification.objects.filter(notification_type='GRADED').count(), 3)
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        grades = [{'submission_id': pk, 'score_percent': 90} for pk, _, _ in self.entries()]
+        response = client.post('/api/v1/submissions/bulk_grade/', {'grades': grades}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['graded'], 4)
+
+        client.force_authenticate(self.group.students.first())
+        response = client.post('/api/v1/submissions/bulk_grade/', {'grades': grades}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.group = make_group(students=3)
+        self.students = list(self.group.students.order_by('id'))
+        self.student = self.students[0]
+
+    def counter(self, user=None):
+        return NotificationCounter.objects.get(user=user or self.student).unread
+
+    def make(self, user=None, **kwargs):
+        return Notification.objects.create(user=user or self.student, title='-', message='-', **kwargs)
+
+    def test_single_create_read_delete(self):
+        first, second = self.make(), self.make()
+        self.make(is_read=True)
+        self.assertEqual(self.counter(), 2)
+
+        first.is_read = True
+        first.save()
+        self.assertEqual(self.counter(), 1)
+        first.save()
+        self.assertEqual(self.counter(), 1)
+
+        second.delete()
+        self.assertEqual(self.counter(), 0)
+
+    def test_bulk_fan_out_and_mark_read(self):
+        homework = make_homeworks(self.group, 1)[0]
+        notify([
+            Notification(user=student, notification_type='NEW_HW', title='-', message='-', related_homework=homework)
+            for student in self.students
+        ])
+        self.assertEqual([self.counter(student) for student in self.students], [1, 1, 1])
+
+        self.assertEqual(mark_read(self.student), 1)
+        self.assertEqual(mark_read(self.student), 0)
+        self.assertEqual(self.counter(), 0)
+
+        # Vazifa o'chirilsa bildirishnomalar kaskad bo'yicha o'chadi
+        homework.delete()
+        self.assertEqual(self.counter(self.students[1]), 0)
+
+    def test_badge_does_not_scan_notifications(self):
+        self.make()
+        self.client.force_login(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('notifications'))
+        self.assertEqual(response.context['unread_notifications_count'], 1)
+        self.assertContains(response, 'badge badge-danger xs')
+        self.assertEqual(unread_count(self.students[2]), 0)
+        self.assertEqual(
+            [q['sql'] for q in queries if 'COUNT' in q['sql'] and '"is_read"' in q['sql']], []
+        )
+
+    def test_user_delete_cascades(self):
+        self.make()
+        self.student.delete()
+        self.assertFalse(NotificationCounter.objects.exists())
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.group = make_group(students=1)
+        self.student = self.group.students.get()
+        self.homework = make_homeworks(self.group, 1)[0]
+
+    def make(self, days_ago=0, **kwargs):
+        notification = Notification.objects.create(
+            user=self.student, title='-', message='-', related_homework=self.homework, **kwargs
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return notification
+
+    def test_expired_and_duplicates(self):
+        old_read = self.make(days_ago=200, is_read=True, notification_type='NEW_HW')
+        self.make(days_ago=200, notification_type='DEADLINE')
+        first_grade = self.make(days_ago=5, notification_type='GRADED')
+        last_grade = self.make(days_ago=1, notification_type='GRADED')
+
+        self.assertEqual(list(expired_notifications(days=90)), [old_read])
+        self.assertEqual(list(duplicate_notifications()), [first_grade])
+
+        self.assertEqual(delete_in_batches(duplicate_notifications(), batch_size=1), 1)
+        self.assertTrue(Notification.objects.filter(pk=last_grade.pk).exists())
+        self.assertEqual(unread_count(self.student), 2)
+
+    def test_command_archives_in_batches(self):
+        for _ in range(3):
+            self.make(days_ago=200, is_read=True, notification_type='NEW_HW')
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, ignore_errors=True)
+
+        out = StringIO()
+        call_command('prune_notifications', '--batch-size', '1', '--archive-dir', archive_dir, stdout=out)
+        self.assertIn('duplicates: o\'chirildi 2', out.getvalue())
+        self.assertFalse(Notification.objects.exists())
+
+        [archive] = list(Path(archive_dir).iterdir())
+        with gzip.open(archive, 'rt') as handle:
+            self.assertEqual(len(handle.readlines()), 3)
+
+    def test_paginated_list_and_mark_all(self):
+        for _ in range(25):
+            Notification.objects.create(user=self.student, title='-', message='-')
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('notifications'), {'page': 2})
+        self.assertEqual(len(response.context['notifications']), 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('mark_all_notifications_read'))
+        updates = [q for q in queries if q['sql'].startswith('UPDATE "homeworks_notification"')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertEqual(unread_count(self.student), 0)
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.group = make_group(students=1)
+        self.student = self.group.students.get()
+        self.first = Notification.objects.create(user=self.student, title='Birinchi', message='-')
+
+    async def open_stream(self, **headers):
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('notification_stream'), headers=headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+        return chunks
+
+    async def next_event(self, chunks):
+        while True:
+            chunk = await asyncio.wait_for(anext(chunks), timeout=5)
+            if chunk.startswith(b'id:'):
+                return json.loads(chunk.decode().split('data: ', 1)[1])
+
+    @override_settings(NOTIFICATION_STREAM_POLL_SECONDS=60)
+    async def test_resume_and_publish_wakeup(self):
+        chunks = await self.open_stream(**{'Last-Event-ID': '0'})
+        try:
+            event = await self.next_event(chunks)
+            self.assertEqual((event['id'], event['title'], event['unread']), (self.first.pk, 'Birinchi', 1))
+
+            second = await Notification.objects.acreate(user=self.student, title='Ikkinchi', message='-')
+            broker.publish([self.student.pk])
+            event = await self.next_event(chunks)
+            self.assertEqual((event['id'], event['unread']), (second.pk, 2))
+        finally:
+            await chunks.aclose()
+
+    @override_settings(NOTIFICATION_STREAM_POLL_SECONDS=0.05)
+    async def test_polling_fallback_without_broker(self):
+        chunks = await self.open_stream()
+        try:
+            # Yangi ulanish eski bildirishnomalarni qayta yubormaydi
+            second = await Notification.objects.acreate(user=self.student, title='Ikkinchi', message='-')
+            event = await self.next_event(chunks)
+            self.assertEqual(event['id'], second.pk)
+        finally:
+            await chunks.aclose()
+
+    def test_wsgi_gets_no_content(self):
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+
+    def test_page_opens_stream_only_under_asgi(self):
+        stream_url = reverse('notification_stream').encode()
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('notifications'))
+        self.assertFalse(response.context['notification_stream_enabled'])
+        self.assertNotIn(stream_url, response.content)
+
+        self.async_client.force_login(self.student)
+        response = async_to_sync(self.async_client.get)(reverse('notifications'))
+        self.assertTrue(response.context['notification_stream_enabled'])
+        self.assertIn(stream_url, response.content)
+
+
+class HotPathIndexTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest("EXPLAIN formati faqat SQLite/PostgreSQL uchun tekshiriladi")
+        generate_data(**scaled_size(1))
+        self.assertEqual(index_misses(), {})
+
+
+class HomeworksQueryBenchmarkTests(QueryCountBenchmarkMixin, TestCase):
+    def cases(self, data):
+        return benchmarks.cases(data)
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir, ignore_errors=True)
+        self.settings_override = override_settings(
+            REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_HEADER=True,
+            REQUEST_TIMING_LOG=f'{self.log_dir}/timing.jsonl'
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        group = make_group(students=1)
+        make_homeworks(group, 3)
+        self.client.force_login(group.students.get())
+
+    def last_entry(self):
+        with open(worker_log_path(f'{self.log_dir}/timing.jsonl')) as fh:
+            return json.loads(fh.readlines()[-1])
+
+    def test_server_timing_header_and_report(self):
+        for _ in range(3):
+            response = self.client.get(reverse('homework_list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        entry = self.last_entry()
+        self.assertEqual(entry['view'], 'homework_list')
+        self.assertGreater(entry['queries'], 0)
+        self.assertGreaterEqual(entry['top_sql_count'], 1)
+
+        out = StringIO()
+        call_command('request_timing_report', stdout=out)
+        self.assertIn('homework_list', out.getvalue())
+        self.assertIn('p95 ms', out.getvalue())
+
+    def test_header_is_opt_in(self):
+        with override_settings(REQUEST_TIMING_HEADER=False):
+            response = self.client.get(reverse('homework_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertGreater(self.last_entry()['queries'], 0)
+
+    def test_async_requests_stay_async_and_count_queries(self):
+        async def view(request):
+            await Homework.objects.acount()
+            return HttpResponse('ok')
+
+        middleware = RequestTimingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        response = async_to_sync(middleware)(request)
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertEqual(self.last_entry()['queries'], 1)
\ No newline at end of file
@@ -3,10 +3,14 @@ from .views import (
     HomeworkListView, HomeworkDetailView, HomeworkCreateView, 
     HomeworkUpdateView, HomeworkDeleteView,
     SubmissionCreateView, SubmissionDetailView,
-    GradeSubmissionView, TeacherSubmissionsView,
-    group_stats_view, mark_notification_read, notifications_list
+    GradeSubmissionView, TeacherSubmissionsView, grade_homework_view,
+    group_stats_view, mark_notification_read, mark_all_notifications_read, notifications_list,
+    notification_stream
+)
+from .export_views import (
+    export_all_view, export_group_view, export_course_view,
+    export_job_detail, export_job_status, export_job_download
 )
-from .export_views import export_all_view, export_group_view, export_course_view
 
 urlpatterns = [
     # Homework CRUD
@@ -18,6 +22,7 @@ urlpatterns = [
     
     # Submissions
     path('<int:homework_id>/submit/', SubmissionCreateView.as_view(), name='submission_create'),
+    path('<int:pk>/grade/', grade_homework_view, name='grade_homework'),
     path('submission/<int:pk>/', SubmissionDetailView.as_view(), name='submission_detail'),
     path('submission/<int:pk>/grade/', GradeSubmissionView.as_view(), name='grade_submission'),
     path('submissions/', TeacherSubmissionsView.as_view(), name='teacher_submissions'),
@@ -27,11 +32,16 @@ urlpatterns = [
     
     # Notifications
     path('notifications/', notifications_list, name='notifications'),
+    path('notifications/stream/', notification_stream, name='notification_stream'),
+    path('notifications/read-all/', mark_all_notifications_read, name='mark_all_notifications_read'),
     path('notifications/<int:notification_id>/read/', mark_notification_read, name='mark_notification_read'),
     
     # Excel Export
     path('export/', export_all_view, name='export_all'),
     path('export/group/<int:group_id>/', export_group_view, name='export_group'),
     path('export/course/<int:course_id>/', export_course_view, name='export_course'),
+    path('export/jobs/<int:pk>/', export_job_detail, name='export_job_detail'),
+    path('export/jobs/<int:pk>/status/', export_job_status, name='export_job_status'),
+    path('export/jobs/<int:pk>/download/', export_job_download, name='export_job_download'),
 ]
 
@@ -1,41 +1,170 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, Min, OuterRef
 from django.utils import timezone
-from .models import Homework, Submission
+from academy.models import Group
+from core import cache as payload_cache
+from .models import Homework, Submission, Notification
+from .notifications import notify
+from .stats import refresh_stats
+from . import leaderboard
+
+MISSED_DEADLINE_CONTENT = "Muddat o'tganligi sababli tizim tomonidan 0% ball qo'yildi."
+INSERT_BATCH_SIZE = 500
+
+
+def missing_submission_pairs(homeworks, student=None):
+    """
+    Anti-join: berilgan vazifalar uchun topshiriq qoldirmagan
+    (homework_id, student_id) juftliklarini bitta so'rovda topadi.
+    """
+    Membership = Group.students.through
+    memberships = Membership.objects.filter(group__homeworks__in=homeworks)
+    if student is not None:
+        memberships = memberships.filter(user=student)
+
+    submitted = Submission.objects.filter(
+        homework_id=OuterRef('homework_id'),
+        student_id=OuterRef('user_id')
+    )
+    return memberships.annotate(
+        homework_id=F('group__homeworks')
+    ).filter(
+        ~Exists(submitted)
+    ).values_list('homework_id', 'user_id')
+
+
+def insert_new(objs, batch_size=INSERT_BATCH_SIZE):
+    """
+    Faqat haqiqatan yozilgan obyektlarni qaytaruvchi bulk INSERT (signalsiz).
+    Har bir batch o'z savepoint'ida oddiy INSERT bilan yoziladi; unique_together
+    to'qnashuvi bo'lsa (parallel topshirish yoki boshqa chaqiruv) shu batch qatorma-qator
+    qayta yoziladi va to'qnashganlari tashlab yuboriladi. ignore_conflicts'dan farqli
+    ravishda ikki parallel chaqiruv bir qatorni ikkalasi ham "yozdim" demaydi.
+    """
+    if not objs:
+        return []
+    model, inserted = type(objs[0]), []
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        try:
+            with transaction.atomic():
+                inserted.extend(model.objects.bulk_create(batch))
+        except IntegrityError:
+            for obj in batch:
+                try:
+                    with transaction.atomic():
+                        inserted.extend(model.objects.bulk_create([obj]))
+                except IntegrityError:
+                    continue
+    return inserted
+
+
+def fill_missed_submissions(homeworks=None, student=None, content=MISSED_DEADLINE_CONTENT):
+    """
+    Deadline o'tgan vazifalar uchun topshirilmagan har bir juftlikka 0% qo'yadi.
+    Bitta SELECT (anti-join) va har 500 juftlikka bitta INSERT bilan ishlaydi, so'ng
+    tegishli StudentGroupStats qatorlari yangilanadi.
+    Shu chaqiruv yozgan Submission obyektlari ro'yxatini qaytaradi (insert_new).
+    """
+    if homeworks is None:
+        homeworks = Homework.objects.filter(deadline__lt=timezone.now())
+
+    pairs = missing_submission_pairs(homeworks, student=student).values_list(
+        'homework_id', 'user_id', 'group_id'
+    )
+    candidates, groups = [], {}
+    for homework_id, student_id, group_id in pairs:
+        groups[homework_id] = group_id
+        candidates.append(Submission(
+            homework_id=homework_id,
+            student_id=student_id,
+            score_percent=0,
+            is_graded=True,
+            content=content
+        ))
+    if not candidates:
+        return []
+
+    with transaction.atomic():
+        missed = insert_new(candidates)
+        if missed:
+            # bulk_create signal yubormaydi - statistikani o'zimiz yangilaymiz
+            refresh_stats({(sub.student_id, groups[sub.homework_id]) for sub in missed})
+    if missed:
+        leaderboard.invalidate()
+        payload_cache.invalidate(
+            users={sub.student_id for sub in missed}, groups={groups[sub.homework_id] for sub in missed}
+        )
+    return missed
+
+
+def send_deadline_warnings(homeworks):
+    """
+    Hali topshirmagan va ogohlantirilmagan o'quvchilarga DEADLINE bildirishnomasini
+    bitta anti-join va bitta bulk INSERT bilan yuboradi.
+    """
+    homeworks = {hw.pk: hw for hw in homeworks}
+    if not homeworks:
+        return []
+
+    warned = Notification.objects.filter(
+        user_id=OuterRef('user_id'),
+        related_homework_id=OuterRef('homework_id'),
+        notification_type=Notification.NotificationType.DEADLINE_WARNING
+    )
+    pairs = missing_submission_pairs(list(homeworks)).filter(~Exists(warned))
+    notifications = [
+        Notification(
+            user_id=student_id,
+            notification_type=Notification.NotificationType.DEADLINE_WARNING,
+            title='Vazifa muddati tugamoqda!',
+            message=f'"{homeworks[homework_id].title}" vazifasini topshirishga 1 soatdan kam vaqt qoldi. Shoshiling!',
+            related_homework_id=homework_id
+        )
+        for homework_id, student_id in pairs
+    ]
+    notify(notifications)
+    return notifications
+
 
 def auto_grade_missed_homeworks(student):
     """
     Checks all homeworks for the student's groups.
     If deadline passed and no submission exists, create a 0% submission.
     """
-    groups = student.study_groups.all()
-    homeworks = Homework.objects.filter(group__in=groups, deadline__lt=timezone.now())
-    
-    for hw in homeworks:
-        if not Submission.objects.filter(homework=hw, student=student).exists():
-            Submission.objects.create(
-                homework=hw,
-                student=student,
-                score_percent=0,
-                is_graded=True,
-                content="Avtomatik 0% (Muddat o'tgan)"
-            )
+    return fill_missed_submissions(student=student)
 
-def is_homework_locked(student, homework):
+def unlock_frontiers(student, group_ids):
     """
-    Content locking logic: student can only access homework if 
-    all previous homeworks in the same group (by sequence) have been submitted.
+    Har bir guruh uchun o'quvchi hali topshirmagan eng kichik sequence ("frontier").
+    Barcha vazifalar topshirilgan guruhlar natijada bo'lmaydi.
     """
-    previous_homeworks = Homework.objects.filter(
-        group=homework.group,
-        sequence__lt=homework.sequence
+    submitted = Submission.objects.filter(homework=OuterRef('pk'), student=student)
+    return dict(
+        Homework.objects.filter(group_id__in=group_ids)
+        .filter(~Exists(submitted))
+        .values('group_id')
+        .annotate(frontier=Min('sequence'))
+        .values_list('group_id', 'frontier')
     )
-    
-    for prev_hw in previous_homeworks:
-        submission = Submission.objects.filter(homework=prev_hw, student=student).first()
-        if not submission or (submission.is_graded and submission.score_percent == 0):
-            # If 0% due to missing deadline, it might still unlock if we allow it.
-            # But the requirement says "vazifa bajarilgandan keyin".
-            # Let's assume ANY submission (even 0% if deadline passed) unlocks it?
-            # Or better: Must be submitted or deadline passed.
-            if not submission:
-                return True
-    return False
+
+
+def locked_ids_for(student, homeworks):
+    """
+    Content locking logic: student can only access homework if
+    all previous homeworks in the same group (by sequence) have been submitted.
+    Berilgan vazifalardan qulflanganlarining id'larini bitta so'rov bilan qaytaradi.
+    """
+    homeworks = list(homeworks)
+    if not homeworks:
+        return set()
+
+    frontiers = unlock_frontiers(student, {hw.group_id for hw in homeworks})
+    return {
+        hw.pk for hw in homeworks
+        if hw.group_id in frontiers and hw.sequence > frontiers[hw.group_id]
+    }
+
+
+def is_homework_locked(student, homework):
+    return homework.pk in locked_ids_for(student, [homework])
@@ -1,15 +1,25 @@
+from django.conf import settings
+from django.core.paginator import Paginator
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.urls import reverse_lazy, reverse
-from django.http import HttpResponseForbidden
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.utils import timezone
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from .models import Homework, Submission, Notification
-from .forms import HomeworkForm, SubmissionForm, GradeSubmissionForm
-from .utils import is_homework_locked, auto_grade_missed_homeworks
+from .stats import annotate_group_students
+from .forms import HomeworkForm, SubmissionForm, GradeSubmissionForm, BulkGradeForm
+from .grading import bulk_grade, check_grader, graded_notification
+from .notifications import mark_read, notify
+from .stream import event_stream, latest_id
+from .utils import locked_ids_for
 from academy.models import Group
 
 
@@ -24,7 +34,15 @@ class HomeworkListView(LoginRequiredMixin, ListView):
         if user.role in ['ADMIN', 'MODERATOR']:
             return Homework.objects.select_related('group', 'created_by').all()
         elif user.role == 'TEACHER':
-            return Homework.objects.select_related('group', 'created_by').filter(group__teachers=user)
+            # Topshiriqlar soni va guruh hajmi har bir vazifa uchun alohida so'ralmaydi
+            student_count = Group.students.through.objects.filter(
+                group=OuterRef('group_id')
+            ).values('group').annotate(total=Count('pk')).values('total')
+            return Homework.objects.select_related('group', 'created_by').filter(group__teachers=user).annotate(
+                total_students=Coalesce(Subquery(student_count), 0),
+                submitted_count=Count('submissions'),
+                graded_count=Count('submissions', filter=Q(submissions__is_graded=True)),
+            )
         elif user.role == 'STUDENT':
             return Homework.objects.select_related('group', 'created_by').filter(group__students=user)
         return Homework.objects.none()
@@ -35,19 +53,20 @@ class HomeworkListView(LoginRequiredMixin, ListView):
         now = timezone.now()
         
         if user.role == 'STUDENT':
-            for hw in context['homeworks']:
-                hw.is_locked = is_homework_locked(user, hw)
-                hw.is_submitted = Submission.objects.filter(homework=hw, student=user).exists()
+            homeworks = context['homeworks']
+            locked_ids = locked_ids_for(user, homeworks)
+            submitted_ids = set(Submission.objects.filter(
+                student=user, homework__in=homeworks
+            ).values_list('homework_id', flat=True))
+            for hw in homeworks:
+                hw.is_locked = hw.pk in locked_ids
+                hw.is_submitted = hw.pk in submitted_ids
                 hw.is_overdue = hw.deadline < now and not hw.is_submitted
                 # Check for deadline warning (1 hour)
                 if hw.deadline > now and (hw.deadline - now).total_seconds() <= 3600:
                     hw.deadline_warning = True
         elif user.role == 'TEACHER':
             for hw in context['homeworks']:
-                submissions = Submission.objects.filter(homework=hw)
-                hw.total_students = hw.group.students.count()
-                hw.submitted_count = submissions.count()
-                hw.graded_count = submissions.filter(is_graded=True).count()
                 hw.pending_count = hw.submitted_count - hw.graded_count
         
         context['now'] = now
@@ -65,7 +84,7 @@ class HomeworkDetailView(LoginRequiredMixin, DetailView):
         user = request.user
         
         # Student uchun lock tekshirish
-        if user.role == 'STUDENT' and is_homework_locked(user, self.object):
+        if user.role == 'STUDENT' and self.object.pk in locked_ids_for(user, [self.object]):
             return render(request, 'homeworks/locked.html', {'homework': self.object})
         
         return super().get(request, *args, **kwargs)
@@ -81,7 +100,7 @@ class HomeworkDetailView(LoginRequiredMixin, DetailView):
             ).first()
             context['can_submit'] = timezone.now() <= homework.deadline
         elif user.role in ['TEACHER', 'ADMIN']:
-            submissions = Submission.objects.filter(homework=homework).select_related('student')
+            submissions = Submission.objects.filter(homework=homework).select_related('student', 'homework')
             context['submissions'] = submissions
             context['submitted_students'] = [s.student for s in submissions]
             context['all_students'] = homework.group.students.all()
@@ -127,7 +146,7 @@ class HomeworkCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
             )
             for student in students
         ]
-        Notification.objects.bulk_create(notifications)
+        notify(notifications)
         
         messages.success(self.request, "Vazifa muvaffaqiyatli yaratildi!")
         return redirect('homework_detail', pk=homework.pk)
@@ -252,18 +271,42 @@ class GradeSubmissionView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         submission.save()
         
         # O'quvchiga notification yuborish
-        Notification.objects.create(
-            user=submission.student,
-            notification_type='GRADED',
-            title='Vazifangiz baholandi',
-            message=f'"{submission.homework.title}" vazifangiz baholandi. Ball: {submission.score_percent}%',
-            related_homework=submission.homework
-        )
+        graded_notification(submission).save()
         
         messages.success(self.request, f"Baho qo'yildi: {submission.score_percent}%")
         return redirect('homework_detail', pk=submission.homework.pk)
 
 
+@login_required
+def grade_homework_view(request, pk):
+    """Vazifaning barcha topshiriqlarini bitta sahifada baholash (O'qituvchi uchun)"""
+    homework = get_object_or_404(Homework.objects.select_related('group__course'), pk=pk)
+    try:
+        check_grader(request.user, [homework.group_id])
+    except PermissionDenied as exc:
+        return HttpResponseForbidden(str(exc))
+
+    # is_late shablonda homework.deadline'ni o'qiydi
+    submissions = Submission.objects.filter(homework=homework).select_related('student', 'homework').order_by(
+        'is_graded', 'student__last_name', 'student__first_name'
+    )
+    form = BulkGradeForm(request.POST or None, submissions=submissions)
+    if request.method == 'POST' and form.is_valid():
+        entries = form.entries()
+        if not entries:
+            messages.warning(request, "Hech qaysi baho kiritilmadi yoki o'zgartirilmadi.")
+        else:
+            try:
+                graded = bulk_grade(request.user, entries)
+            except ValidationError as exc:
+                messages.error(request, ' '.join(exc.messages))
+            else:
+                messages.success(request, f"{len(graded)} ta topshiriq baholandi.")
+                return redirect('homework_detail', pk=homework.pk)
+
+    return render(request, 'homeworks/grade_homework.html', {'homework': homework, 'form': form})
+
+
 class TeacherSubmissionsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     """O'qituvchi uchun barcha topshiriqlar"""
     model = Submission
@@ -300,23 +343,17 @@ def group_stats_view(request, group_id):
     elif user.role not in ['ADMIN', 'MODERATOR', 'TEACHER']:
         return HttpResponseForbidden("Sizning statistika ko'rish huquqingiz yo'q.")
     
-    homeworks = Homework.objects.filter(group=group)
-    students = group.students.all()
+    homeworks = list(Homework.objects.filter(group=group).annotate(submission_count=Count('submissions')))
+    total_homeworks = len(homeworks)
     
     stats = []
-    for student in students:
-        submissions = Submission.objects.filter(homework__group=group, student=student)
-        total_homeworks = homeworks.count()
-        submitted_count = submissions.count()
-        graded = submissions.filter(is_graded=True)
-        avg_score = graded.aggregate(avg=Avg('score_percent'))['avg'] or 0
-        
+    for student in annotate_group_students(group):
         stats.append({
             'student': student,
-            'submitted': submitted_count,
+            'submitted': student.submitted_count,
             'total': total_homeworks,
-            'avg_score': round(avg_score, 1),
-            'completion': round((submitted_count / total_homeworks * 100) if total_homeworks > 0 else 0, 1)
+            'avg_score': round(student.avg_score or 0, 1),
+            'completion': round((student.submitted_count / total_homeworks * 100) if total_homeworks > 0 else 0, 1)
         })
     
     # Guruh o'rtachasi
@@ -334,18 +371,49 @@ def group_stats_view(request, group_id):
 def mark_notification_read(request, notification_id):
     """Bildirishnomani o'qilgan deb belgilash"""
     notification = get_object_or_404(Notification, pk=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    mark_read(request.user, Notification.objects.filter(pk=notification.pk))
     
-    if notification.related_homework:
-        return redirect('homework_detail', pk=notification.related_homework.pk)
+    if notification.related_homework_id:
+        return redirect('homework_detail', pk=notification.related_homework_id)
     return redirect('student_dashboard')
 
 
 @login_required
 def notifications_list(request):
-    """Barcha bildirishnomalar"""
-    notifications = Notification.objects.filter(user=request.user)
+    """Barcha bildirishnomalar (sahifalab, (user, -created_at) indeksi bo'yicha)"""
+    notifications = Notification.objects.filter(user=request.user).order_by('-created_at', '-id')
+    page = Paginator(notifications, settings.NOTIFICATIONS_PER_PAGE).get_page(request.GET.get('page'))
     return render(request, 'homeworks/notifications.html', {
-        'notifications': notifications
+        'notifications': page.object_list,
+        'page_obj': page,
     })
+
+
+@login_required
+@require_POST
+def mark_all_notifications_read(request):
+    """Barcha o'qilmagan bildirishnomalarni bitta UPDATE bilan o'qilgan qilish"""
+    updated = mark_read(request.user)
+    messages.success(request, f"{updated} ta bildirishnoma o'qilgan deb belgilandi.")
+    return redirect('notifications')
+
+
+@login_required
+async def notification_stream(request):
+    """
+    Yangi bildirishnomalar SSE oqimi (EventSource). Faqat ASGI ostida: WSGI worker
+    oqimni oxirigacha bufferlab qo'yadi, shuning uchun u yerda 204 qaytadi va
+    brauzer qayta ulanmaydi.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET['last_id'])
+    except (KeyError, ValueError):
+        last_id = await latest_id(user.pk)
+
+    response = StreamingHttpResponse(event_stream(user.pk, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,4 @@
+import argparse
 import os
 import django
 from django.utils import timezone
@@ -62,5 +63,19 @@ def setup_data():
 
     print("\nSetup complete!")
 
+def setup_scaled_data(scale):
+    # Benchmark uchun katta hajmdagi sun'iy ma'lumot (core/benchmark.py)
+    from core.benchmark import generate_data, scaled_size
+    data = generate_data(**scaled_size(scale))
+    print(f"Scale {scale}: {data['counts']}")
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=int, default=0,
+                        help="Qo'shimcha sun'iy ma'lumotlar hajmi (0 - faqat demo foydalanuvchilar)")
+    args = parser.parse_args()
+
     setup_data()
+    if args.scale:
+        setup_scaled_data(args.scale)
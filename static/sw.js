@@ -1,4 +1,4 @@
-const CACHE_NAME = 'hoowork-v3';
+const CACHE_NAME = 'hoowork-v4';
 const ASSETS_TO_CACHE = [
     '/',
     '/static/css/style.css',
@@ -32,6 +32,10 @@ self.addEventListener('activate', (event) => {
 });
 
 self.addEventListener('fetch', (event) => {
+    // SSE oqimi keshlanmaydi va service worker orqali o'tmaydi
+    if (event.request.headers.get('Accept') === 'text/event-stream') {
+        return;
+    }
     event.respondWith(
         caches.match(event.request)
             .then((cachedResponse) => {
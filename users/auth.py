@@ -0,0 +1,67 @@
+"""
+Login uchun tezkor yo'l.
+
+LoginBackend (AUTHENTICATION_BACKENDS) foydalanuvchini birinchi guruhi nomi bilan bitta
+so'rovda o'qiydi va parolni faqat bir marta tekshiradi (authenticate() + xato bo'lganda
+qayta get() o'rniga). Login authenticate() orqali o'tadi, shuning uchun boshqa
+backend'lar va user_login_failed signali ishlaydi. Bloklangan o'quvchiga to'lov
+eslatmasi chiqarish uchun parol to'g'ri bo'lishi shart - bunday foydalanuvchi
+request.blocked_login da qoldiriladi.
+check_password() hasher yoki uning narxi o'zgargan bo'lsa parolni qayta hashlab saqlaydi.
+"""
+from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import OuterRef, Subquery
+from academy.models import Group
+from .models import User
+
+INVALID_CREDENTIALS = "Noto'g'ri foydalanuvchi nomi yoki parol."
+ACCOUNT_BLOCKED = "Sizning hisobingiz bloklangan. Admin bilan bog'laning."
+
+
+def get_login_user(username):
+    """Foydalanuvchi va (o'quvchi bo'lsa) birinchi guruhi nomi - bitta so'rov"""
+    first_group = Group.students.through.objects.filter(
+        user=OuterRef('pk')
+    ).order_by('group_id').values('group__name')[:1]
+    return User.objects.annotate(first_group_name=Subquery(first_group)).filter(username=username).first()
+
+
+def blocked_message(user):
+    if user.role != User.Role.STUDENT:
+        return ACCOUNT_BLOCKED
+    full_name = user.get_full_name() or user.username
+    group_name = user.first_group_name or "Guruhsiz"
+    return (
+        f"Hurmatli {full_name}, siz {group_name} guruhidasiz. Iltimos, shu oy uchun to'lovni amalga oshiring. "
+        "To'lov qilganingizdan so'ng tizimga kira olasiz."
+    )
+
+
+class LoginBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None or password is None:
+            return None
+        user = get_login_user(username)
+        if user is None:
+            # Mavjud bo'lmagan login ham hashlash vaqtini oladi (ModelBackend kabi)
+            User().set_password(password)
+            return None
+        if not user.check_password(password):
+            return None
+        if not self.user_can_authenticate(user):
+            if request is not None:
+                request.blocked_login = user
+            return None
+        return user
+
+
+def check_login(request, username, password):
+    """Qaytaradi: (user, None) muvaffaqiyatli bo'lsa, aks holda (None, xato matni)"""
+    user = authenticate(request, username=username, password=password) if username else None
+    if user is not None:
+        return user, None
+    blocked = getattr(request, 'blocked_login', None)
+    if blocked is not None:
+        return None, blocked_message(blocked)
+    return None, INVALID_CREDENTIALS
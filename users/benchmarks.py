@@ -0,0 +1,15 @@
+"""View so'rovlari benchmark holatlari (users tests va benchmark_views buyrug'i uchun umumiy)"""
+from django.urls import reverse
+
+
+def cases(data):
+    """core.benchmark.generate_data natijasidan [(nom, foydalanuvchi, url), ...]"""
+    admin, teacher, student = data['admin'], data['teachers'][0], data['students'][0]
+    return [
+        ('student_dashboard', student, reverse('student_dashboard')),
+        ('teacher_dashboard', teacher, reverse('teacher_dashboard')),
+        ('admin_dashboard', admin, reverse('admin_dashboard')),
+        ('user_list', admin, reverse('user_list')),
+        ('user_detail', admin, reverse('user_detail', args=[student.pk])),
+        ('profile', student, reverse('profile')),
+    ]
@@ -0,0 +1,191 @@
+"""
+Dashboard so'rovlari.
+
+Har bir dashboard bir-biriga bog'liq bo'lmagan so'rovlar to'plami sifatida yoziladi:
+{nom: argumentsiz funksiya}. Sinxron view'lar ularni run_queries() bilan ketma-ket,
+async view'lar esa arun_queries() bilan asyncio.gather orqali bajaradi.
+
+Django async ORM so'rovlari (acount, aaggregate, ...) bitta thread-sensitive oqimda
+navbat bilan bajariladi, shuning uchun gather ularni parallel qilmaydi. Haqiqiy parallellik
+uchun DASHBOARD_PARALLEL_QUERIES yoqiladi: har bir so'rov alohida oqimda, o'z DB
+ulanishida bajariladi va ulanish darhol qaytariladi - bu faqat ulanishlar puli
+(DATABASE_POOL, PostgreSQL) bilan o'zini oqlaydi.
+"""
+import asyncio
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from academy.models import Course, Group
+from homeworks.models import Homework, Notification, StudentGroupStats, Submission
+from homeworks import leaderboard
+from .models import User
+
+
+def run_queries(queries):
+    return {name: query() for name, query in queries.items()}
+
+
+def _in_own_connection(query):
+    def run():
+        try:
+            return query()
+        finally:
+            # Oqim ulanishi pulga qaytariladi (pul bo'lmasa yopiladi)
+            connections.close_all()
+    return run
+
+
+async def arun_queries(queries):
+    """run_queries() ning async varianti: so'rovlar bir vaqtda ishga tushiriladi"""
+    if settings.DASHBOARD_PARALLEL_QUERIES:
+        calls = [sync_to_async(_in_own_connection(query), thread_sensitive=False) for query in queries.values()]
+    else:
+        calls = [sync_to_async(query) for query in queries.values()]
+    results = await asyncio.gather(*(call() for call in calls))
+    return dict(zip(queries, results))
+
+
+# ============== STUDENT ==============
+
+def student_queries(user, groups):
+    """Keshlanadigan statistika (o'quvchi va guruhlar versiyalariga bog'liq)"""
+    homeworks = Homework.objects.filter(group__in=groups)
+    submissions = Submission.objects.filter(student=user)
+    return {
+        'homeworks': lambda: list(homeworks.select_related('group').order_by('-created_at')[:10]),
+        'total_homeworks': homeworks.count,
+        'submitted_count': submissions.count,
+        'avg_score': lambda: submissions.filter(is_graded=True).aggregate(avg=Avg('score_percent'))['avg'] or 0,
+    }
+
+
+def student_live_queries(user, groups):
+    """Har so'rovda o'qiladigan qism: bildirishnomalar va yaqin deadline'lar"""
+    now = timezone.now()
+    return {
+        'notifications': lambda: list(Notification.objects.filter(user=user, is_read=False)[:5]),
+        'upcoming_deadlines': lambda: list(
+            Homework.objects.filter(
+                group__in=groups,
+                deadline__gt=now,
+                deadline__lt=now + timedelta(days=3)
+            ).exclude(
+                submissions__student=user
+            ).order_by('deadline')[:5]
+        ),
+    }
+
+
+def student_context(groups, stats, live):
+    return {
+        'groups': groups,
+        'homeworks': stats['homeworks'],
+        'total_homeworks': stats['total_homeworks'],
+        'submitted_count': stats['submitted_count'],
+        'avg_score': round(stats['avg_score'], 1),
+        **live,
+    }
+
+
+# ============== ADMIN ==============
+
+def _course_rows():
+    # Kurslar statistikasi (StudentGroupStats jadvalidan)
+    return {
+        row['group__course_id']: row
+        for row in StudentGroupStats.objects.values('group__course_id').annotate(
+            students=Count('id'),
+            graded=Sum('graded_count'),
+            score=Sum('score_sum')
+        )
+    }
+
+
+def _recent_homeworks():
+    group_size = Group.students.through.objects.filter(
+        group=OuterRef('group_id')
+    ).values('group').annotate(total=Count('pk')).values('total')
+    return list(Homework.objects.select_related('group', 'group__course').annotate(
+        group_size=Coalesce(Subquery(group_size), 0),
+        submission_count=Count('submissions')
+    ).order_by('-created_at')[:5])
+
+
+def admin_queries():
+    """Keshlanadigan umumiy statistika (GLOBAL versiyasiga bog'liq)"""
+    return {
+        'total_students': User.objects.filter(role='STUDENT', is_active=True).count,
+        'total_teachers': User.objects.filter(role='TEACHER', is_active=True).count,
+        'total_courses': Course.objects.count,
+        'total_groups': Group.objects.count,
+        'avg_score': lambda: Submission.objects.filter(is_graded=True).aggregate(avg=Avg('score_percent'))['avg'] or 0,
+        'courses': lambda: list(Course.objects.annotate(group_count=Count('groups'))),
+        'course_rows': _course_rows,
+        'recent_homeworks': _recent_homeworks,
+        'recent_users': lambda: list(User.objects.order_by('-date_joined')[:5]),
+        'recent_submissions': lambda: list(
+            Submission.objects.select_related('student', 'homework').order_by('-submitted_at')[:5]
+        ),
+    }
+
+
+def admin_live_queries():
+    return {
+        # Top o'quvchilar (eng yuqori o'rtacha ball) - SQL'da saralanadi va keshlanadi
+        'top_students': lambda: leaderboard.top_students(limit=5),
+    }
+
+
+def admin_stats(results):
+    """admin_queries() natijalaridan keshga yoziladigan payload"""
+    course_stats = []
+    for course in results['courses']:
+        row = results['course_rows'].get(course.pk, {})
+        graded = row.get('graded') or 0
+        course_stats.append({
+            'course': course,
+            'groups': course.group_count,
+            'students': row.get('students', 0),
+            'avg_score': round(row['score'] / graded, 1) if graded else 0
+        })
+
+    recent_homeworks = []
+    for hw in results['recent_homeworks']:
+        submission_percent = (hw.submission_count / hw.group_size * 100) if hw.group_size > 0 else 0
+        recent_homeworks.append({
+            'id': hw.id,
+            'title': hw.title,
+            'group': hw.group,
+            'deadline': hw.deadline,
+            'total_students': hw.group_size,
+            'submitted_count': hw.submission_count,
+            'submission_percent': round(submission_percent),
+        })
+
+    return {
+        'total_students': results['total_students'],
+        'total_teachers': results['total_teachers'],
+        'total_courses': results['total_courses'],
+        'total_groups': results['total_groups'],
+        'avg_score': round(results['avg_score'], 1),
+        'course_stats': course_stats,
+        'recent_homeworks': recent_homeworks,
+        'recent_users': results['recent_users'],
+        'recent_submissions': results['recent_submissions'],
+    }
+
+
+def admin_context(user, stats, live):
+    # Muddat holati vaqtga bog'liq, shuning uchun keshdan keyin hisoblanadi
+    now = timezone.now()
+    for hw in stats['recent_homeworks']:
+        hw['is_active'] = hw['deadline'] > now
+    return {
+        **stats,
+        **live,
+        'is_moderator': user.role == 'MODERATOR',
+    }
@@ -1,3 +1,314 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from django.test import AsyncRequestFactory, LiveServerTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from academy.models import Course, Group
+from core.benchmark import QueryCountBenchmarkMixin, generate_data, http_burst, http_login, login_burst
+from core.cache import bump, cached, check_shared_cache, hit_stats, version_key
+from homeworks.models import Homework, Submission
+from . import benchmarks
+from . import dashboards
+from .models import User
+from .views import admin_dashboard_async, student_dashboard_async
 
-# Create your tests here.
+
+def make_group(name, course, students=0, teacher=None):
+    group = Group.objects.create(name=name, course=course)
+    group.students.add(*[
+        User.objects.create(username=f'{name}-s{i}', role='STUDENT')
+        for i in range(students)
+    ])
+    if teacher:
+        group.teachers.add(teacher)
+    return group
+
+
+class TeacherDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create(username='teacher', role='TEACHER')
+        self.course = Course.objects.create(name='Python')
+        self.client.force_login(self.teacher)
+
+    def add_group(self, name, students=3, graded_scores=(), pending=0):
+        group = make_group(name, self.course, students=students, teacher=self.teacher)
+        students = list(group.students.all())
+        for i, score in enumerate(graded_scores):
+            homework = Homework.objects.create(
+                title=f'{name} HW {i}', description='-', group=group,
+                deadline=timezone.now() + timedelta(days=1), sequence=i + 1
+            )
+            Submission.objects.create(homework=homework, student=students[0], is_graded=True, score_percent=score)
+            for student in students[1:1 + pending]:
+                Submission.objects.create(homework=homework, student=student)
+        return group
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('teacher_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_group_figures(self):
+        self.add_group('A', students=4, graded_scores=(60, 80), pending=2)
+        response, _ = self.get_dashboard()
+        stat = response.context['group_stats'][0]
+        self.assertEqual(
+            (stat['students'], stat['homeworks'], stat['avg_score'], stat['pending']),
+            (4, 2, 70, 4)
+        )
+        self.assertEqual(response.context['total_students'], 4)
+        self.assertEqual(response.context['pending_count'], 4)
+
+    def test_query_count_flat_as_groups_grow(self):
+        self.add_group('A', graded_scores=(50,), pending=1)
+        _, few = self.get_dashboard()
+        for name in 'BCDE':
+            self.add_group(name, graded_scores=(50, 90), pending=2)
+        _, many = self.get_dashboard()
+        self.assertEqual(few, many)
+
+
+@override_settings(CACHE_STATS_SAMPLE_RATE=1)
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(name='Python')
+        self.teacher = User.objects.create(username='teacher', role='TEACHER')
+        self.group = make_group('A', self.course, students=2, teacher=self.teacher)
+        self.student = self.group.students.first()
+        self.homework = Homework.objects.create(
+            title='HW', description='-', group=self.group,
+            deadline=timezone.now() + timedelta(days=1), sequence=1
+        )
+
+    def get(self, user, name):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_second_request_is_served_from_cache(self):
+        _, first = self.get(self.teacher, 'teacher_dashboard')
+        _, second = self.get(self.teacher, 'teacher_dashboard')
+        self.assertLess(second, first)
+        self.assertEqual(hit_stats()['teacher_dashboard'], {'hits': 1, 'misses': 1, 'ratio': 50.0})
+
+    def test_grading_invalidates_student_and_teacher_payloads(self):
+        self.get(self.student, 'student_dashboard')
+        self.get(self.teacher, 'teacher_dashboard')
+
+        Submission.objects.create(homework=self.homework, student=self.student, is_graded=True, score_percent=80)
+
+        response, _ = self.get(self.student, 'student_dashboard')
+        self.assertEqual((response.context['submitted_count'], response.context['avg_score']), (1, 80))
+        response, _ = self.get(self.teacher, 'teacher_dashboard')
+        self.assertEqual(response.context['group_stats'][0]['avg_score'], 80)
+
+    def test_teacher_assignment_invalidates(self):
+        other = make_group('B', self.course, students=1)
+        self.get(self.teacher, 'teacher_dashboard')
+        other.teachers.add(self.teacher)
+        response, _ = self.get(self.teacher, 'teacher_dashboard')
+        self.assertEqual(len(response.context['group_stats']), 2)
+
+    def test_bump_from_other_process_is_visible(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        with override_settings(CACHES={'default': shared}):
+            self.get(self.student, 'student_dashboard')
+            # Boshqa worker yoki manage.py buyrug'i: o'sha papkadagi alohida kesh obyekti
+            other = FileBasedCache(location, {})
+            other.set(version_key('user', self.student.pk), 'boshqa-jarayon')
+            self.get(self.student, 'student_dashboard')
+            self.assertEqual(hit_stats()['student_dashboard']['misses'], 2)
+
+    def test_payload_built_before_commit_is_not_served(self):
+        depends_on = [('user', self.student.pk)]
+        with self.captureOnCommitCallbacks(execute=True):
+            bump('user', self.student.pk)
+            # Parallel so'rov commit'dan oldingi ma'lumotni yangi versiya ostida saqlaydi
+            cached('probe', lambda: 'eski', depends_on)
+        self.assertEqual(cached('probe', lambda: 'yangi', depends_on), 'yangi')
+
+    def test_each_bump_writes_a_new_version(self):
+        key = version_key('user', self.student.pk)
+        bump('user', self.student.pk)
+        seen = {cache.get(key)}
+        for _ in range(3):
+            bump('user', self.student.pk)
+            seen.add(cache.get(key))
+        self.assertEqual(len(seen), 4)
+
+    def test_stats_are_opt_in(self):
+        with override_settings(CACHE_STATS_SAMPLE_RATE=0):
+            cached('probe', lambda: 1)
+            cached('probe', lambda: 1)
+        self.assertNotIn('probe', hit_stats())
+
+    def test_process_local_caches_fail_deploy_check(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual([warning.id for warning in check_shared_cache()], ['core.W001'])
+            location = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+            shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': shared}):
+                self.assertEqual([warning.id for warning in check_shared_cache()], ['core.W001'])
+            redis = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1'}
+            with override_settings(CACHES={'default': redis}):
+                self.assertEqual(check_shared_cache(), [])
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(
+            username='ali', password='parol-123', role='STUDENT', first_name='Ali'
+        )
+        make_group('Python-1', Course.objects.create(name='Python')).students.add(self.student)
+
+    def post(self, password='parol-123', username='ali'):
+        return self.client.post(reverse('login'), {'username': username, 'password': password})
+
+    def test_login_reads_user_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post()
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+        user_reads = [q for q in queries if q['sql'].startswith('SELECT') and '"users_user"' in q['sql']]
+        self.assertEqual(len(user_reads), 1)
+
+    def test_wrong_password_and_unknown_user(self):
+        for response in (self.post('xato'), self.post(username='yoq')):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['error'], "Noto'g'ri foydalanuvchi nomi yoki parol.")
+
+    def test_blocked_student_sees_group(self):
+        self.student.is_active = False
+        self.student.save()
+        self.assertIn('Python-1 guruhidasiz', self.post().context['error'])
+        self.assertEqual(self.post('xato').context['error'], "Noto'g'ri foydalanuvchi nomi yoki parol.")
+
+    def test_goes_through_authenticate(self):
+        failed = []
+
+        def receiver(sender, credentials, **kwargs):
+            failed.append(credentials['username'])
+
+        user_login_failed.connect(receiver)
+        try:
+            self.post('xato')
+            self.post(username='yoq')
+        finally:
+            user_login_failed.disconnect(receiver)
+        self.assertEqual(failed, ['ali', 'yoq'])
+
+        # Boshqa backend'lar ham ishlaydi
+        with override_settings(AUTHENTICATION_BACKENDS=[
+            'users.auth.LoginBackend', 'django.contrib.auth.backends.AllowAllUsersModelBackend'
+        ]):
+            self.student.is_active = False
+            self.student.save()
+            response = self.post()
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+
+    def test_rehash_on_login(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.post()
+        self.student.refresh_from_db()
+        self.assertTrue(self.student.password.startswith('pbkdf2_sha256$2000$'))
+
+        with override_settings(PASSWORD_HASHERS=[
+            'core.hashers.TunableScryptPasswordHasher', 'core.hashers.TunablePBKDF2PasswordHasher'
+        ], PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10):
+            self.client.logout()
+            self.post()
+        self.student.refresh_from_db()
+        self.assertTrue(self.student.password.startswith('scrypt$'))
+
+    def test_login_burst(self):
+        encoded = make_password('parol-123')
+        result = login_burst([encoded] * 4 + ['pbkdf2_sha256$1000$x$y'], 'parol-123', concurrency=2)
+        self.assertEqual((result['logins'], result['failed']), (5, 1))
+        self.assertEqual(len(result['latencies_ms']), 5)
+
+
+class AsyncDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.data = generate_data(courses=1, groups_per_course=2, students_per_group=3, homeworks_per_group=2)
+        self.student = self.data['students'][0]
+        self.groups = list(self.student.study_groups.select_related('course'))
+
+    async def call(self, view, user):
+        request = AsyncRequestFactory().get('/')
+        request.user = user
+
+        async def auser():
+            return user
+        request.auser = auser
+        return await view(request)
+
+    async def test_async_queries_match_sync(self):
+        for queries in (
+            lambda: dashboards.student_queries(self.student, self.groups),
+            lambda: dashboards.student_live_queries(self.student, self.groups),
+            dashboards.admin_queries,
+        ):
+            expected = await sync_to_async(lambda: dashboards.run_queries(queries()))()
+            self.assertEqual(await dashboards.arun_queries(queries()), expected)
+
+    @override_settings(CACHE_STATS_SAMPLE_RATE=1)
+    def test_async_views_share_cache_with_sync_views(self):
+        for sync_name, view, user in (
+            ('student_dashboard', student_dashboard_async, self.student),
+            ('admin_dashboard', admin_dashboard_async, self.data['admin']),
+        ):
+            self.client.force_login(user)
+            expected = self.client.get(reverse(sync_name))
+            response = async_to_sync(self.call)(view, user)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(hit_stats()[sync_name], {'hits': 1, 'misses': 1, 'ratio': 50.0})
+            for key in ('total_homeworks', 'avg_score') if user == self.student else ('total_students', 'total_groups'):
+                self.assertContains(response, str(expected.context[key]))
+
+    def test_async_view_redirects_other_roles(self):
+        response = async_to_sync(self.call)(student_dashboard_async, self.data['admin'])
+        self.assertEqual(response['Location'], reverse('admin_dashboard'))
+
+
+@override_settings(DASHBOARD_PARALLEL_QUERIES=True)
+class ParallelDashboardQueryTests(TransactionTestCase):
+    def test_queries_run_on_own_connections(self):
+        data = generate_data(courses=1, groups_per_course=1, students_per_group=2, homeworks_per_group=2)
+        expected = dashboards.run_queries(dashboards.admin_queries())
+        results = async_to_sync(dashboards.arun_queries)(dashboards.admin_queries())
+        self.assertEqual(results, expected)
+        self.assertEqual(results['total_students'], len(data['students']))
+
+
+class DashboardHttpBenchmarkTests(LiveServerTestCase):
+    def test_login_and_burst(self):
+        User.objects.create(username='talaba', role='STUDENT', password=make_password('parol-123'))
+        opener, url = http_login(self.live_server_url, 'talaba', 'parol-123')
+        self.assertEqual(url, self.live_server_url + reverse('student_dashboard'))
+        # Live server SQLite bilan ishlaydi: parallellik benchmark_dashboards'da o'lchanadi
+        result = http_burst(opener, url, requests=4, concurrency=1)
+        self.assertEqual((result['requests'], result['failed']), (4, 0))
+        with self.assertRaises(ValueError):
+            http_login(self.live_server_url, 'talaba', 'xato')
+
+
+class UsersQueryBenchmarkTests(QueryCountBenchmarkMixin, TestCase):
+    def cases(self, data):
+        return benchmarks.cases(data)
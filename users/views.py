@@ -1,15 +1,22 @@
+import asyncio
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.http import HttpResponseForbidden
-from django.db.models import Avg, Count
-from homeworks.models import Homework, Submission, Notification
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from homeworks.models import Homework, Submission
 from homeworks.utils import auto_grade_missed_homeworks
-from academy.models import Course, Group
+from core.cache import GLOBAL, acached, cached
+from academy.models import Group
+from . import dashboards
+from .auth import check_login
+from .dashboards import arun_queries, run_queries
 from .models import User
 from .forms import UserForm, UserUpdateForm, ChangePasswordForm, ProfileUpdateForm
 
@@ -26,46 +33,11 @@ def login_view(request):
         username = request.POST.get('username', '').strip()
         password = request.POST.get('password', '')
         
-        user = authenticate(username=username, password=password)
+        user, error = check_login(request, username, password)
         if user:
-            if not user.is_active:
-                if user.role == 'STUDENT':
-                    group = user.study_groups.first()
-                    group_name = group.name if group else "Guruhsiz"
-                    full_name = user.get_full_name() or user.username
-                    error = f"Hurmatli {full_name}, siz {group_name} guruhidasiz. Iltimos, shu oy uchun to'lovni amalga oshiring. To'lov qilganingizdan so'ng tizimga kira olasiz."
-                else:
-                    error = "Sizning hisobingiz bloklangan. Admin bilan bog'laning."
-            else:
-                login(request, user)
-                messages.success(request, f"Xush kelibsiz, {user.get_full_name() or user.username}!")
-                return redirect_by_role(user)
-        else:
-            # Check if username exists but password might be wrong, OR if user exists but is inactive and authenticate failed?
-            # Actually authenticate() returns None if is_active=False in some Django versions? 
-            # Default ModelBackend rejects inactive users? 
-            # Let's check if user exists to give better error if needed, but for security generic is better.
-            # However, the requirement is specific: "login parolini teradi ammo kira olmaydi va unga eslatadi..."
-            # If ModelBackend rejects inactive users, authenticate returns None.
-            # We need to manually check.
-            try:
-                u = User.objects.get(username=username)
-                if u.check_password(password):
-                    if not u.is_active:
-                        if u.role == 'STUDENT':
-                            group = u.study_groups.first()
-                            group_name = group.name if group else "Guruhsiz"
-                            full_name = u.get_full_name() or u.username
-                            error = f"Hurmatli {full_name}, siz {group_name} guruhidasiz. Iltimos, shu oy uchun to'lovni amalga oshiring. To'lov qilganingizdan so'ng tizimga kira olasiz."
-                        else:
-                            error = "Sizning hisobingiz bloklangan. Admin bilan bog'laning."
-                    else:
-                         # Should have been authenticated... weird case
-                        error = "Tizim xatosi. Qaytadan urining."
-                else:
-                    error = "Noto'g'ri foydalanuvchi nomi yoki parol."
-            except User.DoesNotExist:
-                error = "Noto'g'ri foydalanuvchi nomi yoki parol."
+            login(request, user)
+            messages.success(request, f"Xush kelibsiz, {user.get_full_name() or user.username}!")
+            return redirect_by_role(user)
     
     return render(request, 'auth/login.html', {'error': error})
 
@@ -102,43 +74,46 @@ def student_dashboard(request):
     auto_grade_missed_homeworks(user)
     
     # O'quvchi guruhlari
-    groups = user.study_groups.all()
+    groups = list(user.study_groups.select_related('course'))
     
-    # Vazifalar
-    homeworks = Homework.objects.filter(group__in=groups).order_by('-created_at')[:10]
+    # Statistika o'quvchi va uning guruhlari versiyalari bo'yicha keshlanadi
+    stats = cached(
+        'student_dashboard', lambda: run_queries(dashboards.student_queries(user, groups)),
+        depends_on=[('user', user.pk)] + [('group', group.pk) for group in groups]
+    )
     
-    # Topshiriqlar
-    submissions = Submission.objects.filter(student=user).select_related('homework')
+    # Bildirishnomalar va yaqin deadline'lar
+    live = run_queries(dashboards.student_live_queries(user, groups))
     
-    # Statistika
-    total_homeworks = Homework.objects.filter(group__in=groups).count()
-    submitted_count = submissions.count()
-    graded = submissions.filter(is_graded=True)
-    avg_score = graded.aggregate(avg=Avg('score_percent'))['avg'] or 0
-    
-    # Bildirishnomalar
-    notifications = Notification.objects.filter(user=user, is_read=False)[:5]
-    
-    # Yaqin deadline'lar
-    from django.utils import timezone
-    from datetime import timedelta
-    upcoming = Homework.objects.filter(
-        group__in=groups,
-        deadline__gt=timezone.now(),
-        deadline__lt=timezone.now() + timedelta(days=3)
-    ).exclude(
-        submissions__student=user
-    ).order_by('deadline')[:5]
-    
-    return render(request, 'student/dashboard.html', {
-        'groups': groups,
-        'homeworks': homeworks,
-        'total_homeworks': total_homeworks,
-        'submitted_count': submitted_count,
-        'avg_score': round(avg_score, 1),
-        'notifications': notifications,
-        'upcoming_deadlines': upcoming,
-    })
+    return render(request, 'student/dashboard.html', dashboards.student_context(groups, stats, live))
+
+
+@login_required
+async def student_dashboard_async(request):
+    """O'quvchi dashboardi (ASGI): mustaqil so'rovlar bir vaqtda bajariladi"""
+    user = await request.auser()
+    
+    if user.role != 'STUDENT':
+        return redirect_by_role(user)
+    
+    await sync_to_async(auto_grade_missed_homeworks)(user)
+    groups = [group async for group in user.study_groups.select_related('course')]
+    
+    async def build_stats():
+        return await arun_queries(dashboards.student_queries(user, groups))
+    
+    stats, live = await asyncio.gather(
+        acached(
+            'student_dashboard', build_stats,
+            depends_on=[('user', user.pk)] + [('group', group.pk) for group in groups]
+        ),
+        arun_queries(dashboards.student_live_queries(user, groups)),
+    )
+    
+    # Shablon (context processor'lar, lazy maydonlar) sinxron oqimda render qilinadi
+    return await sync_to_async(render)(
+        request, 'student/dashboard.html', dashboards.student_context(groups, stats, live)
+    )
 
 
 @login_required
@@ -149,38 +124,63 @@ def teacher_dashboard(request):
     if user.role != 'TEACHER':
         return redirect_by_role(user)
     
-    # O'qituvchi guruhlari
-    groups = user.teaching_groups.all()
+    # O'qituvchi guruhlari (kesh kaliti shu guruhlar versiyalaridan quriladi)
+    group_ids = list(user.teaching_groups.values_list('pk', flat=True))
+    
+    def build_stats():
+        # Guruhlar va ularning statistikasi - bitta annotate() so'rovida.
+        # O'quvchilar soni subquery orqali olinadi, aks holda students x submissions
+        # JOIN qatorlari ko'payib ketadi.
+        graded = Q(homeworks__submissions__is_graded=True)
+        student_count = Group.students.through.objects.filter(
+            group=OuterRef('pk')
+        ).values('group').annotate(total=Count('pk')).values('total')
+        groups = list(Group.objects.filter(pk__in=group_ids).select_related('course').annotate(
+            student_count=Coalesce(Subquery(student_count), 0),
+            homework_count=Count('homeworks', distinct=True),
+            avg_score=Avg('homeworks__submissions__score_percent', filter=graded),
+            pending_count=Count('homeworks__submissions', filter=Q(homeworks__submissions__is_graded=False), distinct=True),
+        ))
+        
+        group_stats = [
+            {
+                'group': group,
+                'students': group.student_count,
+                'homeworks': group.homework_count,
+                'avg_score': round(group.avg_score or 0, 1),
+                'pending': group.pending_count
+            }
+            for group in groups
+        ]
+        
+        # Tekshirilmagan topshiriqlar
+        pending_submissions = Submission.objects.filter(
+            homework__group__in=group_ids,
+            is_graded=False
+        ).select_related('homework', 'student').order_by('-submitted_at')[:10]
+        
+        return {
+            'groups': groups,
+            'group_stats': group_stats,
+            'pending_submissions': list(pending_submissions),
+        }
+    
+    stats = cached(
+        'teacher_dashboard', build_stats,
+        depends_on=[('user', user.pk)] + [('group', pk) for pk in group_ids]
+    )
+    group_stats = stats['group_stats']
     
     # Statistika
-    total_students = sum(g.students.count() for g in groups)
-    total_homeworks = Homework.objects.filter(group__in=groups).count()
-    
-    # Tekshirilmagan topshiriqlar
-    pending_submissions = Submission.objects.filter(
-        homework__group__in=groups,
-        is_graded=False
-    ).select_related('homework', 'student').order_by('-submitted_at')[:10]
-    
-    # Guruhlar statistikasi
-    group_stats = []
-    for group in groups:
-        subs = Submission.objects.filter(homework__group=group, is_graded=True)
-        avg = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
-        group_stats.append({
-            'group': group,
-            'students': group.students.count(),
-            'homeworks': Homework.objects.filter(group=group).count(),
-            'avg_score': round(avg, 1),
-            'pending': Submission.objects.filter(homework__group=group, is_graded=False).count()
-        })
+    total_students = sum(g['students'] for g in group_stats)
+    total_homeworks = sum(g['homeworks'] for g in group_stats)
     
     return render(request, 'teacher/dashboard.html', {
-        'groups': groups,
+        'groups': stats['groups'],
         'group_stats': group_stats,
         'total_students': total_students,
         'total_homeworks': total_homeworks,
-        'pending_submissions': pending_submissions,
+        'pending_submissions': stats['pending_submissions'],
         'pending_count': sum(g['pending'] for g in group_stats)
     })
 
@@ -193,97 +193,35 @@ def admin_dashboard(request):
     if user.role not in ['ADMIN', 'MODERATOR']:
         return redirect_by_role(user)
     
-    # Umumiy statistika
-    total_students = User.objects.filter(role='STUDENT', is_active=True).count()
-    total_teachers = User.objects.filter(role='TEACHER', is_active=True).count()
-    total_courses = Course.objects.count()
-    total_groups = Group.objects.count()
-    
-    # O'rtacha o'zlashtirish
-    all_subs = Submission.objects.filter(is_graded=True)
-    avg_score = all_subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
-    
-    # Kurslar statistikasi
-    courses = Course.objects.all()
-    course_stats = []
-    for course in courses:
-        groups = course.groups.all()
-        student_count = sum(g.students.count() for g in groups)
-        subs = Submission.objects.filter(homework__group__in=groups, is_graded=True)
-        course_avg = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
-        course_stats.append({
-            'course': course,
-            'groups': groups.count(),
-            'students': student_count,
-            'avg_score': round(course_avg, 1)
-        })
-    
-    # So'nggi uyga vazifalar
-    from django.utils import timezone
-    recent_homeworks = []
-    homeworks = Homework.objects.select_related('group', 'group__course').order_by('-created_at')[:5]
-    for hw in homeworks:
-        total_students_hw = hw.group.students.count()
-        submitted_count = hw.submissions.count()
-        submission_percent = (submitted_count / total_students_hw * 100) if total_students_hw > 0 else 0
-        is_active = hw.deadline > timezone.now()
-        recent_homeworks.append({
-            'id': hw.id,
-            'title': hw.title,
-            'group': hw.group,
-            'deadline': hw.deadline,
-            'is_active': is_active,
-            'total_students': total_students_hw,
-            'submitted_count': submitted_count,
-            'submission_percent': round(submission_percent),
-        })
-    
-    # Top o'quvchilar (eng yuqori o'rtacha ball)
-    top_students = []
-    students = User.objects.filter(role='STUDENT', is_active=True)
-    for student in students:
-        subs = Submission.objects.filter(student=student, is_graded=True)
-        if subs.exists():
-            avg = subs.aggregate(avg=Avg('score_percent'))['avg'] or 0
-            # Guruh nomini olish
-            group = student.study_groups.first()
-            group_name = group.name if group else None
-            top_students.append({
-                'id': student.id,
-                'username': student.username,
-                'first_name': student.first_name,
-                'last_name': student.last_name,
-                'avg_score': avg,
-                'group_name': group_name,
-                'get_full_name': student.get_full_name,
-            })
-    top_students = sorted(top_students, key=lambda x: x['avg_score'], reverse=True)[:5]
-    
-    # So'nggi foydalanuvchilar
-    recent_users = User.objects.order_by('-date_joined')[:5]
-    
-    # So'nggi topshiriqlar
-    recent_submissions = Submission.objects.select_related(
-        'student', 'homework'
-    ).order_by('-submitted_at')[:5]
-    
-    # O'qilmagan bildirishnomalar soni
-    unread_count = Notification.objects.filter(user=user, is_read=False).count()
-    
-    return render(request, 'admin/dashboard.html', {
-        'total_students': total_students,
-        'total_teachers': total_teachers,
-        'total_courses': total_courses,
-        'total_groups': total_groups,
-        'avg_score': round(avg_score, 1),
-        'course_stats': course_stats,
-        'recent_homeworks': recent_homeworks,
-        'top_students': top_students,
-        'recent_users': recent_users,
-        'recent_submissions': recent_submissions,
-        'is_moderator': user.role == 'MODERATOR',
-        'unread_count': unread_count,
-    })
+    # Umumiy statistika butun tizim versiyasi (GLOBAL) bo'yicha keshlanadi
+    stats = cached(
+        'admin_dashboard', lambda: dashboards.admin_stats(run_queries(dashboards.admin_queries())),
+        depends_on=[GLOBAL]
+    )
+    live = run_queries(dashboards.admin_live_queries())
+    
+    return render(request, 'admin/dashboard.html', dashboards.admin_context(user, stats, live))
+
+
+@login_required
+async def admin_dashboard_async(request):
+    """Admin dashboardi (ASGI): mustaqil so'rovlar bir vaqtda bajariladi"""
+    user = await request.auser()
+    
+    if user.role not in ['ADMIN', 'MODERATOR']:
+        return redirect_by_role(user)
+    
+    async def build_stats():
+        return dashboards.admin_stats(await arun_queries(dashboards.admin_queries()))
+    
+    stats, live = await asyncio.gather(
+        acached('admin_dashboard', build_stats, depends_on=[GLOBAL]),
+        arun_queries(dashboards.admin_live_queries()),
+    )
+    
+    return await sync_to_async(render)(
+        request, 'admin/dashboard.html', dashboards.admin_context(user, stats, live)
+    )
 
 
 # ============== USER MANAGEMENT ==============